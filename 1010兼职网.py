@@ -1,48 +1,138 @@
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.edge.service import Service
-from selenium.webdriver.edge.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 import time
-import re
-import json
-import csv
 import os
+import argparse
 from datetime import datetime
+from detail_fetcher import fetch_job_details, set_failure_policy, set_rate_scheduler, set_response_cache
+from crawl_pipeline import run_pipeline
+from seen_index import DEFAULT_INDEX_FILE, SeenIndex
+from crawl_journal import JOB_FIELDS, JobJournal
+from crawl_state import DEFAULT_STATE_FILE, CrawlState
+from response_cache import DEFAULT_CACHE_DIR, ResponseCache
+from listing_extractor import LISTING_XPATH, extract_listing_rows, parse_listing_html, rows_to_jobs, split_price
+from driver_pool import DriverPool
+from crawl_metrics import metrics
+from rate_scheduler import RateScheduler
+from detail_retry import AdaptiveTimeout, CircuitBreaker, RetryQueue, is_placeholder
+from near_duplicates import DEFAULT_NEAR_DUP_FILE, NearDuplicateIndex
+from detail_fields import DETAIL_FIELDS, extract_detail_fields
+from parquet_output import parquet_available
+from job_store import DEFAULT_STORE_FILE, JobStore
 
-# 创建一个列表来存储所有职位信息
-job_list = []
+# 职位详情获取方式：'http' 使用异步HTTP并发获取详情页；'selenium' 使用原有的浏览器标签页方式
+DETAIL_FETCH_MODE = 'http'
+# HTTP方式下同时获取详情页的最大并发数
+DETAIL_CONCURRENCY = 8
+# 列表页提取方式：'script' 一次execute_script取回整页；'html' 解析页面源码；'elements' 原有的逐个元素提取
+LISTING_EXTRACT_MODE = 'script'
+# 爬取方式：'pipeline' 列表页与详情页流水线并行（需要HTTP详情方式）；'serial' 逐页串行处理
+CRAWL_MODE = 'pipeline'
+# 流水线中等待获取详情的职位队列长度，队列满时列表页暂停
+PIPELINE_QUEUE_SIZE = 64
+# 增量爬取：跳过以前运行中已获取过的职位，整页都已爬取过时停止翻页
+INCREMENTAL = True
+# 已爬取职位索引文件
+SEEN_INDEX_FILE = DEFAULT_INDEX_FILE
+# 已爬取职位索引，在main()中打开
+seen_index = None
+# 合并近似重复的职位：中介只改日期前缀重复发布的职位只保留第一次出现的一条，并记录“重复发布次数”
+COLLAPSE_REPOSTS = True
+# 入库时从职位详情中提取时薪、班次、折算日薪、地铁站、联系人等结构化字段，追加到输出文件中
+EXTRACT_DETAIL_FIELDS = True
+# 在JSON和CSV之外再输出Parquet文件（字段类型固定、字典编码、压缩，分析时可只读需要的列），需要pyarrow
+SAVE_PARQUET = True
+# 近似重复职位索引文件，跨多次运行累计
+NEAR_DUP_FILE = DEFAULT_NEAR_DUP_FILE
+# 近似重复职位索引，在main()中打开
+near_duplicates = None
+# 职位信息流式日志，每获取完一个职位追加一条，在main()中打开
+journal = None
+# 职位库文件：所有运行的职位按职位ID写入同一个SQLite数据库，供分析脚本直接查询；为None时不写入
+JOB_STORE_FILE = DEFAULT_STORE_FILE
+# 职位库，在main()中打开
+job_store = None
+# HTTP响应缓存目录，为None时不使用缓存；列表页和详情页分别按各自的有效期缓存，过期后条件请求重新验证
+RESPONSE_CACHE_DIR = DEFAULT_CACHE_DIR
+# HTTP响应缓存，在main()中打开
+response_cache = None
+# 爬取状态文件，用于 --resume 从中断处继续
+STATE_FILE = DEFAULT_STATE_FILE
+# 可恢复的爬取状态，在main()中创建或读取
+crawl_state = None
 
-# 设置Edge浏览器选项
-edge_options = Options()
-# 如果需要无头模式（不显示浏览器界面），取消下面这行的注释
-# edge_options.add_argument('--headless')
+# 同时使用的Edge浏览器数量
+DRIVER_POOL_SIZE = 1
+# 每个浏览器加载多少页后重启，避免长时间运行后浏览器越来越慢
+DRIVER_MAX_PAGES = 200
+# 浏览器内存增长超过多少MB后重启（需要安装psutil）
+DRIVER_MAX_MEMORY_GROWTH_MB = 500
+# 轻量模式：屏蔽图片、字体和样式表；提取的文本与页面显示不一致时改为False
+LIGHTWEIGHT_BROWSER = True
+# 无头模式（不显示浏览器界面）
+HEADLESS = False
+# 自适应调速：列表页和详情页共用按站点的令牌桶，响应正常时逐步加快，超时、429或5xx时减速退避，
+# 代替固定的翻页等待；为False时恢复每页之后固定等待2-4秒
+ADAPTIVE_RATE = True
+# 调速的初始速率和速率上限（次/秒），并发上限为DETAIL_CONCURRENCY
+RATE_INITIAL = 2.0
+RATE_MAX = 8.0
+# 职位详情的等待时间根据实际加载耗时在上下限之间自动调整（秒），失败时尽快放弃
+DETAIL_TIMEOUT_MIN = 3
+DETAIL_TIMEOUT_MAX = 10
+# 详情获取失败的职位在运行结束前按指数退避重试的次数
+DETAIL_MAX_RETRIES = 3
+# 连续多少个详情获取失败后暂停详情获取，以及暂停的秒数
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_COOLDOWN = 30
+# 运行指标文件名前缀，结束时写出JSON和Prometheus格式的指标文件；为None时只在控制台输出
+METRICS_FILE_PREFIX = "1010兼职网爬取指标"
 
-# 添加一些额外的选项，使爬虫更稳定
-edge_options.add_argument('--disable-gpu')
-edge_options.add_argument('--no-sandbox')
-edge_options.add_argument('--disable-dev-shm-usage')
-edge_options.add_argument('--disable-extensions')
+# Edge浏览器池，第一次使用浏览器时才启动
+driver_pool = DriverPool(size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES,
+                         max_memory_growth_mb=DRIVER_MAX_MEMORY_GROWTH_MB,
+                         headless=HEADLESS, lightweight=LIGHTWEIGHT_BROWSER)
 
-# 初始化Edge浏览器
-print("正在启动Edge浏览器...")
-try:
-    driver = webdriver.Edge(options=edge_options)
-    print("Edge浏览器启动成功！")
-except Exception as e:
-    print(f"启动Edge浏览器失败: {str(e)}")
-    print("请确保已安装Microsoft Edge浏览器和对应版本的WebDriver")
-    exit(1)
+# 所有请求共用的调度器
+rate_scheduler = RateScheduler(initial_rate=RATE_INITIAL, max_rate=RATE_MAX,
+                               max_concurrency=DETAIL_CONCURRENCY) if ADAPTIVE_RATE else None
 
-# 设置等待时间
-wait = WebDriverWait(driver, 10)
+# 详情页的自适应等待时间、熔断器和失败职位的重试队列
+detail_timeout = AdaptiveTimeout(initial=DETAIL_TIMEOUT_MAX, minimum=DETAIL_TIMEOUT_MIN, maximum=DETAIL_TIMEOUT_MAX)
+circuit_breaker = CircuitBreaker(failure_threshold=CIRCUIT_FAILURE_THRESHOLD, cooldown=CIRCUIT_COOLDOWN)
+retry_queue = RetryQueue(max_attempts=DETAIL_MAX_RETRIES, breaker=circuit_breaker)
+
+# 浏览器请求开始前等待调度器的请求名额，返回开始时间
+def begin_browser_request(url):
+    if rate_scheduler is not None:
+        rate_scheduler.acquire_sync(url)
+    return time.perf_counter()
+
+# 把浏览器请求的耗时和是否失败报告给调度器
+def end_browser_request(url, start, error=False):
+    if rate_scheduler is not None:
+        rate_scheduler.release(url, time.perf_counter() - start, error=error)
 
 # 定义一个函数来获取职位详情
 def get_job_details(job_url):
+    # 从浏览器池中取出一个浏览器，用完后归还
+    with driver_pool.driver() as managed:
+        return get_job_details_with(managed, job_url)
+
+# 用指定的浏览器获取职位详情
+def get_job_details_with(managed, job_url):
+    driver = managed.driver
+    # 站点熔断期间直接放弃，稍后由重试队列重新获取
+    if not circuit_breaker.allow(job_url):
+        metrics.increment('detail_deferred')
+        return "无法获取职位详情"
+    # 等待时间根据最近的加载耗时调整，而不是固定等待10秒
+    wait = WebDriverWait(driver, detail_timeout.current())
     print(f"正在获取职位详情: {job_url}")
     # 打开职位详情页面
+    start = begin_browser_request(job_url)
     try:
         driver.execute_script(f"window.open('{job_url}', '_blank');")
         # 切换到新打开的标签页
@@ -52,9 +142,21 @@ def get_job_details(job_url):
             # 等待职位详情加载完成
             job_detail_element = wait.until(EC.presence_of_element_located((By.XPATH, '/html/body/div[4]/div[2]/span[4]/div[2]')))
             job_detail = job_detail_element.text
+            timed_out = False
         except (TimeoutException, NoSuchElementException) as e:
             print(f"获取职位详情失败: {str(e)}")
+            # 超时只计为detail_timeout，页面中没有详情区块才计为detail_not_found
+            metrics.increment('detail_timeout' if isinstance(e, TimeoutException) else 'detail_not_found')
             job_detail = "无法获取职位详情"
+            timed_out = True
+        elapsed = time.perf_counter() - start
+        managed.record_load(elapsed)
+        metrics.observe('selenium_detail', elapsed, job_url)
+        circuit_breaker.record(job_url, not timed_out)
+        if not timed_out:
+            detail_timeout.observe(elapsed)
+        end_browser_request(job_url, start, error=timed_out)
+        start = None
         
         # 关闭当前标签页并切回主页面
         driver.close()
@@ -63,25 +165,64 @@ def get_job_details(job_url):
         return job_detail
     except Exception as e:
         print(f"打开职位详情页面失败: {str(e)}")
+        metrics.increment('detail_error')
+        if start is not None:
+            circuit_breaker.record(job_url, False)
+            end_browser_request(job_url, start, error=True)
         # 确保切回主页面
         if len(driver.window_handles) > 1:
             driver.close()
             driver.switch_to.window(driver.window_handles[0])
         return "获取职位详情时出错"
 
-# 定义一个函数来处理每个页面的职位列表
-def process_page(page_url):
+# 定义一个函数来提取列表页中的职位信息（不含职位详情）
+def extract_listing(page_url):
+    # 从浏览器池中取出一个浏览器，用完后归还
+    with driver_pool.driver() as managed:
+        with metrics.timer('listing_page', page_url):
+            return extract_listing_with(managed, page_url)
+
+# 用指定的浏览器提取列表页
+def extract_listing_with(managed, page_url):
+    driver, wait = managed.driver, managed.wait
     print(f"\n正在处理页面: {page_url}")
+    # 本页提取到的职位信息，职位详情稍后再获取
+    page_jobs = []
+    start = begin_browser_request(page_url)
+    # 列表页正常加载所用的时间，加载失败时为None
+    load_time = None
     try:
-        driver.get(page_url)
+        with metrics.timer('driver_get', page_url):
+            managed.get(page_url)
         
         # 等待职位列表加载完成
         try:
-            job_list_element = wait.until(EC.presence_of_element_located((By.XPATH, '/html/body/div[4]/div/div/ul[1]')))
+            with metrics.timer('wait_listing', page_url):
+                job_list_element = wait.until(EC.presence_of_element_located((By.XPATH, LISTING_XPATH)))
+            load_time = time.perf_counter() - start
+            
+            # 保存渲染后的列表页（任何提取方式都保存），修改选择器后可用 python response_cache.py --reparse 离线重新解析，或用于回放测试
+            page_source = None
+            if response_cache is not None:
+                page_source = driver.page_source
+                response_cache.store(page_url, 200, {}, page_source.encode('utf-8'))
             
-            # 获取所有职位列表项
-            job_items = job_list_element.find_elements(By.TAG_NAME, 'li')
-            print(f"找到 {len(job_items)} 个职位列表项")
+            # 一次性提取整页：'script' 一次execute_script取回所有行，'html' 解析页面源码
+            if LISTING_EXTRACT_MODE in ('script', 'html'):
+                if LISTING_EXTRACT_MODE == 'script':
+                    rows = extract_listing_rows(driver) or []
+                else:
+                    page_source = page_source if page_source is not None else driver.page_source
+                    rows = parse_listing_html(page_source, page_url) or []
+                print(f"找到 {len(rows)} 个职位列表项")
+                page_jobs = rows_to_jobs(rows)
+                for index, job in enumerate(page_jobs, 1):
+                    print(f"正在处理第 {index} 个职位: {job['职位标题']}")
+                job_items = []
+            else:
+                # 获取所有职位列表项，逐个元素提取
+                job_items = job_list_element.find_elements(By.TAG_NAME, 'li')
+                print(f"找到 {len(job_items)} 个职位列表项")
             
             for index, job_item in enumerate(job_items, 1):
                 try:
@@ -92,19 +233,11 @@ def process_page(page_url):
                     
                     # 提取薪资
                     try:
-                        price_element = job_item.find_element(By.CSS_SELECTOR, 'span.price')
-                        price_text = price_element.text
-                        # 使用正则表达式提取数字和单位
-                        price_match = re.search(r'(\d+)\s*元/(\w+)', price_text)
-                        if price_match:
-                            price = price_match.group(1)
-                            price_unit = price_match.group(2)
-                        else:
-                            price = price_text
-                            price_unit = ""
+                        price_text = job_item.find_element(By.CSS_SELECTOR, 'span.price').text
                     except NoSuchElementException:
-                        price = "未提供"
-                        price_unit = ""
+                        price_text = None
+                    # 使用正则表达式提取数字和单位
+                    price, price_unit = split_price(price_text)
                     
                     # 提取结算方式
                     try:
@@ -126,9 +259,6 @@ def process_page(page_url):
                     
                     print(f"正在处理第 {index} 个职位: {job_title}")
                     
-                    # 获取职位详情
-                    job_detail = get_job_details(job_url)
-                    
                     # 创建职位信息字典
                     job_info = {
                         '职位标题': job_title,
@@ -137,119 +267,270 @@ def process_page(page_url):
                         '结算方式': payment_type,
                         '公司名称': company,
                         '发布时间': publish_time,
-                        '职位详情': job_detail,
+                        '职位详情': None,
                         '职位链接': job_url
                     }
                     
-                    # 将职位信息添加到列表
-                    job_list.append(job_info)
-                    print(f"已添加职位: {job_title}")
+                    page_jobs.append(job_info)
                     
                 except Exception as e:
                     print(f"处理职位时出错: {str(e)}")
         
         except (TimeoutException, NoSuchElementException) as e:
             print(f"找不到职位列表元素: {str(e)}")
+            metrics.increment('listing_timeout')
     
     except Exception as e:
         print(f"处理页面时出错: {str(e)}")
+        metrics.increment('listing_error')
+    
+    if rate_scheduler is not None:
+        if load_time is None:
+            end_browser_request(page_url, start, error=True)
+        else:
+            rate_scheduler.release(page_url, load_time)
+    return page_jobs
 
-# 保存职位信息到JSON文件
-def save_to_json(job_list, filename=None):
-    if not filename:
-        # 使用当前时间创建文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"1010兼职网职位信息_{timestamp}.json"
+# 定义一个函数来处理每个页面的职位列表，整页职位都已爬取过时返回False
+def process_page(page_url, page_num=None):
+    # 恢复运行时跳过本页已处理的条目
+    skip = 0
+    if crawl_state is not None and page_num is not None:
+        skip = crawl_state.begin_page(page_num)
+    listed = extract_listing(page_url)
+    page_jobs = listed[skip:]
+    if skip:
+        print(f"跳过本页已处理的前 {skip} 个职位")
+    
+    # 增量爬取：跳过已知职位
+    if seen_index is not None and page_jobs:
+        new_jobs = seen_index.filter_new(page_jobs)
+        print(f"本页 {len(page_jobs)} 个职位中有 {len(page_jobs) - len(new_jobs)} 个已爬取过，跳过详情获取")
+        if not new_jobs:
+            return False
+        page_jobs = new_jobs
     
-    # 确保文件名有.json后缀
-    if not filename.endswith('.json'):
-        filename += '.json'
+    if crawl_state is not None and page_num is not None:
+        crawl_state.add_pending(len(listed), page_jobs)
+    fetch_and_record(page_jobs)
     
-    # 保存为JSON文件
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(job_list, f, ensure_ascii=False, indent=4)
+    if crawl_state is not None and page_num is not None:
+        crawl_state.finish_page(page_num)
+    return True
+
+# 获取一批职位的详情并写入日志
+def fetch_and_record(page_jobs):
+    # 获取职位详情：Selenium方式逐个打开标签页，HTTP方式并发获取本页所有详情
+    if DETAIL_FETCH_MODE == 'selenium':
+        for job in page_jobs:
+            job['职位详情'] = get_job_details(job['职位链接'])
+    elif page_jobs:
+        with metrics.timer('fetch_details_batch'):
+            details = fetch_job_details([job['职位链接'] for job in page_jobs], concurrency=DETAIL_CONCURRENCY)
+        for job in page_jobs:
+            job['职位详情'] = details.get(job['职位链接'], "获取职位详情时出错")
     
-    print(f"\n职位信息已保存到文件: {filename}")
-    return filename
+    # 将职位信息写入日志
+    for job in page_jobs:
+        record_job(job)
+        print(f"已添加职位: {job['职位标题']}")
+
+# 输出文件的字段，合并近似重复职位时增加“重复发布次数”，提取结构化字段时增加DETAIL_FIELDS
+def output_fields():
+    fields = JOB_FIELDS + ['重复发布次数'] if COLLAPSE_REPOSTS else JOB_FIELDS
+    return fields + DETAIL_FIELDS if EXTRACT_DETAIL_FIELDS else fields
+
+# 从职位详情中提取结构化字段，详情获取失败的职位在重试成功后再提取
+def detail_fields_of(job):
+    if not EXTRACT_DETAIL_FIELDS or is_placeholder(job['职位详情']):
+        return {}
+    with metrics.timer('extract_fields'):
+        return extract_detail_fields(job)
+
+# 近似重复的职位不再单独保存，只更新原始职位的重复发布次数；是重复发布时返回True
+def collapse_repost(job):
+    if near_duplicates is None or is_placeholder(job['职位详情']):
+        return False
+    with metrics.timer('near_duplicate_check'):
+        canonical_url, repost_count = near_duplicates.add(job)
+    if canonical_url == job['职位链接']:
+        return False
+    journal.patch(canonical_url, {'重复发布次数': repost_count})
+    if job_store is not None:
+        job_store.update(canonical_url, {'重复发布次数': repost_count})
+    metrics.increment('reposts_collapsed')
+    print(f"近似重复职位，合并到 {canonical_url}（已重复发布 {repost_count} 次）: {job['职位标题']}")
+    if seen_index is not None:
+        seen_index.mark_seen([job])
+    return True
+
+# 记录一个已获取完详情的职位：追加到流式日志并更新已爬取职位索引
+def record_job(job):
+    if collapse_repost(job):
+        if crawl_state is not None:
+            crawl_state.complete(job)
+        return
+    if near_duplicates is not None:
+        job.setdefault('重复发布次数', 0)
+    job.update(detail_fields_of(job))
+    with metrics.timer('record_job'):
+        journal.append(job)
+    metrics.increment('jobs_recorded')
+    # 详情获取失败的职位先以占位文本写入，运行结束前重试；重试成功后才写入职位库，避免覆盖库中已有的详情
+    if is_placeholder(job['职位详情']):
+        retry_queue.add(job)
+    elif job_store is not None:
+        job_store.upsert(job)
+    if seen_index is not None:
+        seen_index.mark_seen([job])
+    if crawl_state is not None:
+        crawl_state.complete(job)
+
+# 由日志生成最终的JSON和CSV文件（以及Parquet文件），并记录耗时和写入字节数
+def finalize_journal(prefix="1010兼职网职位信息"):
+    with metrics.timer('finalize'):
+        filenames = journal.finalize(prefix, parquet=SAVE_PARQUET and parquet_available())
+    for filename in filenames:
+        metrics.increment('bytes_written', os.path.getsize(filename))
+    return filenames
+
+# 重新获取一批职位的详情，返回 {职位链接: 职位详情}
+def fetch_details_for_retry(jobs):
+    job_urls = [job['职位链接'] for job in jobs]
+    if DETAIL_FETCH_MODE == 'selenium':
+        return {job_url: get_job_details(job_url) for job_url in job_urls}
+    return fetch_job_details(job_urls, concurrency=DETAIL_CONCURRENCY)
+
+# 重试成功：在日志中修正原记录的职位详情，并记入已爬取职位索引；
+# 取得详情后才能判断是否为近似重复，是重复发布时从日志中去掉原来的占位记录
+def patch_job_detail(job, detail):
+    job['职位详情'] = detail
+    if collapse_repost(job):
+        journal.discard(job['职位链接'])
+        return
+    fields = detail_fields_of(job)
+    job.update(fields)
+    journal.patch(job['职位链接'], {'职位详情': detail, **fields})
+    if job_store is not None:
+        job_store.upsert(job)
+    if seen_index is not None:
+        seen_index.mark_seen([job])
+    print(f"重试成功: {job['职位标题']}")
+
+# 按指数退避重试所有详情获取失败的职位
+def retry_failed_details():
+    if not len(retry_queue):
+        return
+    print(f"\n有 {len(retry_queue)} 个职位的详情获取失败，开始重试")
+    with metrics.timer('retry_details'):
+        failed = retry_queue.run(fetch_details_for_retry, patch_job_detail)
+    if failed:
+        print(f"{len(failed)} 个职位的详情多次重试仍然失败，下次运行时会重新获取")
 
-# 保存职位信息到CSV文件
-def save_to_csv(job_list, filename=None):
-    if not filename:
-        # 使用当前时间创建文件名
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"1010兼职网职位信息_{timestamp}.csv"
+# 主函数
+def main(start_page=1, end_page=5, resume=False):
+    global seen_index, journal, crawl_state, response_cache, near_duplicates, job_store
+    metrics.reset()
+    set_rate_scheduler(rate_scheduler)
+    set_failure_policy(detail_timeout, circuit_breaker)
+    if RESPONSE_CACHE_DIR:
+        response_cache = ResponseCache(RESPONSE_CACHE_DIR)
+        set_response_cache(response_cache)
+    if INCREMENTAL:
+        seen_index = SeenIndex(SEEN_INDEX_FILE)
+        print(f"已加载已爬取职位索引: {SEEN_INDEX_FILE}（{len(seen_index)} 个职位）")
+    if COLLAPSE_REPOSTS:
+        near_duplicates = NearDuplicateIndex(NEAR_DUP_FILE)
+        print(f"已加载近似重复职位索引: {NEAR_DUP_FILE}（{len(near_duplicates)} 个原始职位）")
+    if JOB_STORE_FILE:
+        job_store = JobStore(JOB_STORE_FILE)
+        print(f"已打开职位库: {JOB_STORE_FILE}（{len(job_store)} 个职位）")
+    if SAVE_PARQUET and not parquet_available():
+        print("警告：没有安装pyarrow，只输出JSON和CSV文件")
     
-    # 确保文件名有.csv后缀
-    if not filename.endswith('.csv'):
-        filename += '.csv'
+    # 恢复运行：沿用上次的日志文件，从记录的页码和条目继续
+    if resume:
+        crawl_state = CrawlState.load(STATE_FILE)
+        if crawl_state is None:
+            print(f"没有找到爬取状态文件 {STATE_FILE}，将重新开始爬取")
+    if crawl_state is not None:
+        start_page = crawl_state.page_num
+        end_page = crawl_state.end_page
+        journal = JobJournal(crawl_state.journal_path, fieldnames=output_fields())
+        print(f"从第{start_page}页第{crawl_state.item_index + 1}个职位继续爬取，日志中已有 {len(journal)} 个职位")
+    else:
+        # 每个职位获取完成后立即追加到日志，出错时已爬取的数据不会丢失
+        journal_filename = f"1010兼职网职位信息_{datetime.now().strftime('%Y%m%d_%H%M%S')}.journal.jsonl"
+        journal = JobJournal(journal_filename, fieldnames=output_fields())
+        crawl_state = CrawlState(STATE_FILE, journal_filename, start_page, end_page)
+        crawl_state.save()
     
-    # 定义CSV文件的表头
-    fieldnames = ['职位标题', '薪资', '薪资单位', '结算方式', '公司名称', '发布时间', '职位详情', '职位链接']
+    # 上次未完成的职位，去掉崩溃前已写入日志的部分
+    pending_jobs = list(crawl_state.pending.values())
+    if pending_jobs:
+        recorded_urls = {job['职位链接'] for job in journal.iter_records()}
+        for job in pending_jobs:
+            if job['职位链接'] in recorded_urls:
+                crawl_state.complete(job)
+        pending_jobs = [job for job in pending_jobs if job['职位链接'] not in recorded_urls]
+        print(f"有 {len(pending_jobs)} 个上次未完成的职位需要获取详情")
     
-    # 保存为CSV文件
-    with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(job_list)
+    # 恢复运行时，日志中详情获取失败的职位重新加入重试队列
+    if len(journal):
+        for job in journal.iter_records():
+            if is_placeholder(job['职位详情']):
+                retry_queue.add(job)
     
-    print(f"\n职位信息已保存到CSV文件: {filename}")
-    return filename
-
-# 主函数
-def main():
     try:
-        # 设置起始页和结束页
-        start_page = 1
-        end_page = 5  # 可以根据需要修改爬取的页数
-        
         print(f"\n开始爬取1010兼职网，从第{start_page}页到第{end_page}页")
         
-        # 循环处理每一页
-        for page_num in range(start_page, end_page + 1):
-            page_url = f"https://sz.1010jz.com/job/index{page_num}.html"
-            process_page(page_url)
-            
-            # 每处理完一页，保存一次数据，防止中途出错导致数据丢失
-            if job_list:
-                temp_filename = f"1010兼职网职位信息_临时保存_第{page_num}页.json"
-                save_to_json(job_list, temp_filename)
-                temp_csv_filename = f"1010兼职网职位信息_临时保存_第{page_num}页.csv"
-                save_to_csv(job_list, temp_csv_filename)
+        if CRAWL_MODE == 'pipeline' and DETAIL_FETCH_MODE == 'http':
+            # 流水线方式：列表页与详情页并行，每个职位完成后写入日志
+            pages = [(page_num, f"https://sz.1010jz.com/job/index{page_num}.html") for page_num in range(start_page, end_page + 1)]
+            # 使用自适应调速时不再固定等待，翻页速度由调度器决定
+            page_delay = None if rate_scheduler is not None else lambda page_num: 2 + (page_num % 3)
+            run_pipeline(pages, extract_listing, workers=DETAIL_CONCURRENCY,
+                         queue_size=PIPELINE_QUEUE_SIZE, page_delay=page_delay,
+                         filter_jobs=seen_index.filter_new if seen_index else None,
+                         on_job=record_job, state=crawl_state, initial_jobs=pending_jobs)
+        else:
+            # 先处理上次未完成的职位
+            fetch_and_record(pending_jobs)
             
-            # 添加随机延迟，避免请求过于频繁
-            delay = 2 + (page_num % 3)  # 2-4秒的随机延迟
-            print(f"等待 {delay} 秒后继续...")
-            time.sleep(delay)
+            # 循环处理每一页
+            for page_num in range(start_page, end_page + 1):
+                page_url = f"https://sz.1010jz.com/job/index{page_num}.html"
+                with metrics.timer('process_page', page_url):
+                    has_new_jobs = process_page(page_url, page_num)
+                if not has_new_jobs:
+                    print("本页职位均已爬取过，停止翻页")
+                    break
+                
+                # 添加随机延迟，避免请求过于频繁；使用自适应调速时由调度器控制请求间隔
+                if rate_scheduler is None:
+                    delay = 2 + (page_num % 3)  # 2-4秒的随机延迟
+                    print(f"等待 {delay} 秒后继续...")
+                    with metrics.timer('page_delay', page_url):
+                        time.sleep(delay)
+        
+        # 重试详情获取失败的职位，成功后修正日志中的记录
+        retry_failed_details()
         
         # 打印爬取的职位数量
-        print(f"\n成功爬取 {len(job_list)} 个职位信息")
+        print(f"\n成功爬取 {len(journal)} 个职位信息")
         
-        # 保存最终结果
-        if job_list:
-            final_json_filename = save_to_json(job_list)
-            final_csv_filename = save_to_csv(job_list)
+        # 由日志流式生成最终结果
+        if len(journal):
+            final_filenames = finalize_journal()
+            sample_jobs = journal.head(5)
             
-            # 删除临时文件
-            for page_num in range(start_page, end_page + 1):
-                # 删除临时JSON文件
-                temp_json_filename = f"1010兼职网职位信息_临时保存_第{page_num}页.json"
-                if os.path.exists(temp_json_filename):
-                    try:
-                        os.remove(temp_json_filename)
-                    except:
-                        pass
-                
-                # 删除临时CSV文件
-                temp_csv_filename = f"1010兼职网职位信息_临时保存_第{page_num}页.csv"
-                if os.path.exists(temp_csv_filename):
-                    try:
-                        os.remove(temp_csv_filename)
-                    except:
-                        pass
+            # 最终文件生成后删除日志和爬取状态
+            journal.remove()
+            crawl_state.clear()
             
             # 打印部分职位信息作为示例
             print("\n以下是部分爬取的职位信息示例:")
-            for i, job in enumerate(job_list[:5], 1):
+            for i, job in enumerate(sample_jobs, 1):
                 print(f"\n职位 {i}:")
                 print(f"标题: {job['职位标题']}")
                 print(f"薪资: {job['薪资']} {job['薪资单位']}")
@@ -258,35 +539,69 @@ def main():
                 print(f"发布时间: {job['发布时间']}")
                 print(f"详情摘要: {job['职位详情'][:100]}..." if len(job['职位详情']) > 100 else f"详情: {job['职位详情']}")
             
-            print(f"\n完整数据已保存到JSON文件: {final_json_filename}")
-            print(f"完整数据已保存到CSV文件: {final_csv_filename}")
+            print(f"\n完整数据已保存到JSON文件: {final_filenames[0]}")
+            print(f"完整数据已保存到CSV文件: {final_filenames[1]}")
+            if len(final_filenames) > 2:
+                print(f"完整数据已保存到Parquet文件: {final_filenames[2]}")
         else:
             print("未爬取到任何职位信息")
+            journal.remove()
+            crawl_state.clear()
+    
+    except KeyboardInterrupt:
+        print(f"\n爬取已中断，已获取 {len(journal)} 个职位，可使用 --resume 从中断处继续")
     
     except Exception as e:
         print(f"主程序出错: {str(e)}")
-        # 如果出错，尝试保存已爬取的数据
-        if job_list:
-            error_json_filename = f"1010兼职网职位信息_错误恢复_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-            save_to_json(job_list, error_json_filename)
-            error_csv_filename = f"1010兼职网职位信息_错误恢复_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            save_to_csv(job_list, error_csv_filename)
-            print(f"已保存已爬取的 {len(job_list)} 个职位信息到JSON文件: {error_json_filename}")
-            print(f"已保存已爬取的 {len(job_list)} 个职位信息到CSV文件: {error_csv_filename}")
+        # 如果出错，由日志生成已爬取数据的恢复文件
+        if len(journal):
+            error_filenames = finalize_journal("1010兼职网职位信息_错误恢复")
+            print(f"已保存已爬取的 {len(journal)} 个职位信息到JSON文件: {error_filenames[0]}")
+            print(f"已保存已爬取的 {len(journal)} 个职位信息到CSV文件: {error_filenames[1]}")
+            if len(error_filenames) > 2:
+                print(f"已保存已爬取的 {len(journal)} 个职位信息到Parquet文件: {error_filenames[2]}")
+            print(f"职位日志保留在: {journal.path}")
+        print("可使用 --resume 从中断处继续爬取")
     
     finally:
-        # 关闭浏览器
-        try:
-            driver.quit()
+        metrics.increment('journal_bytes_written', journal.bytes_written)
+        journal.close()
+        if response_cache is not None:
+            stats = response_cache.stats()
+            print(f"HTTP缓存：命中 {stats['hits']} 次，重新验证 {stats['revalidated']} 次，下载 {stats['misses']} 次")
+            response_cache.close()
+        if seen_index is not None:
+            seen_index.close()
+        if near_duplicates is not None:
+            near_duplicates.close()
+        if job_store is not None:
+            job_store.close()
+        
+        # 输出各浏览器的页面加载耗时并关闭浏览器
+        driver_pool.print_timings()
+        if driver_pool.active:
+            driver_pool.close()
             print("浏览器已关闭")
-        except:
-            pass
+        
+        # 输出调速状态和运行指标
+        if rate_scheduler is not None:
+            rate_scheduler.print_status()
+        metrics.print_summary()
+        if METRICS_FILE_PREFIX:
+            metrics_json_filename, metrics_prom_filename = metrics.write_summary(METRICS_FILE_PREFIX)
+            print(f"运行指标已保存到: {metrics_json_filename}、{metrics_prom_filename}")
 
 # 执行主函数
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='1010兼职网爬虫程序')
+    parser.add_argument('--start-page', type=int, default=1, help='起始页')
+    parser.add_argument('--end-page', type=int, default=5, help='结束页')
+    parser.add_argument('--resume', action='store_true', help='从上次中断或出错的位置继续爬取')
+    args = parser.parse_args()
+    
     print("=== 1010兼职网爬虫程序 ===\n")
     print("本程序将爬取1010兼职网上的招聘信息，并保存为JSON和CSV文件")
     print("请确保您的计算机已安装Microsoft Edge浏览器和对应版本的WebDriver")
     print("程序开始运行...\n")
-    main()
+    main(args.start_page, args.end_page, args.resume)
     print("\n程序运行结束")
\ No newline at end of file
@@ -0,0 +1,269 @@
+# 分析图表的绘制。各分析函数先把数据汇总成很小的结果（分组计数、直方图计数和核密度曲线、箱线图统计量，
+# 见analysis_cube.py），再由本模块的绘制函数画图并保存为PNG。绘制函数只接收汇总结果，不接收整张表，可以在进程池中并行绘制
+# （每个进程使用无界面的Agg后端），也可以在当前进程中依次绘制：
+#   render_charts(charts, '可视化分析结果', workers=4)
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# 中文字体文件（微软雅黑），图表和词云使用；不存在时使用默认字体
+FONT_PATH = r'C:\Windows\Fonts\msyh.ttc'
+# 图表分辨率
+CHART_DPI = 300
+# 直方图的分组数，核密度曲线的点数
+HISTOGRAM_BINS = 20
+KDE_GRID_SIZE = 200
+# 计算核密度前先把数据分到这么多个小区间，计算量与数据量无关
+KDE_FINE_BINS = 2048
+# 箱线图的须为四分位距的多少倍（与matplotlib、seaborn默认相同）
+BOX_WHISKER = 1.5
+
+# 一张图表：render为本模块中的绘制函数，filename为保存的文件名，data为传给绘制函数的汇总结果（关键字参数）
+Chart = namedtuple('Chart', ['render', 'filename', 'data'])
+
+# 第一次绘图时设置好的pyplot和中文字体
+_pyplot = None
+_font = None
+
+
+# 存在的中文字体文件，没有时返回None
+def font_path():
+    return FONT_PATH if FONT_PATH and os.path.exists(FONT_PATH) else None
+
+
+# 导入matplotlib（第一次调用时设置图表风格和中文字体），返回 (pyplot, 中文字体)
+def prepare_charts():
+    global _pyplot, _font
+    if _pyplot is not None:
+        return _pyplot, _font
+    import matplotlib.pyplot as plt
+    from matplotlib.font_manager import FontProperties
+
+    # 设置图表风格（先设置风格，再设置字体，避免风格覆盖字体设置）
+    plt.style.use('ggplot')
+    # 设置中文字体（FontProperties在绘图时才读取字体文件，需要先检查文件是否存在）
+    if font_path():
+        # 使用微软雅黑字体
+        _font = FontProperties(fname=font_path())
+        plt.rcParams['font.sans-serif'] = ['Microsoft YaHei']
+    else:
+        print("警告：找不到微软雅黑字体，图表中文可能无法正常显示")
+        _font = FontProperties()
+        # 尝试使用其他可能存在的中文字体
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'SimSun', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
+    _pyplot = plt
+    return _pyplot, _font
+
+
+# 是否安装了wordcloud（只检查，不导入）
+def wordcloud_available():
+    from importlib.util import find_spec
+
+    return find_spec('wordcloud') is not None
+
+
+# ---------- 汇总 ----------
+
+def _finite(values):
+    values = np.asarray(values, dtype=float)
+    return values[~np.isnan(values)]
+
+
+# 直方图和核密度曲线，与seaborn的histplot(kde=True)相同：Scott带宽，曲线按频数缩放，只画在数据范围内。
+# weights为每个数值代表的原始数据个数（例如分位数草图中保存的数值），mean、median不为None时代替由数值计算的结果
+def histogram(values, bins=HISTOGRAM_BINS, weights=None, mean=None, median=None):
+    if weights is None:
+        values = _finite(values)
+        weights = np.ones(len(values))
+        mean = values.mean() if mean is None else mean
+        median = np.median(values) if median is None else median
+    values, weights = np.asarray(values, dtype=float), np.asarray(weights, dtype=float)
+    counts, edges = np.histogram(values, bins=bins, weights=weights)
+    total = weights.sum()
+    average = np.average(values, weights=weights)
+    if mean is None:
+        mean = average
+    if median is None:
+        order = np.argsort(values, kind='stable')
+        median = values[order][np.searchsorted(np.cumsum(weights[order]), total / 2)]
+    result = {'counts': counts, 'edges': edges, 'mean': mean, 'median': median, 'kde_x': None, 'kde_y': None}
+    # 样本标准差（按权重）
+    std = np.sqrt(np.average((values - average) ** 2, weights=weights) * total / (total - 1)) if total > 1 else 0.0
+    if std > 0:
+        bandwidth = std * total ** -0.2
+        # 先按小区间计数，再对区间中心计算核密度
+        fine_counts, fine_edges = np.histogram(values, bins=KDE_FINE_BINS, weights=weights)
+        centers = (fine_edges[:-1] + fine_edges[1:]) / 2
+        grid = np.linspace(values.min(), values.max(), KDE_GRID_SIZE)
+        kernel = np.exp(-0.5 * ((grid[:, None] - centers[None, :]) / bandwidth) ** 2)
+        density = kernel @ fine_counts / (total * bandwidth * np.sqrt(2 * np.pi))
+        result['kde_x'] = grid
+        result['kde_y'] = density * total * (edges[1] - edges[0])
+    return result
+
+
+# ---------- 绘制 ----------
+
+# 在当前子图中画直方图和核密度曲线
+def _draw_histogram(plt, hist):
+    plt.hist(hist['edges'][:-1], bins=hist['edges'], weights=hist['counts'], alpha=0.75, edgecolor='white')
+    if hist['kde_x'] is not None:
+        plt.plot(hist['kde_x'], hist['kde_y'])
+
+
+# 在当前子图中画箱线图，每个分组一个箱子
+def _draw_boxes(plt, stats):
+    ax = plt.gca()
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+    boxes = ax.bxp(stats, patch_artist=True, medianprops={'color': 'black'})
+    for index, box in enumerate(boxes['boxes']):
+        box.set_facecolor(colors[index % len(colors)])
+
+
+# 均值线、中位数线和图例
+def _mean_median_lines(plt, font, hist):
+    plt.axvline(hist['mean'], color='r', linestyle='--', label=f'均值: {hist["mean"]:.2f}')
+    plt.axvline(hist['median'], color='g', linestyle='-.', label=f'中位数: {hist["median"]:.2f}')
+    plt.legend(prop=font)
+
+
+# 各薪资单位的薪资分布，units为 [(子图序号, 子图数, 薪资单位, 直方图)]
+def render_unit_histograms(plt, font, units):
+    plt.figure(figsize=(12, 8))
+    for position, rows, unit, hist in units:
+        plt.subplot(rows, 1, position)
+        _draw_histogram(plt, hist)
+        plt.title(f'薪资分布 - {unit}', fontproperties=font)
+        plt.xlabel('薪资', fontproperties=font)
+        plt.ylabel('频数', fontproperties=font)
+        _mean_median_lines(plt, font, hist)
+    plt.tight_layout()
+
+
+# 一个数值的分布（直方图、核密度曲线、均值和中位数）
+def render_histogram(plt, font, hist, title, xlabel):
+    plt.figure(figsize=(12, 8))
+    _draw_histogram(plt, hist)
+    _mean_median_lines(plt, font, hist)
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel(xlabel, fontproperties=font, fontsize=14)
+    plt.ylabel('频数', fontproperties=font, fontsize=14)
+
+
+# 饼图，counts为分组计数（Series）
+def render_pie(plt, font, counts, title):
+    plt.figure(figsize=(10, 8))
+    plt.pie(counts, labels=counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.axis('equal')  # 保持饼图为圆形
+
+
+# 各分组的箱线图，stats为ax.bxp使用的箱线图统计量列表（见analysis_cube.summary_box_stats）
+def render_boxes(plt, font, stats, title, xlabel, ylabel):
+    plt.figure(figsize=(12, 8))
+    _draw_boxes(plt, stats)
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel(xlabel, fontproperties=font, fontsize=14)
+    plt.ylabel(ylabel, fontproperties=font, fontsize=14)
+    plt.xticks(rotation=45)
+
+
+# 堆叠柱状图，table的行为横轴分组，列为堆叠的分组
+def render_stacked_bar(plt, font, table, title, xlabel, ylabel, legend_title):
+    _, ax = plt.subplots(figsize=(14, 10))
+    table.plot(kind='bar', stacked=True, ax=ax)
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel(xlabel, fontproperties=font, fontsize=14)
+    plt.ylabel(ylabel, fontproperties=font, fontsize=14)
+    plt.legend(title=legend_title, prop=font)
+    plt.xticks(rotation=45)
+
+
+# 折线图（按日期的计数）
+def render_line(plt, font, series, title, xlabel, ylabel):
+    plt.figure(figsize=(14, 8))
+    series.plot(kind='line', marker='o')
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel(xlabel, fontproperties=font, fontsize=14)
+    plt.ylabel(ylabel, fontproperties=font, fontsize=14)
+    plt.grid(True)
+
+
+# 柱状图，data为Series（一组柱子）或DataFrame（每列一组柱子，显示图例）；rotation为横轴标签的旋转角度
+def render_bar(plt, font, data, title, xlabel, ylabel, figsize=(12, 8), rotation=None):
+    _, ax = plt.subplots(figsize=figsize)
+    data.plot(kind='bar', ax=ax)
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel(xlabel, fontproperties=font, fontsize=14)
+    plt.ylabel(ylabel, fontproperties=font, fontsize=14)
+    if rotation is not None:
+        plt.xticks(rotation=rotation, ha='right')
+    if data.ndim > 1:
+        plt.legend(prop=font)
+    if rotation is not None:
+        plt.tight_layout()
+
+
+# 关键词词云，frequencies为 {关键词: 出现次数}
+def render_wordcloud(plt, font, frequencies, title):
+    from wordcloud import WordCloud
+
+    wordcloud = WordCloud(width=800, height=400, background_color='white', font_path=font_path(),
+                          max_words=100).generate_from_frequencies(frequencies)
+    plt.figure(figsize=(16, 8))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.title(title, fontproperties=font, fontsize=16)
+
+
+# 关键词条形图（没有安装wordcloud时代替词云）
+def render_keyword_bars(plt, font, frequencies, title):
+    plt.figure(figsize=(14, 10))
+    plt.barh(list(frequencies.keys()), list(frequencies.values()))
+    plt.title(title, fontproperties=font, fontsize=16)
+    plt.xlabel('出现次数', fontproperties=font, fontsize=14)
+    plt.ylabel('关键词', fontproperties=font, fontsize=14)
+    plt.tight_layout()
+
+
+# 各关键词职位的薪资箱线图，keywords为 [(子图序号, 关键词, 箱线图统计量)]，5行2列
+def render_keyword_boxes(plt, font, keywords):
+    plt.figure(figsize=(14, 10))
+    for position, keyword, stats in keywords:
+        plt.subplot(5, 2, position)
+        _draw_boxes(plt, [stats])
+        plt.title(f'{keyword}职位薪资分布', fontproperties=font)
+        plt.ylabel('薪资', fontproperties=font)
+    plt.tight_layout()
+
+
+# 绘制一张图表并保存，返回文件路径
+def render_chart(chart, results_dir):
+    plt, font = prepare_charts()
+    chart.render(plt, font, **chart.data)
+    path = f"{results_dir}/{chart.filename}"
+    plt.savefig(path, dpi=CHART_DPI)
+    plt.close('all')
+    return path
+
+
+# 进程池中每个进程开始时调用：使用无界面的后端，字体文件与主进程相同
+def _init_worker(font_file):
+    global FONT_PATH
+    import matplotlib
+
+    matplotlib.use('Agg')
+    FONT_PATH = font_file
+
+
+# 绘制一组图表并保存到results_dir，返回文件路径列表；workers大于1时在进程池中并行绘制，为None时使用CPU核数
+def render_charts(charts, results_dir, workers=1):
+    os.makedirs(results_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(charts))
+    if workers <= 1:
+        return [render_chart(chart, results_dir) for chart in charts]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(FONT_PATH,)) as executor:
+        return list(executor.map(render_chart, charts, [results_dir] * len(charts)))
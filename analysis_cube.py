@@ -0,0 +1,221 @@
+# 分析用的汇总数据（聚合立方体）：各图表和HTML报告需要的分组统计（计数、总和、均值、最值、四分位数、箱线图的须和异常值、
+# 直方图、前N名、关键词统计）都从这里取。数据只取一次，每项汇总在第一次使用时计算并缓存，之后各图表和报告共用，
+# 不再为每张图表分别分组。分组统计按分组编号向量化计算（分类字段直接按分类编号），只排序一次，与分组数量无关。
+# 职位库（JobStore）使用StoreCube：计数、按日计数和前N名在库中分组，其余汇总只取回用到的一两个字段。
+#   cube = AnalysisCube(data)               # data为预处理后的DataFrame；职位库时为StoreCube(job_store)
+#   cube.group('薪资单位')                    # 每个薪资单位一行：count、sum、mean、min、q1、median、q3、max、whislo、whishi、fliers
+#   cube.box_stats('结算方式')                # ax.bxp使用的箱线图统计量
+#   cube.top('公司名称', 10)
+import numpy as np
+import pandas as pd
+
+from analysis_charts import BOX_WHISKER, histogram
+from job_store import has_columns
+from keyword_matcher import KeywordMatcher
+from publish_dates import PUBLISH_DATE_FIELD
+
+# 默认取出的字段（数据中没有的字段忽略）
+CUBE_COLUMNS = ['薪资', '薪资单位', '结算方式', '公司名称', PUBLISH_DATE_FIELD, '职位标题', '日薪', '时薪']
+# 分组统计的列
+SUMMARY_COLUMNS = ['count', 'sum', 'mean', 'min', 'q1', 'median', 'q3', 'max', 'whislo', 'whishi', 'fliers']
+
+
+# 线性插值的分位数（与numpy.percentile默认相同），sorted_values按组排好序，starts、counts为各组的起点和数量
+def _quantiles(sorted_values, starts, counts, q):
+    position = (counts - 1) * q
+    lower = np.floor(position).astype(np.int64)
+    upper = np.minimum(lower + 1, counts - 1)
+    fraction = position - lower
+    return sorted_values[starts + lower] * (1 - fraction) + sorted_values[starts + upper] * fraction
+
+
+# 按keys分组统计values，返回以分组为索引的DataFrame（列为SUMMARY_COLUMNS，fliers为不重复的异常值数组）。
+# 分组顺序：分类字段按分类顺序，其余按第一次出现的顺序；分组或数值缺失的行不计入
+def group_summary(keys, values, whisker=BOX_WHISKER):
+    keys = pd.Series(keys).reset_index(drop=True)
+    values = pd.to_numeric(pd.Series(values), errors='coerce').reset_index(drop=True)
+    keep = keys.notna() & values.notna()
+    keys = keys[keep]
+    codes, labels = pd.factorize(keys, sort=isinstance(keys.dtype, pd.CategoricalDtype))
+    values = values[keep].to_numpy(dtype=float)
+    if len(values) == 0:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS, index=pd.Index([], name=keys.name))
+
+    # 按 (分组, 数值) 排序一次，之后每组是连续的一段
+    order = np.lexsort((values, codes))
+    sorted_codes, sorted_values = codes[order], values[order]
+    counts = np.bincount(sorted_codes, minlength=len(labels))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    sums = np.bincount(sorted_codes, weights=sorted_values, minlength=len(labels))
+    q1, median, q3 = (_quantiles(sorted_values, starts, counts, q) for q in (0.25, 0.5, 0.75))
+
+    # 须为whisker倍四分位距内最远的数据点，须以外为异常值
+    iqr = q3 - q1
+    inside = ((sorted_values >= (q1 - whisker * iqr)[sorted_codes])
+              & (sorted_values <= (q3 + whisker * iqr)[sorted_codes]))
+    whislo = np.minimum.reduceat(np.where(inside, sorted_values, np.inf), starts)
+    whishi = np.maximum.reduceat(np.where(inside, sorted_values, -np.inf), starts)
+    outside = ~inside
+    # 已排序，相邻相同的 (分组, 数值) 只保留一个
+    distinct = np.ones(len(sorted_values), dtype=bool)
+    distinct[1:] = (sorted_codes[1:] != sorted_codes[:-1]) | (sorted_values[1:] != sorted_values[:-1])
+    flier_codes, flier_values = sorted_codes[outside & distinct], sorted_values[outside & distinct]
+    fliers = np.split(flier_values, np.cumsum(np.bincount(flier_codes, minlength=len(labels)))[:-1])
+
+    return pd.DataFrame({
+        'count': counts, 'sum': sums, 'mean': sums / counts,
+        'min': sorted_values[starts], 'q1': q1, 'median': median, 'q3': q3,
+        'max': sorted_values[starts + counts - 1], 'whislo': whislo, 'whishi': whishi, 'fliers': fliers,
+    }, index=pd.Index(np.asarray(labels, dtype=object), name=keys.name))
+
+
+# 由各分组的分位数草图（{分组: QuantileSketch}，见quantile_sketch.py）计算与group_summary相同的分组统计：
+# 数量、总和、均值、最值是精确的，四分位数为近似值，须和异常值由草图中保存的数值确定；没有数据的分组不计入
+def sketch_summary(sketches, name=None, whisker=BOX_WHISKER):
+    rows, labels = [], []
+    for label, sketch in sketches.items():
+        if not sketch.count:
+            continue
+        q1, median, q3 = sketch.quantiles([0.25, 0.5, 0.75])
+        iqr = q3 - q1
+        values = np.concatenate([[sketch.min, sketch.max], sketch.weighted_items()[0]])
+        inside = (values >= q1 - whisker * iqr) & (values <= q3 + whisker * iqr)
+        rows.append({'count': sketch.count, 'sum': sketch.sum, 'mean': sketch.sum / sketch.count,
+                     'min': sketch.min, 'q1': q1, 'median': median, 'q3': q3, 'max': sketch.max,
+                     'whislo': values[inside].min(), 'whishi': values[inside].max(),
+                     'fliers': np.unique(values[~inside])})
+        labels.append(label)
+    return pd.DataFrame(rows, columns=SUMMARY_COLUMNS, index=pd.Index(labels, dtype=object, name=name))
+
+
+# 分组统计转为ax.bxp使用的箱线图统计量列表
+def summary_box_stats(summary):
+    return [{'label': label, 'med': row['median'], 'q1': row['q1'], 'q3': row['q3'],
+             'whislo': row['whislo'], 'whishi': row['whishi'], 'fliers': row['fliers']}
+            for label, row in summary.iterrows()]
+
+
+class AnalysisCube:
+    # columns为需要的字段，默认为CUBE_COLUMNS（数据中没有的字段忽略）
+    def __init__(self, data, columns=None):
+        self.columns = [name for name in dict.fromkeys(columns or CUBE_COLUMNS) if has_columns(data, [name])]
+        self.frame = data[self.columns].reset_index(drop=True)
+        self.total = len(self.frame)
+        self._cache = {}
+
+    def _cached(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    # 计算一项汇总用到的数据，至少包含columns字段；not_null中的字段为空的行可以不包含（分组统计时本来就不计入）
+    def _select(self, columns, not_null=()):
+        return self.frame
+
+    # 数据中是否有这些字段
+    def has(self, *columns):
+        return all(name in self.columns for name in columns)
+
+    # 按dimension分组的value统计，见group_summary
+    def group(self, dimension, value='薪资'):
+        def compute():
+            frame = self._select([dimension, value], [dimension, value])
+            return group_summary(frame[dimension], frame[value])
+        return self._cached(('group', dimension, value), compute)
+
+    # 整体的value统计（一行，Series），没有数据时返回None
+    def summary(self, value='薪资'):
+        def compute():
+            frame = self._select([value], [value])
+            summary = group_summary(pd.Series(0, index=frame.index), frame[value])
+            return summary.iloc[0] if len(summary) else None
+        return self._cached(('summary', value), compute)
+
+    # 按dimension分组的箱线图统计量
+    def box_stats(self, dimension, value='薪资'):
+        return summary_box_stats(self.group(dimension, value))
+
+    # 数量最多的n个分组（按数量从多到少）
+    def top(self, dimension, n, value='薪资'):
+        return self.group(dimension, value).sort_values('count', ascending=False, kind='stable').head(n)
+
+    # 数量最多的分组
+    def most_common(self, dimension, value='薪资'):
+        return self.top(dimension, 1, value).index[0]
+
+    # 按一个或多个字段分组计数，返回以分组字段为索引的Series
+    def counts(self, dimensions):
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        return self._cached(('counts',) + tuple(dimensions),
+                            lambda: self.frame.groupby(dimensions, observed=True).size().rename('count'))
+
+    # value的直方图；指定dimension时为每个分组的直方图 {分组: (数量, 直方图)}，顺序与group相同
+    def histogram(self, value, dimension=None):
+        def compute():
+            if dimension is None:
+                return histogram(pd.to_numeric(self._select([value], [value])[value], errors='coerce').dropna())
+            frame = self._select([dimension, value], [dimension, value])
+            groups = frame.groupby(dimension, observed=True, sort=False)[value]
+            return {label: (row['count'], histogram(groups.get_group(label)))
+                    for label, row in self.group(dimension, value).iterrows()}
+        return self._cached(('histogram', value, dimension), compute)
+
+    # 按日期的发布数量（以日期为索引，按日期排列）
+    def daily_counts(self):
+        def compute():
+            counts = self.frame[PUBLISH_DATE_FIELD].value_counts(sort=False)
+            counts = counts.groupby(pd.to_datetime(counts.index).date).sum().sort_index()
+            counts.index.name = '发布日期'
+            return counts
+        return self._cached(('daily_counts',), compute)
+
+    # 职位标题关键词：返回 ({关键词: 出现次数}（从多到少，不含没有出现的关键词）, 按关键词分组的value统计)
+    def keywords(self, keywords, mode='longest', value='薪资'):
+        def compute():
+            frame = self._select(['职位标题', value])
+            matches = KeywordMatcher(keywords).match_matrix(frame['职位标题'], mode)
+            counts = dict(sorted(matches.keyword_counts().items(), key=lambda item: item[1], reverse=True))
+            # 每个 (行, 关键词) 匹配一行，一次分组得到所有关键词的统计
+            labels = pd.Series(np.asarray(matches.keywords, dtype=object)[matches.columns], name='关键词')
+            return counts, group_summary(labels, frame[value].to_numpy()[matches.rows])
+        return self._cached(('keywords', tuple(keywords), mode, value), compute)
+
+
+# 职位库（JobStore）的汇总数据：不把整张表读入pandas。计数、按日计数和前N名在库中分组（count_by、top_by），
+# 分位数、箱线图、直方图和关键词统计只取回用到的字段，为空的行在库中筛掉
+class StoreCube(AnalysisCube):
+    def __init__(self, store, columns=None):
+        self.store = store
+        self.columns = [name for name in dict.fromkeys(columns or CUBE_COLUMNS) if has_columns(store, [name])]
+        self.total = len(store)
+        self._cache = {}
+
+    # 相同字段的查询只执行一次（例如分组统计和各分组的直方图共用）
+    def _select(self, columns, not_null=()):
+        return self._cached(('select', tuple(columns), tuple(not_null)),
+                            lambda: self.store.select(columns, not_null=not_null))
+
+    # 在库中取数量最多的n个分组，只取回这些分组的value计算其余统计量
+    def top(self, dimension, n, value='薪资'):
+        def compute():
+            counts = self.store.top_by(dimension, n, not_null=[value])
+            frame = self.store.select([dimension, value], where={dimension: list(counts.index)},
+                                      not_null=[dimension, value])
+            return group_summary(frame[dimension], frame[value]).reindex(counts.index)
+        return self._cached(('top', dimension, n, value), compute)
+
+    def most_common(self, dimension, value='薪资'):
+        return self._cached(('most_common', dimension, value),
+                            lambda: self.store.top_by(dimension, 1, not_null=[value]).index[0])
+
+    def counts(self, dimensions):
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        return self._cached(('counts',) + tuple(dimensions), lambda: self.store.count_by(dimensions))
+
+    def daily_counts(self):
+        def compute():
+            counts = self.store.count_by(PUBLISH_DATE_FIELD)
+            counts.index = pd.to_datetime(counts.index).date
+            counts.index.name = '发布日期'
+            return counts
+        return self._cached(('daily_counts',), compute)
@@ -0,0 +1,220 @@
+# 分析脚本规模测试：用合成数据（synthetic_jobs.py）生成不同行数的数据集，对各分析函数逐个计时并测量内存峰值，
+# 找出随数据量增长变慢最快的步骤。每个数据量在单独的子进程中运行；内存不足等原因导致子进程退出时，
+# 保留已完成函数的结果，不再测试更大的数据量。
+# 用法：
+#   python benchmarks/bench_analysis.py                                        # 1万、10万、100万行
+#   python benchmarks/bench_analysis.py --sizes 10k 1M 10M --data-dir synthetic_data
+#   python benchmarks/bench_analysis.py --functions preprocess_data analyze_company
+#   python benchmarks/bench_analysis.py --output analysis_scaling.json
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import threading
+import time
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_crawl import peak_rss_mb
+from synthetic_jobs import write_synthetic
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 测试的函数，按分析脚本main()中的顺序
+ANALYSIS_FUNCTIONS = ['preprocess_data', 'analyze_salary', 'analyze_payment_type', 'analyze_publish_time',
+                      'analyze_company', 'analyze_job_title', 'generate_report']
+DEFAULT_SIZES = ['10k', '100k', '1M']
+# 两个数据量之间耗时增长的指数超过该值时标记为超线性
+SUPERLINEAR_EXPONENT = 1.2
+# 内存采样间隔（秒）
+MEMORY_SAMPLE_INTERVAL = 0.01
+
+
+# 解析“10k”“1M”形式的行数
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {'k': 10 ** 3, 'm': 10 ** 6}.get(text[-1:], 1)
+    return int(float(text.rstrip('km')) * multiplier)
+
+
+# 统计代码块执行期间进程内存（RSS）比开始时多出的峰值（MB），需要psutil，没有安装时为None
+class PeakMemory:
+    def __init__(self, interval=MEMORY_SAMPLE_INTERVAL):
+        self.interval = interval
+        self.increase_mb = None
+
+    def __enter__(self):
+        if psutil is None:
+            return self
+        self.process = psutil.Process()
+        self.start = self.peak = self.process.memory_info().rss
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._sample, daemon=True)
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            self.peak = max(self.peak, self.process.memory_info().rss)
+
+    def __exit__(self, exc_type, exc, tb):
+        if psutil is None:
+            return
+        self.stopped.set()
+        self.thread.join()
+        self.peak = max(self.peak, self.process.memory_info().rss)
+        self.increase_mb = (self.peak - self.start) / 1024 / 1024
+
+
+# 在子进程中对一个数据文件运行各函数，每完成一个函数就把 (函数名, 秒数, 内存峰值增量MB) 放入results
+def run_size(path, functions, results):
+    import matplotlib
+    from parquet_output import read_jobs
+
+    matplotlib.use('Agg')
+    # 没有中文字体时每张图都有缺字警告
+    warnings.filterwarnings('ignore')
+    analysis = importlib.import_module('职位数据可视化分析')
+    with tempfile.TemporaryDirectory() as results_dir:
+        with PeakMemory() as memory:
+            start = time.perf_counter()
+            data = read_jobs(path, analysis.ANALYSIS_COLUMNS)
+        results.put(('read_jobs', time.perf_counter() - start, memory.increase_mb))
+
+        # 其余函数都使用预处理后的数据，没有选择preprocess_data时也要先预处理（不计时）
+        if 'preprocess_data' not in functions:
+            with contextlib.redirect_stdout(io.StringIO()):
+                data = analysis.preprocess_data(data)
+        for name in functions:
+            with contextlib.redirect_stdout(io.StringIO()), PeakMemory() as memory:
+                start = time.perf_counter()
+                if name == 'preprocess_data':
+                    result = analysis.preprocess_data(data)
+                elif name == 'generate_report':
+                    result = analysis.generate_report(data, results_dir, source=path)
+                else:
+                    result = getattr(analysis, name)(data, results_dir)
+                elapsed = time.perf_counter() - start
+            if name == 'preprocess_data':
+                data = result
+            results.put((name, elapsed, memory.increase_mb))
+    results.put(('peak_rss', None, peak_rss_mb()))
+
+
+# 在新的子进程中测试一个数据量，返回 ({函数名: {'seconds', 'memory_mb'}}, 峰值内存MB, 错误信息或None)
+def measure_size(path, functions, timeout=None):
+    context = multiprocessing.get_context('spawn')
+    results = context.Queue()
+    process = context.Process(target=run_size, args=(path, functions, results))
+    process.start()
+    measured = {}
+    peak = None
+    deadline = time.monotonic() + timeout if timeout else None
+    finished = False
+    while not finished:
+        try:
+            name, seconds, memory_mb = results.get(timeout=1)
+        except queue.Empty:
+            if not process.is_alive():
+                break
+            if deadline is not None and time.monotonic() > deadline:
+                process.terminate()
+                process.join()
+                return measured, peak, f"超过 {timeout} 秒"
+            continue
+        if name == 'peak_rss':
+            peak = memory_mb
+            finished = True
+        else:
+            measured[name] = {'seconds': seconds, 'memory_mb': memory_mb}
+    process.join()
+    if process.exitcode != 0:
+        return measured, peak, f"子进程退出码 {process.exitcode}（可能内存不足）"
+    return measured, peak, None
+
+
+def format_cell(result):
+    if result is None:
+        return "-"
+    memory = f"{result['memory_mb']:.0f}MB" if result['memory_mb'] is not None else "-"
+    return f"{result['seconds']:.2f}s/{memory}"
+
+
+# 两个数据量之间耗时增长的指数：1为线性，2为平方
+def scaling_exponent(rows1, seconds1, rows2, seconds2):
+    if seconds1 <= 0 or seconds2 <= 0 or rows1 == rows2:
+        return None
+    return math.log(seconds2 / seconds1) / math.log(rows2 / rows1)
+
+
+def print_report(report, functions):
+    sizes = [entry['rows'] for entry in report]
+    names = ['read_jobs'] + functions
+    print(f"\n{'函数':<22}" + ''.join(f"{rows:>18,}" for rows in sizes) + f"{'增长指数':>10}{'微秒/行':>10}")
+    for name in names:
+        cells = [entry['functions'].get(name) for entry in report]
+        line = f"{name:<24}" + ''.join(f"{format_cell(cell):>18}" for cell in cells)
+        # 最后两个都完成的数据量之间的增长指数，以及最大数据量下每行的耗时
+        done = [(rows, cell['seconds']) for rows, cell in zip(sizes, cells) if cell is not None]
+        exponent = scaling_exponent(*done[-2], *done[-1]) if len(done) >= 2 else None
+        mark = " 超线性" if exponent is not None and exponent > SUPERLINEAR_EXPONENT else ""
+        line += f"{exponent:>12.2f}" if exponent is not None else f"{'-':>12}"
+        line += f"{done[-1][1] / done[-1][0] * 1e6:>11.2f}" if done else f"{'-':>11}"
+        print(line + mark)
+    print("（每格为耗时/内存峰值增量；增长指数为最后两个数据量之间耗时随行数增长的指数，1为线性）")
+    for entry in report:
+        peak = f"{entry['peak_rss_mb']:.0f} MB" if entry['peak_rss_mb'] is not None else "-"
+        status = f"，失败：{entry['error']}" if entry['error'] else ""
+        print(f"{entry['rows']:,} 行：子进程峰值内存 {peak}{status}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='分析脚本规模测试')
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help='数据量（行数），可写作10k、1M')
+    parser.add_argument('--functions', nargs='+', choices=ANALYSIS_FUNCTIONS, default=ANALYSIS_FUNCTIONS,
+                        help='测试的函数')
+    parser.add_argument('--data-dir', default=None, help='合成数据目录，已有相同行数的文件时直接使用；默认使用临时目录')
+    parser.add_argument('--seed', type=int, default=0, help='合成数据的随机种子')
+    parser.add_argument('--timeout', type=float, default=None, help='每个数据量的最长秒数')
+    parser.add_argument('--output', default=None, help='把结果保存为JSON文件')
+    args = parser.parse_args()
+
+    sizes = sorted(parse_size(size) for size in args.sizes)
+    functions = [name for name in ANALYSIS_FUNCTIONS if name in args.functions]
+    report = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = args.data_dir or temp_dir
+        os.makedirs(data_dir, exist_ok=True)
+        for rows in sizes:
+            path = os.path.join(data_dir, f"synthetic_{rows}_{args.seed}.parquet")
+            if not os.path.exists(path):
+                start = time.perf_counter()
+                write_synthetic(path, rows, seed=args.seed)
+                print(f"已生成 {rows:,} 行合成数据，耗时 {time.perf_counter() - start:.1f} 秒")
+            measured, peak, error = measure_size(path, functions, args.timeout)
+            report.append({'rows': rows, 'functions': measured, 'peak_rss_mb': peak, 'error': error})
+            total = sum(result['seconds'] for result in measured.values())
+            print(f"{rows:,} 行完成，共 {total:.1f} 秒" + (f"，失败：{error}" if error else ""))
+            if error:
+                break
+
+    print_report(report, functions)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=4)
+        print(f"\n结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+# 爬虫整体回放基准测试：在本地服务器上回放列表页和详情页（由样例数据生成，或响应缓存中录制的真实页面），
+# 可设置延迟、抖动和错误注入，驱动爬虫的process_page、get_job_details和流水线方式，
+# 输出页/秒、请求耗时p50/p99、峰值内存和WebDriver往返次数，并与保存的基线比较，变慢时返回非0退出码。
+# 用法：
+#   python benchmarks/bench_crawl.py                                # 不需要浏览器的方式，与基线比较
+#   python benchmarks/bench_crawl.py --latency 0.2 --jitter 0.1 --error-rate 0.05
+#   python benchmarks/bench_crawl.py --selenium                     # 同时测试浏览器方式（需要Edge浏览器）
+#   python benchmarks/bench_crawl.py --cache-dir .http_cache        # 回放响应缓存中录制的真实页面
+#   python benchmarks/bench_crawl.py --save-baseline                # 把本次结果保存为基线
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from urllib.error import URLError
+from urllib.request import urlopen
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from local_site import LocalSite, serve_site
+from site_fixtures import expand_jobs, load_sample_jobs, write_detail_pages, write_listing_pages, write_recorded_pages
+from webdriver_stats import CommandCounter
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# 基线文件
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baselines', 'bench_crawl.json')
+# 比基线差多少（比例）视为变慢
+DEFAULT_TOLERANCE = 0.2
+# 列表页获取失败时的重试次数
+LISTING_ATTEMPTS = 3
+# 回放时调度器的速率（次/秒），远高于本地服务器的处理能力，测到的是爬虫本身而不是调速
+UNTHROTTLED_RATE = 1e6
+
+# 测试方式：(列表页获取方式, 详情获取方式, 驱动方式)
+SCENARIOS = {
+    # 不需要浏览器：列表页用HTTP获取，测试爬虫其余部分（详情获取、结构化字段提取、写日志）的吞吐量
+    'process_page-http': ('http', 'http', 'process_page'),
+    'pipeline-http': ('http', 'http', 'pipeline'),
+    # 需要Edge浏览器
+    'process_page-selenium': ('browser', 'selenium', 'process_page'),
+    'process_page-browser': ('browser', 'http', 'process_page'),
+    'pipeline-browser': ('browser', 'http', 'pipeline'),
+}
+BROWSER_SCENARIOS = [name for name, (listing, _, _) in SCENARIOS.items() if listing == 'browser']
+
+# 运行中的爬虫模块（在测试子进程中导入）
+crawler = None
+
+
+# 记录每次阶段耗时的原始值，用于计算精确的分位数（运行指标本身只保留直方图）
+class StageRecorder:
+    def __init__(self, metrics):
+        self.samples = {}
+        observe = metrics.observe
+
+        def record(stage, seconds, label=None):
+            self.samples.setdefault(stage, []).append(seconds)
+            observe(stage, seconds, label)
+
+        metrics.observe = record
+
+    # 某阶段耗时的分位数（毫秒），没有记录时返回None
+    def percentile(self, stage, q):
+        values = sorted(self.samples.get(stage, []))
+        if not values:
+            return None
+        return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+# 当前进程的峰值内存（MB）
+def peak_rss_mb():
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # macOS上单位为字节，Linux上为KB
+        return peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024
+    try:
+        import psutil
+    except ImportError:
+        return None
+    info = psutil.Process().memory_info()
+    return getattr(info, 'peak_wset', info.rss) / 1024 / 1024
+
+
+# 不启动浏览器，用HTTP获取并解析列表页，经过与浏览器相同的调速器；只统计成功的那次请求本身的耗时
+def http_extract_listing(page_url):
+    from crawl_metrics import metrics
+    from listing_extractor import parse_listing_html, rows_to_jobs
+
+    html = None
+    for attempt in range(LISTING_ATTEMPTS):
+        start = crawler.begin_browser_request(page_url)
+        try:
+            with urlopen(page_url, timeout=10) as response:
+                html = response.read()
+            metrics.observe('listing_page', time.perf_counter() - start, page_url)
+            crawler.end_browser_request(page_url, start)
+            break
+        except (URLError, OSError):
+            crawler.end_browser_request(page_url, start, error=True)
+    return rows_to_jobs(parse_listing_html(html, page_url) or []) if html else []
+
+
+# 在子进程中运行一种测试方式，返回结果；每种方式使用新的进程，峰值内存和爬虫状态互不影响
+def run_scenario(name, page_urls, concurrency):
+    global crawler
+    from crawl_journal import JobJournal
+    from crawl_metrics import metrics
+    from crawl_pipeline import run_pipeline
+    from detail_fetcher import set_failure_policy, set_rate_scheduler
+    from detail_retry import AdaptiveTimeout, CircuitBreaker, RetryQueue
+    from rate_scheduler import RateScheduler
+
+    crawler = importlib.import_module('1010兼职网')
+    listing_mode, detail_mode, driver_mode = SCENARIOS[name]
+    recorder = StageRecorder(metrics)
+    counters = []
+    crawler.driver_pool.on_create = lambda driver: counters.append(CommandCounter(driver))
+
+    # 与main()相同的初始化，不使用增量索引、近似重复索引、职位库和响应缓存；
+    # 调度器不限速、不退避，并发上限固定为concurrency，否则测到的是RATE_INITIAL/RATE_MAX的限速
+    metrics.reset()
+    crawler.DETAIL_CONCURRENCY = concurrency
+    crawler.DETAIL_FETCH_MODE = detail_mode
+    crawler.seen_index = crawler.crawl_state = crawler.near_duplicates = crawler.job_store = None
+    crawler.rate_scheduler = RateScheduler(initial_rate=UNTHROTTLED_RATE, max_rate=UNTHROTTLED_RATE,
+                                           initial_concurrency=concurrency, max_concurrency=concurrency,
+                                           decrease_factor=1.0, backoff=0.0, max_backoff=0.0)
+    crawler.detail_timeout = AdaptiveTimeout(initial=crawler.DETAIL_TIMEOUT_MAX, minimum=crawler.DETAIL_TIMEOUT_MIN,
+                                             maximum=crawler.DETAIL_TIMEOUT_MAX)
+    crawler.circuit_breaker = CircuitBreaker(failure_threshold=crawler.CIRCUIT_FAILURE_THRESHOLD,
+                                             cooldown=crawler.CIRCUIT_COOLDOWN)
+    crawler.retry_queue = RetryQueue(max_attempts=crawler.DETAIL_MAX_RETRIES, breaker=crawler.circuit_breaker)
+    set_rate_scheduler(crawler.rate_scheduler)
+    set_failure_policy(crawler.detail_timeout, crawler.circuit_breaker)
+    if listing_mode == 'http':
+        crawler.extract_listing = http_extract_listing
+
+    with tempfile.TemporaryDirectory() as work:
+        crawler.journal = JobJournal(os.path.join(work, 'bench.journal.jsonl'), fieldnames=crawler.output_fields())
+        start = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if driver_mode == 'pipeline':
+                    run_pipeline(list(enumerate(page_urls, 1)), crawler.extract_listing, workers=concurrency,
+                                 queue_size=crawler.PIPELINE_QUEUE_SIZE, on_job=crawler.record_job)
+                else:
+                    for page_num, page_url in enumerate(page_urls, 1):
+                        crawler.process_page(page_url, page_num)
+            elapsed = time.perf_counter() - start
+        finally:
+            if crawler.driver_pool.active:
+                crawler.driver_pool.close()
+            crawler.journal.close()
+        jobs = len(crawler.journal)
+
+    detail_stage = 'selenium_detail' if detail_mode == 'selenium' else 'http_detail'
+    return {
+        'pages': len(page_urls),
+        'jobs': jobs,
+        'seconds': round(elapsed, 3),
+        'pages_per_second': round(len(page_urls) / elapsed, 3),
+        'jobs_per_second': round(jobs / elapsed, 2),
+        'detail_p50_ms': recorder.percentile(detail_stage, 0.5),
+        'detail_p99_ms': recorder.percentile(detail_stage, 0.99),
+        'listing_p50_ms': recorder.percentile('listing_page', 0.5),
+        'listing_p99_ms': recorder.percentile('listing_page', 0.99),
+        'peak_rss_mb': peak_rss_mb(),
+        'round_trips_per_page': round(sum(counter.count for counter in counters) / len(page_urls), 1),
+        'failed_details': len(crawler.retry_queue),
+    }
+
+
+# 生成本地站点，返回列表页的相对路径
+def build_site(root, args):
+    if args.cache_dir:
+        from response_cache import ResponseCache
+
+        cache = ResponseCache(args.cache_dir)
+        try:
+            paths = write_recorded_pages(cache, root)
+        finally:
+            cache.close()
+        # 按页码排序
+        paths.sort(key=lambda path: [int(part) if part.isdigit() else part for part in re.split(r'(\d+)', path)])
+        return paths[:args.pages]
+    # 原数据中获取详情失败的职位没有详情页，只循环使用有详情的职位
+    sample = write_detail_pages(load_sample_jobs(), root)
+    jobs = expand_jobs(sample, args.pages * args.jobs_per_page)
+    write_detail_pages(jobs[len(sample):], root)
+    return [f"job/index{page_num}.html" for page_num, _ in write_listing_pages(jobs, root, args.jobs_per_page)]
+
+
+# 基线中的键：测试方式和影响结果的参数
+def scenario_key(name, args):
+    source = 'recorded' if args.cache_dir else 'sample'
+    return (f"{name}|{source}|pages={args.pages}|latency={args.latency}|jitter={args.jitter}|"
+            f"errors={args.error_rate}|hangs={args.hang_rate}|concurrency={args.concurrency}")
+
+
+def load_baselines(path=BASELINE_FILE):
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baselines(baselines, path=BASELINE_FILE):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baselines, f, ensure_ascii=False, indent=4, sort_keys=True)
+
+
+# 与基线比较，返回变慢的项目描述
+def compare(result, baseline, tolerance):
+    regressions = []
+    if result['pages_per_second'] < baseline['pages_per_second'] * (1 - tolerance):
+        regressions.append(f"页/秒 {baseline['pages_per_second']} -> {result['pages_per_second']}")
+    for key, label in (('detail_p99_ms', '详情p99'), ('listing_p99_ms', '列表页p99'), ('peak_rss_mb', '峰值内存')):
+        if result.get(key) is not None and baseline.get(key) and result[key] > baseline[key] * (1 + tolerance):
+            regressions.append(f"{label} {baseline[key]:.1f} -> {result[key]:.1f}")
+    if result['round_trips_per_page'] > baseline.get('round_trips_per_page', 0):
+        regressions.append(f"每页WebDriver往返 {baseline['round_trips_per_page']} -> {result['round_trips_per_page']}")
+    return regressions
+
+
+def format_ms(value):
+    return f"{value:.1f}" if value is not None else "-"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='爬虫整体回放基准测试')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=None,
+                        help='测试方式，默认为不需要浏览器的方式（加--selenium时包括浏览器方式）')
+    parser.add_argument('--selenium', action='store_true', help='同时测试需要Edge浏览器的方式')
+    parser.add_argument('--pages', type=int, default=10, help='列表页数量')
+    parser.add_argument('--jobs-per-page', type=int, default=30, help='每个列表页的职位数量')
+    parser.add_argument('--cache-dir', default=None, help='回放该响应缓存目录中录制的真实页面，代替样例数据')
+    parser.add_argument('--latency', type=float, default=0.05, help='每个请求的固定延迟（秒）')
+    parser.add_argument('--jitter', type=float, default=0.02, help='每个请求额外的随机延迟上限（秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='返回503的请求比例')
+    parser.add_argument('--hang-rate', type=float, default=0.0, help='长时间无响应的请求比例')
+    parser.add_argument('--hang-seconds', type=float, default=15.0, help='无响应请求的等待秒数')
+    parser.add_argument('--seed', type=int, default=1010, help='错误注入的随机种子')
+    parser.add_argument('--concurrency', type=int, default=8, help='详情并发数')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE, help='比基线差多少（比例）视为变慢')
+    parser.add_argument('--baseline-file', default=BASELINE_FILE, help='基线文件')
+    parser.add_argument('--save-baseline', action='store_true', help='把本次结果保存为基线')
+    args = parser.parse_args()
+
+    scenarios = args.scenarios or [name for name in SCENARIOS if args.selenium or name not in BROWSER_SCENARIOS]
+    results = {}
+    with tempfile.TemporaryDirectory() as root:
+        paths = build_site(root, args)
+        print(f"已生成本地站点：{len(paths)} 个列表页，延迟 {args.latency} 秒，抖动 {args.jitter} 秒，"
+              f"错误比例 {args.error_rate}，无响应比例 {args.hang_rate}")
+        for name in scenarios:
+            site = LocalSite(root, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                             hang_rate=args.hang_rate, hang_seconds=args.hang_seconds, seed=args.seed)
+            with serve_site(site):
+                page_urls = [f"{site.base_url}/{path}" for path in paths]
+                # 每种方式使用新的子进程
+                with multiprocessing.get_context('spawn').Pool(1) as pool:
+                    result = pool.apply(run_scenario, (name, page_urls, args.concurrency))
+            result.update({'server_' + key: value for key, value in site.stats().items()})
+            results[name] = result
+            print(f"{name} 完成，耗时 {result['seconds']:.2f} 秒")
+
+    print(f"\n{'方式':<24}{'页/秒':>8}{'职位/秒':>9}{'详情p50':>9}{'详情p99':>9}{'列表p50':>9}{'列表p99':>9}"
+          f"{'峰值内存MB':>11}{'每页往返':>9}{'失败':>6}")
+    for name, result in results.items():
+        rss = f"{result['peak_rss_mb']:.0f}" if result['peak_rss_mb'] is not None else "-"
+        print(f"{name:<26}{result['pages_per_second']:>8.2f}{result['jobs_per_second']:>10.1f}"
+              f"{format_ms(result['detail_p50_ms']):>10}{format_ms(result['detail_p99_ms']):>10}"
+              f"{format_ms(result['listing_p50_ms']):>10}{format_ms(result['listing_p99_ms']):>10}"
+              f"{rss:>14}{result['round_trips_per_page']:>12}{result['failed_details']:>7}")
+    print("（耗时单位为毫秒）")
+
+    baselines = load_baselines(args.baseline_file)
+    if args.save_baseline:
+        recorded_at = datetime.now().isoformat(timespec='seconds')
+        for name, result in results.items():
+            baselines[scenario_key(name, args)] = dict(result, recorded_at=recorded_at)
+        save_baselines(baselines, args.baseline_file)
+        print(f"\n基线已保存到: {args.baseline_file}")
+        return
+
+    slower = False
+    for name, result in results.items():
+        baseline = baselines.get(scenario_key(name, args))
+        if baseline is None:
+            print(f"\n{name}：没有相同参数的基线，可用 --save-baseline 保存")
+            continue
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            slower = True
+            print(f"\n{name} 比基线（{baseline['recorded_at']}）变慢: " + "；".join(regressions))
+        else:
+            print(f"\n{name} 与基线（{baseline['recorded_at']}）相比没有变慢")
+    if slower:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# 职位详情获取基准测试：比较异步HTTP方式与原有Selenium标签页方式的吞吐量
+# 用法：
+#   python benchmarks/bench_detail_fetch.py                    # 只测试HTTP方式
+#   python benchmarks/bench_detail_fetch.py --selenium         # 同时测试Selenium标签页方式（需要Edge浏览器）
+#   python benchmarks/bench_detail_fetch.py --latency 0.2 --concurrency 1 4 8 16
+import argparse
+import importlib
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from detail_fetcher import fetch_job_details
+from local_site import serve_directory
+from site_fixtures import load_sample_jobs, local_url, write_detail_pages
+
+
+# 折叠空白后再比较，HTML渲染本身不保留连续空格
+def normalize_text(text):
+    return '\n'.join(' '.join(line.split()) for line in (text or '').strip().split('\n'))
+
+
+# 检查解析结果与样例数据是否一致，返回不一致的数量
+def count_mismatches(jobs, details, base_url):
+    mismatches = 0
+    for job in jobs:
+        if normalize_text(details.get(local_url(job['职位链接'], base_url))) != normalize_text(job['职位详情']):
+            mismatches += 1
+    return mismatches
+
+
+def bench_http(jobs, base_url, concurrency):
+    urls = [local_url(job['职位链接'], base_url) for job in jobs]
+    start = time.perf_counter()
+    details = fetch_job_details(urls, concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    return elapsed, count_mismatches(jobs, details, base_url)
+
+
+def bench_selenium(jobs, base_url):
+    crawler = importlib.import_module('1010兼职网')
+    details = {}
+    try:
+        start = time.perf_counter()
+        for job in jobs:
+            url = local_url(job['职位链接'], base_url)
+            details[url] = crawler.get_job_details(url)
+        elapsed = time.perf_counter() - start
+    finally:
+        crawler.driver_pool.print_timings()
+        crawler.driver_pool.close()
+    return elapsed, count_mismatches(jobs, details, base_url)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='职位详情获取基准测试')
+    parser.add_argument('--latency', type=float, default=0.05, help='本地服务器每个请求的模拟延迟（秒）')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16], help='HTTP方式的并发数')
+    parser.add_argument('--limit', type=int, default=None, help='最多测试的详情页数量')
+    parser.add_argument('--selenium', action='store_true', help='同时测试原有的Selenium标签页方式')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        jobs = write_detail_pages(load_sample_jobs(), root)[:args.limit]
+        print(f"已生成 {len(jobs)} 个本地详情页，模拟延迟 {args.latency} 秒")
+
+        with serve_directory(root, latency=args.latency) as base_url:
+            results = []
+            for concurrency in args.concurrency:
+                elapsed, mismatches = bench_http(jobs, base_url, concurrency)
+                results.append((f"HTTP 并发{concurrency}", elapsed, mismatches))
+            if args.selenium:
+                elapsed, mismatches = bench_selenium(jobs, base_url)
+                results.append(("Selenium 标签页", elapsed, mismatches))
+
+    print(f"\n{'方式':<16}{'耗时(秒)':>10}{'页/秒':>10}{'详情不一致':>12}")
+    for name, elapsed, mismatches in results:
+        print(f"{name:<16}{elapsed:>10.2f}{len(jobs) / elapsed:>10.1f}{mismatches:>12}")
+
+    baseline = results[-1][1] if args.selenium else None
+    if baseline:
+        for name, elapsed, _ in results[:-1]:
+            print(f"{name} 相对Selenium标签页方式加速 {baseline / elapsed:.1f} 倍")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+# 列表页提取基准测试：比较逐个元素提取、一次execute_script提取和解析页面源码三种方式
+# 用法：
+#   python benchmarks/bench_listing_extract.py               # 只测试lxml解析保存的列表页HTML
+#   python benchmarks/bench_listing_extract.py --selenium    # 在Edge中加载本地列表页，比较三种方式（需要Edge浏览器）
+import argparse
+import contextlib
+import importlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from listing_extractor import parse_listing_html, rows_to_jobs
+from local_site import serve_directory
+from site_fixtures import load_sample_jobs, render_listing_page, write_listing_pages
+from webdriver_stats import CommandCounter
+
+# 需要与样例数据一致的字段（职位详情在列表页中没有）
+COMPARED_FIELDS = ['职位标题', '薪资', '薪资单位', '结算方式', '公司名称', '发布时间', '职位链接']
+
+
+# 检查提取结果与样例数据是否一致，返回不一致的职位数量
+def count_mismatches(extracted, expected):
+    if len(extracted) != len(expected):
+        return abs(len(extracted) - len(expected)) + sum(1 for a, b in zip(extracted, expected)
+                                                         if any(a[k] != b[k] for k in COMPARED_FIELDS))
+    return sum(1 for a, b in zip(extracted, expected) if any(a[k] != b[k] for k in COMPARED_FIELDS))
+
+
+# 只测试HTML解析：不需要浏览器
+def bench_parse(pages, repeat):
+    base_url = 'https://sz.1010jz.com/job/index1.html'
+    documents = [(render_listing_page(jobs).encode('utf-8'), jobs) for _, jobs in pages]
+    mismatches = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for html, jobs in documents:
+            mismatches += count_mismatches(rows_to_jobs(parse_listing_html(html, base_url)), jobs)
+    elapsed = time.perf_counter() - start
+    parsed = len(documents) * repeat
+    print(f"\nlxml解析列表页: {parsed} 页，耗时 {elapsed:.3f} 秒，{parsed / elapsed:.1f} 页/秒，"
+          f"每页 {elapsed / parsed * 1000:.2f} 毫秒，不一致 {mismatches}")
+
+
+# 在浏览器中比较三种提取方式：调用爬虫的extract_listing，统计耗时和WebDriver往返次数
+def bench_selenium(pages, root, repeat):
+    crawler = importlib.import_module('1010兼职网')
+    # 整个测试使用同一个浏览器，避免中途重启影响计时
+    managed = crawler.driver_pool.acquire()
+    counter = CommandCounter(managed.driver)
+    results = []
+    try:
+        with serve_directory(root) as base_url:
+            for mode in ('elements', 'script', 'html'):
+                crawler.LISTING_EXTRACT_MODE = mode
+                elapsed = 0.0
+                round_trips = 0
+                mismatches = 0
+                for _ in range(repeat):
+                    for page_num, jobs in pages:
+                        page_url = f"{base_url}/job/index{page_num}.html"
+                        # 先加载页面，只统计提取本身；extract_listing_with中的driver.get会命中同一页面
+                        managed.driver.get(page_url)
+                        counter.take()
+                        start = time.perf_counter()
+                        with contextlib.redirect_stdout(io.StringIO()):
+                            extracted = crawler.extract_listing_with(managed, page_url)
+                        elapsed += time.perf_counter() - start
+                        round_trips += counter.take()
+                        expected = [dict(job, 职位链接=f"{base_url}/{job['职位链接'].split('/', 3)[3]}") for job in jobs]
+                        mismatches += count_mismatches(extracted, expected)
+                loaded = len(pages) * repeat
+                results.append((mode, elapsed / loaded, round_trips / loaded, mismatches))
+    finally:
+        crawler.driver_pool.close()
+
+    print(f"\n{'方式':<10}{'每页耗时(毫秒)':>16}{'每页WebDriver往返':>20}{'不一致':>8}")
+    for mode, per_page, trips, mismatches in results:
+        print(f"{mode:<10}{per_page * 1000:>16.1f}{trips:>20.1f}{mismatches:>8}")
+    baseline = results[0][1]
+    for mode, per_page, _, _ in results[1:]:
+        print(f"{mode} 相对逐个元素提取加速 {baseline / per_page:.1f} 倍")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='列表页提取基准测试')
+    parser.add_argument('--repeat', type=int, default=20, help='重复次数')
+    parser.add_argument('--selenium', action='store_true', help='在Edge浏览器中比较三种提取方式')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        pages = write_listing_pages(load_sample_jobs(), root)
+        print(f"已生成 {len(pages)} 个本地列表页")
+        bench_parse(pages, args.repeat)
+        if args.selenium:
+            bench_selenium(pages, root, max(1, args.repeat // 10))
+
+
+if __name__ == "__main__":
+    main()
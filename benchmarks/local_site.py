@@ -0,0 +1,94 @@
+# 在本地启动一个静态HTTP服务器，用于离线测试爬虫
+# 可以模拟网络延迟和抖动，并按比例注入错误响应（如503）和长时间无响应，用于测试调速、超时和重试
+import functools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+
+class LocalSite:
+    # latency为每个请求的固定延迟（秒），jitter为额外的随机延迟上限；error_rate比例的请求返回error_status，
+    # hang_rate比例的请求等待hang_seconds秒后才响应；seed固定时每次运行注入的错误相同
+    def __init__(self, root, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, hang_rate=0.0,
+                 hang_seconds=30.0, seed=None):
+        self.root = root
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.hang_rate = hang_rate
+        self.hang_seconds = hang_seconds
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.base_url = None
+        # 请求数、注入的错误数和无响应数
+        self.requests = 0
+        self.errors = 0
+        self.hangs = 0
+
+    # 决定一个请求的延迟和是否注入错误，返回 (延迟秒数, 错误状态码或None)
+    def plan(self):
+        with self.lock:
+            self.requests += 1
+            delay = self.latency + (self.random.uniform(0, self.jitter) if self.jitter else 0.0)
+            draw = self.random.random()
+            if draw < self.error_rate:
+                self.errors += 1
+                return delay, self.error_status
+            if draw < self.error_rate + self.hang_rate:
+                self.hangs += 1
+                return delay + self.hang_seconds, None
+            return delay, None
+
+    def stats(self):
+        with self.lock:
+            return {'requests': self.requests, 'errors': self.errors, 'hangs': self.hangs}
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    site = None
+
+    def do_GET(self):
+        delay, status = self.site.plan()
+        if delay:
+            time.sleep(delay)
+        if status:
+            self.send_response(status)
+            self.send_header('Retry-After', '1')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        super().do_GET()
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 默认的监听队列只有5，并发连接较多时会丢弃握手包，客户端约1秒后重试，测到的是服务器而不是爬虫
+class SiteServer(ThreadingHTTPServer):
+    request_queue_size = 128
+    daemon_threads = True
+
+
+# 以上下文管理器方式启动服务器，设置site.base_url（例如 http://127.0.0.1:8000）并返回site
+@contextmanager
+def serve_site(site):
+    handler = type('Handler', (QuietHandler,), {'site': site})
+    server = SiteServer(('127.0.0.1', 0), functools.partial(handler, directory=site.root))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    site.base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        yield site
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+# 以上下文管理器方式启动服务器，返回基础地址，例如 http://127.0.0.1:8000
+@contextmanager
+def serve_directory(root, latency=0.0):
+    with serve_site(LocalSite(root, latency=latency)) as site:
+        yield site.base_url
@@ -0,0 +1,182 @@
+# 根据已爬取的样例数据生成本地站点页面，供基准测试使用
+# 生成的详情页与1010兼职网保持相同的DOM层级，使原有XPath可以直接定位
+import html
+import json
+import os
+import re
+from urllib.parse import urlparse
+
+# 仓库自带的样例数据
+SAMPLE_JSON = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           '1010兼职网职位信息_20250506_170502.json')
+
+DETAIL_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>{title}_1010兼职网</title></head>
+<body>
+<div class="top">1010兼职网</div>
+<div class="nav"><a href="/">首页</a></div>
+<div class="search"><input type="text" name="q"></div>
+<div class="main">
+  <div class="crumb">当前位置：<a href="/job/">兼职</a></div>
+  <div class="content">
+    <span class="jobtitle"><h1>{title}</h1></span>
+    <span class="price">{price}元/{unit}</span>
+    <span class="payment_type">{payment}</span>
+    <span class="jobinfo">
+      <div class="company">{company}</div>
+      <div class="jobdetail">{detail}</div>
+    </span>
+  </div>
+</div>
+</body>
+</html>
+"""
+
+
+LISTING_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>深圳兼职_1010兼职网</title></head>
+<body>
+<div class="top">1010兼职网</div>
+<div class="nav"><a href="/">首页</a></div>
+<div class="search"><input type="text" name="q"></div>
+<div class="main">
+  <div class="left">
+    <div class="joblist">
+      <ul class="jobs">
+{items}
+      </ul>
+      <ul class="pager"><li><a href="/job/index2.html">下一页</a></li></ul>
+    </div>
+  </div>
+</div>
+</body>
+</html>
+"""
+
+LISTING_ITEM_TEMPLATE = """        <li>
+          <span class="jobtitle"><a href="/{path}" target="_blank">{title}</a></span>
+          <span class="price">{price}</span>
+          <span class="payment_type">{payment}</span>
+          <span class="listcompany"><a href="#">{company}</a></span>
+          <span class="listzptime"> {publish_time} </span>
+        </li>"""
+
+# 每个列表页的职位数量
+JOBS_PER_PAGE = 30
+
+# 职位链接中的职位ID
+JOB_ID_PATTERN = re.compile(r'/a(\d+)\.html')
+# 复制样例职位时，每一轮在职位ID上增加的偏移量，保证复制出的职位ID不重复
+COPY_ID_OFFSET = 10 ** 7
+
+
+# 读取样例职位数据
+def load_sample_jobs(path=SAMPLE_JSON):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+# 转义文本；连续空格用&nbsp;保留，与真实页面中浏览器显示的文本一致
+def escape_text(text):
+    return re.sub(r' (?= )', '&nbsp;', html.escape(str(text)))
+
+
+# 将职位详情文本渲染为HTML片段（换行转为<br>）
+def render_detail_text(text):
+    return '<br>\n'.join(escape_text(line) for line in text.split('\n'))
+
+
+# 渲染一个职位详情页
+def render_detail_page(job):
+    return DETAIL_TEMPLATE.format(
+        title=escape_text(job['职位标题']),
+        price=escape_text(str(job['薪资'])),
+        unit=escape_text(job['薪资单位']),
+        payment=escape_text(job['结算方式']),
+        company=escape_text(job['公司名称']),
+        detail=render_detail_text(job['职位详情']),
+    )
+
+
+# 渲染一个列表页
+def render_listing_page(jobs):
+    items = []
+    for job in jobs:
+        price = f"{job['薪资']}元/{job['薪资单位']}" if job['薪资单位'] else str(job['薪资'])
+        items.append(LISTING_ITEM_TEMPLATE.format(
+            path=url_path(job['职位链接']),
+            title=escape_text(job['职位标题']),
+            price=escape_text(price),
+            payment=escape_text(job['结算方式']),
+            company=escape_text(job['公司名称']),
+            publish_time=escape_text(job['发布时间']),
+        ))
+    return LISTING_TEMPLATE.format(items='\n'.join(items))
+
+
+# 职位链接在本地站点中对应的相对路径，例如 jiazheng/a1794984.html
+def url_path(job_url):
+    return urlparse(job_url).path.lstrip('/')
+
+
+# 把链接的域名部分替换为本地服务器地址
+def local_url(job_url, base_url):
+    return f"{base_url.rstrip('/')}/{url_path(job_url)}"
+
+
+# 循环使用样例职位生成count个职位，复制出的职位使用新的职位ID（链接不同，详情相同）
+def expand_jobs(jobs, count):
+    expanded = []
+    for index in range(count):
+        job = jobs[index % len(jobs)]
+        copy = index // len(jobs)
+        if copy:
+            link = JOB_ID_PATTERN.sub(lambda m: f"/a{int(m.group(1)) + copy * COPY_ID_OFFSET}.html", job['职位链接'])
+            job = dict(job, 职位链接=link)
+        expanded.append(job)
+    return expanded
+
+
+# 把响应缓存（response_cache.py）中录制的真实页面按URL路径写到目录中，页面中的站点地址改为根路径，
+# 使链接指向本地服务器；返回录制的列表页路径
+def write_recorded_pages(cache, root):
+    listing_paths = []
+    for entry in cache.iter_entries():
+        parsed = urlparse(entry.url)
+        path = os.path.join(root, parsed.path.lstrip('/'))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(entry.body.replace(f"{parsed.scheme}://{parsed.netloc}".encode(), b''))
+        if entry.page_type == 'listing':
+            listing_paths.append(parsed.path.lstrip('/'))
+    return listing_paths
+
+
+# 在目录中写出所有详情页，返回可获取到详情的职位列表
+def write_detail_pages(jobs, root):
+    written = []
+    for job in jobs:
+        # 原数据中获取失败的职位没有真实详情，不生成页面
+        if job['职位详情'] in ("无法获取职位详情", "获取职位详情时出错"):
+            continue
+        path = os.path.join(root, url_path(job['职位链接']))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(render_detail_page(job))
+        written.append(job)
+    return written
+
+
+# 在目录中写出列表页 job/index1.html、job/index2.html ...，返回 [(页码, 本页职位)]
+def write_listing_pages(jobs, root, per_page=JOBS_PER_PAGE):
+    pages = []
+    os.makedirs(os.path.join(root, 'job'), exist_ok=True)
+    for start in range(0, len(jobs), per_page):
+        page_num = start // per_page + 1
+        page_jobs = jobs[start:start + per_page]
+        with open(os.path.join(root, 'job', f'index{page_num}.html'), 'w', encoding='utf-8') as f:
+            f.write(render_listing_page(page_jobs))
+        pages.append((page_num, page_jobs))
+    return pages
@@ -0,0 +1,224 @@
+# 合成职位数据：生成与爬虫输出字段相同的职位信息（Parquet或CSV），用于测试分析脚本在大数据量下的表现。
+# 薪资、薪资单位和结算方式按样例数据的组合抽样并加扰动，公司按Zipf分布抽取（少数公司发布大量职位），
+# 发布时间为MM-DD且越近的日期越多，职位标题由地名、title_keywords.py中的关键词和常见后缀组成。
+# 按块生成并写入，内存占用与总行数无关；相同的行数和随机种子生成相同的数据。
+# 用法：
+#   python benchmarks/synthetic_jobs.py 1000000 -o 1010兼职网职位信息_合成.parquet
+#   python benchmarks/synthetic_jobs.py 100000 -o synthetic.csv --details
+import argparse
+import os
+import sys
+from datetime import date
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from crawl_journal import JOB_FIELDS
+from detail_fields import DAILY_RANGE, DETAIL_FIELDS
+from parquet_output import DICTIONARY_FIELDS, job_schema, parquet_available
+from publish_dates import PUBLISH_DATE_FIELD
+from site_fixtures import load_sample_jobs
+from title_keywords import TITLE_KEYWORDS
+
+# 输出字段，与爬虫合并重复发布、提取结构化字段时的输出相同
+SYNTHETIC_FIELDS = JOB_FIELDS + ['重复发布次数'] + DETAIL_FIELDS
+# 每次生成并写入的行数
+CHUNK_SIZE = 100000
+# 最后一个发布日期（与样例数据相同）和发布日期的天数范围
+END_DATE = date(2025, 5, 6)
+PUBLISH_DAYS = 60
+# 发布在最后一天的比例（样例数据中接近一半），其余按几何分布向前
+SAME_DAY_SHARE = 0.4
+# 公司数量为行数除以该值（不少于样例中的公司数），公司发布数量的Zipf指数
+ROWS_PER_COMPANY = 40
+COMPANY_ZIPF = 0.8
+# 薪资扰动倍数和各薪资单位的取整粒度
+SALARY_FACTORS = np.array([0.8, 0.9, 1.0, 1.0, 1.1, 1.25])
+SALARY_STEPS = {'小时': 1, '天': 10, '月': 100}
+
+TITLE_AREAS = ['坂田', '龙华', '福永', '宝安', '西乡', '沙井', '松岗', '观澜', '布吉', '横岗', '平湖', '龙岗',
+               '南山', '福田', '罗湖', '光明', '石岩', '民治', '大浪', '公明']
+TITLE_PREFIXES = ['', '', '急招', '长期招聘', '明天', '周末']
+TITLE_SUFFIXES = ['', '日结', '兼职', '大量要人', '包吃住', '工资日结', '学生可做']
+COMPANY_WORDS = ['华', '鑫', '盛', '达', '恒', '泰', '优', '邦', '诚', '信', '宏', '远', '佳', '瑞', '通', '安',
+                 '顺', '众', '合', '和', '丰', '创', '捷', '骏', '锦', '辉', '联', '智', '德', '新']
+COMPANY_TYPES = ['人力资源有限公司', '劳务派遣有限公司', '物流有限公司', '电子科技有限公司', '餐饮管理有限公司',
+                 '商贸有限公司', '企业管理咨询有限公司', '供应链有限公司', '文化传播有限公司', '家政服务有限公司']
+SHIFTS = [('08:00', '20:00', 12.0), ('09:00', '18:00', 9.0), ('20:00', '08:00', 12.0), ('18:00', '06:00', 12.0),
+          ('10:00', '22:00', 12.0), ('14:00', '22:00', 8.0), ('09:00', '21:00', 12.0), ('07:30', '16:30', 9.0)]
+STATIONS = ['坂田', '五和', '民治', '深圳北站', '西乡', '福永', '固戍', '布吉', '大运', '南联', '车公庙', '科学馆',
+            '宝安中心', '龙华', '清湖', '沙井', '松岗', '横岗', '塘坑', '后瑞']
+CONTACTS = ['张先生', '李女士', '王经理', '陈小姐', '刘先生', '黄女士', '赵经理', '周先生']
+PHONE_PREFIXES = ['138', '139', '135', '136', '186', '177', '159', '188']
+# 有结构化字段的职位比例
+SHIFT_SHARE = 0.5
+STATION_SHARE = 0.25
+CONTACT_SHARE = 0.2
+PHONE_SHARE = 0.3
+WECHAT_SHARE = 0.1
+
+
+# 由样例数据得到的抽样来源：(薪资, 薪资单位, 结算方式)组合、职位分类和公司名称
+def sample_sources(jobs):
+    combos = []
+    for job in jobs:
+        salary = pd.to_numeric(job.get('薪资'), errors='coerce')
+        combos.append((salary, job.get('薪资单位') or None, job.get('结算方式') or None))
+    categories = sorted({link.split('/')[3] for link in (job.get('职位链接') or '' for job in jobs) if link.count('/') >= 4})
+    companies = list(dict.fromkeys(job['公司名称'] for job in jobs if job.get('公司名称')))
+    return combos, categories, companies
+
+
+# 生成count个公司名称：样例中的公司在前，不足时按字号和行业组合生成
+def company_names(count, real_companies):
+    names = list(real_companies[:count])
+    for first, second, kind in product(COMPANY_WORDS, COMPANY_WORDS, COMPANY_TYPES):
+        if len(names) >= count:
+            break
+        names.append(f"深圳市{first}{second}{kind}")
+    # 组合用完后加序号
+    base = len(names)
+    while len(names) < count:
+        names.append(f"{names[len(names) % base]}第{len(names) // base}分公司")
+    return names
+
+
+def _pick(rng, values, size, share=1.0):
+    picked = np.asarray(values, dtype=object)[rng.integers(0, len(values), size)]
+    if share < 1.0:
+        picked[rng.random(size) >= share] = None
+    return picked
+
+
+# 生成一块职位数据，start为这块第一行的序号（用于生成不重复的职位链接）
+def generate_chunk(rng, size, start, sources, companies, company_weights, details=False, end_date=END_DATE):
+    combos, categories, _ = sources
+    picked = [combos[i] for i in rng.integers(0, len(combos), size)]
+    units = pd.Series([combo[1] for combo in picked], dtype=object)
+    pays = pd.Series([combo[2] for combo in picked], dtype=object)
+
+    # 薪资：样例中的薪资乘以扰动倍数，按薪资单位取整；样例中为“面议”的保持缺失
+    salary = np.array([combo[0] for combo in picked], dtype=float) * rng.choice(SALARY_FACTORS, size)
+    steps = units.map(SALARY_STEPS).fillna(10).to_numpy(dtype=float)
+    salary = np.round(salary / steps) * steps
+
+    # 发布日期：一部分在最后一天，其余越往前越少
+    offsets = np.where(rng.random(size) < SAME_DAY_SHARE, 0, rng.geometric(0.08, size))
+    offsets = np.minimum(offsets, PUBLISH_DAYS - 1)
+    dates = pd.to_datetime(end_date) - pd.to_timedelta(offsets, unit='D')
+
+    # 职位标题：前缀 + 地名 + 关键词 + 后缀
+    titles = (pd.Series(_pick(rng, TITLE_PREFIXES, size)) + pd.Series(_pick(rng, TITLE_AREAS, size))
+              + pd.Series(_pick(rng, TITLE_KEYWORDS, size)) + pd.Series(_pick(rng, TITLE_SUFFIXES, size)))
+    links = pd.Series(_pick(rng, categories, size)).radd('https://sz.1010jz.com/') + '/a' + \
+        pd.Series(np.arange(start, start + size) + 1000000).astype(str) + '.html'
+
+    # 结构化字段：按小时计薪的职位时薪即薪资，按天计薪的职位日薪即薪资，其余按时薪乘班次时长折算
+    shifts = rng.integers(0, len(SHIFTS), size)
+    has_shift = rng.random(size) < SHIFT_SHARE
+    shift_hours = np.where(has_shift, np.array([shift[2] for shift in SHIFTS])[shifts], np.nan)
+    hourly = np.where(units == '小时', salary, np.nan)
+    daily = np.where(units == '天', salary, hourly * shift_hours)
+    daily = np.where((daily >= DAILY_RANGE[0]) & (daily <= DAILY_RANGE[1]), daily, np.nan)
+    shift_start = np.where(has_shift, np.array([shift[0] for shift in SHIFTS], dtype=object)[shifts], None)
+    shift_end = np.where(has_shift, np.array([shift[1] for shift in SHIFTS], dtype=object)[shifts], None)
+    stations = _pick(rng, STATIONS, size, STATION_SHARE)
+    contacts = _pick(rng, CONTACTS, size, CONTACT_SHARE)
+    wechat = pd.Series(rng.integers(10 ** 7, 10 ** 8, size)).astype(str).radd('wx').to_numpy(dtype=object)
+    wechat[rng.random(size) >= WECHAT_SHARE] = None
+
+    frame = pd.DataFrame({
+        '职位标题': titles,
+        '薪资': salary,
+        '薪资单位': units,
+        '结算方式': pays,
+        '公司名称': np.asarray(companies, dtype=object)[rng.choice(len(companies), size, p=company_weights)],
+        '发布时间': dates.strftime('%m-%d'),
+        '职位详情': None,
+        '职位链接': links,
+        '重复发布次数': rng.geometric(0.7, size) - 1,
+        '时薪': hourly,
+        '班次开始': shift_start,
+        '班次结束': shift_end,
+        '班次时长': shift_hours,
+        '日薪': daily,
+        '地铁站': stations,
+        '联系人': contacts,
+        '电话前缀': _pick(rng, PHONE_PREFIXES, size, PHONE_SHARE),
+        '微信': wechat,
+    })
+    if details:
+        frame['职位详情'] = render_details(frame)
+    frame[PUBLISH_DATE_FIELD] = dates.as_unit('s')
+    return frame
+
+
+# 由字段拼出职位详情文本（与真实详情的写法相近，可以被detail_fields.py提取出相同的字段）
+def render_details(frame):
+    text = frame['职位标题'] + '\n'
+    shift = ('工作时间：' + frame['班次开始'] + '-' + frame['班次结束'] + '\n').fillna('')
+    pay = ('薪资：' + frame['薪资'].map('{:g}'.format) + '元/' + frame['薪资单位'] + '，'
+           + frame['结算方式'].fillna('') + '\n').fillna('')
+    station = ('地址：' + frame['地铁站'] + '地铁站附近\n').fillna('')
+    contact = ('联系人：' + frame['联系人'] + '\n').fillna('')
+    return text + shift + pay + station + contact
+
+
+# 按块生成rows个职位，返回DataFrame的迭代器；除输出字段外还有解析好的发布日期列
+def generate_jobs(rows, seed=0, chunk_size=CHUNK_SIZE, details=False, end_date=END_DATE):
+    sources = sample_sources(load_sample_jobs())
+    company_count = max(len(sources[2]), rows // ROWS_PER_COMPANY)
+    companies = company_names(company_count, sources[2])
+    weights = 1.0 / np.arange(1, company_count + 1) ** COMPANY_ZIPF
+    weights /= weights.sum()
+    for start in range(0, rows, chunk_size):
+        # 每块使用独立的随机数序列，结果与块大小以外的参数无关
+        rng = np.random.default_rng([seed, start])
+        yield generate_chunk(rng, min(chunk_size, rows - start), start, sources, companies, weights,
+                             details=details, end_date=end_date)
+
+
+# 生成rows个职位并保存到path（.parquet或.csv），返回path
+def write_synthetic(path, rows, seed=0, chunk_size=CHUNK_SIZE, details=False):
+    chunks = generate_jobs(rows, seed=seed, chunk_size=chunk_size, details=details)
+    if path.endswith('.parquet'):
+        if not parquet_available():
+            raise ImportError("写Parquet文件需要安装pyarrow")
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        from parquet_output import PARQUET_COMPRESSION
+
+        schema = job_schema(SYNTHETIC_FIELDS)
+        with pq.ParquetWriter(path, schema, compression=PARQUET_COMPRESSION, use_dictionary=True) as writer:
+            for frame in chunks:
+                for name in DICTIONARY_FIELDS & set(frame.columns):
+                    frame[name] = frame[name].astype('category')
+                writer.write_table(pa.Table.from_pandas(frame, preserve_index=False).cast(schema))
+        return path
+    # CSV与爬虫输出相同：没有解析好的发布日期列，缺失的薪资写为“面议”
+    with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+        for index, frame in enumerate(chunks):
+            frame = frame.drop(columns=[PUBLISH_DATE_FIELD])
+            frame['薪资'] = frame['薪资'].astype(object).where(frame['薪资'].notna(), '面议')
+            frame.to_csv(f, header=index == 0, index=False)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生成合成职位数据')
+    parser.add_argument('rows', type=int, help='职位数量')
+    parser.add_argument('-o', '--output', default=None, help='输出文件（.parquet或.csv），默认为 1010兼职网职位信息_合成_行数.parquet')
+    parser.add_argument('--seed', type=int, default=0, help='随机种子')
+    parser.add_argument('--details', action='store_true', help='同时生成职位详情文本（文件大很多）')
+    args = parser.parse_args()
+
+    output = args.output or f"1010兼职网职位信息_合成_{args.rows}.parquet"
+    write_synthetic(output, args.rows, seed=args.seed, details=args.details)
+    print(f"已生成 {args.rows} 个职位，保存到: {output}（{os.path.getsize(output) / 1024 / 1024:.1f} MB）")
+
+
+if __name__ == "__main__":
+    main()
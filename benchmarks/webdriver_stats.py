@@ -0,0 +1,17 @@
+# 统计WebDriver协议调用次数（每次调用都是一次到浏览器驱动的HTTP往返）
+class CommandCounter:
+    def __init__(self, driver):
+        self.count = 0
+        self._execute = driver.execute
+
+        def execute(*args, **kwargs):
+            self.count += 1
+            return self._execute(*args, **kwargs)
+
+        driver.execute = execute
+
+    # 读取并清零计数
+    def take(self):
+        count = self.count
+        self.count = 0
+        return count
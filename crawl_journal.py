@@ -0,0 +1,181 @@
+# 职位信息流式日志：每获取完一个职位就追加一行JSON到日志文件并定期fsync，
+# 结束时逐行读取日志生成最终的JSON和CSV文件（可选Parquet文件），内存占用与爬取页数无关。
+# 已写入的职位可以用patch追加修正行（例如重试成功后的职位详情），读取时按职位链接合并到原记录中，顺序不变；
+# 用discard追加的修正行则在读取时去掉该记录（例如重试成功后发现是近似重复的职位）。
+import csv
+import json
+import os
+import time
+from datetime import datetime
+
+# 输出文件的字段（CSV表头）
+JOB_FIELDS = ['职位标题', '薪资', '薪资单位', '结算方式', '公司名称', '发布时间', '职位详情', '职位链接']
+
+# 修正行的标记字段，值为要修正的职位链接
+PATCH_KEY = '__patch__'
+# 修正字段中表示去掉该记录的字段
+DISCARD_KEY = '__discard__'
+
+
+class JobJournal:
+    def __init__(self, path, fieldnames=None, fsync_every=20, fsync_interval=5.0):
+        self.path = path
+        self.fieldnames = fieldnames or JOB_FIELDS
+        # 每写入fsync_every条或距上次同步超过fsync_interval秒时fsync一次
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.count = 0
+        self.bytes_written = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # 日志中是否有修正行，没有时读取不需要先收集修正
+        self.has_patches = False
+        # 以追加方式打开，已有的日志内容保留
+        if os.path.exists(path):
+            for record in self._iter_lines():
+                if PATCH_KEY in record:
+                    self.has_patches = True
+                    if record['fields'].get(DISCARD_KEY):
+                        self.count -= 1
+                else:
+                    self.count += 1
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def __len__(self):
+        return self.count
+
+    # 追加一条职位信息
+    def append(self, job):
+        self._write_line(job)
+        self.count += 1
+
+    # 修正已写入的职位：fields中的字段覆盖职位链接为job_url的记录
+    def patch(self, job_url, fields):
+        self._write_line({PATCH_KEY: job_url, 'fields': fields})
+        self.has_patches = True
+
+    # 去掉已写入的职位：读取和生成最终文件时跳过职位链接为job_url的记录
+    def discard(self, job_url):
+        self.patch(job_url, {DISCARD_KEY: True})
+        self.count -= 1
+
+    def _write_line(self, record):
+        line = json.dumps(record, ensure_ascii=False) + '\n'
+        self._file.write(line)
+        self._file.flush()
+        self.bytes_written += len(line.encode('utf-8'))
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            self.sync()
+
+    # 把已写入的内容同步到磁盘
+    def sync(self):
+        if self._file.closed:
+            return
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if not self._file.closed:
+            self.sync()
+            self._file.close()
+
+    # 逐行读取日志中的职位信息（已合并修正）
+    def iter_records(self):
+        patches = self.patches() if self.has_patches else {}
+        for record in self._iter_lines():
+            if PATCH_KEY in record:
+                continue
+            fields = patches.get(record.get('职位链接'))
+            if fields:
+                if fields.get(DISCARD_KEY):
+                    continue
+                record.update(fields)
+            yield record
+
+    # 所有修正 {职位链接: 字段}，同一职位的多次修正按顺序合并
+    def patches(self):
+        patches = {}
+        for record in self._iter_lines():
+            if PATCH_KEY in record:
+                patches.setdefault(record[PATCH_KEY], {}).update(record['fields'])
+        return patches
+
+    # 逐行读取日志；进程被强制结束时最后一行可能不完整，直接跳过
+    def _iter_lines(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    # 读取前n条职位信息
+    def head(self, n):
+        records = []
+        for job in self.iter_records():
+            if len(records) >= n:
+                break
+            records.append(job)
+        return records
+
+    # 由日志流式生成JSON文件，格式与json.dump(job_list, f, ensure_ascii=False, indent=4)相同
+    def write_json(self, filename):
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write('[')
+            first = True
+            for job in self.iter_records():
+                f.write('\n' if first else ',\n')
+                first = False
+                text = json.dumps(job, ensure_ascii=False, indent=4)
+                f.write('\n'.join('    ' + line for line in text.split('\n')))
+            f.write(']' if first else '\n]')
+        return filename
+
+    # 由日志流式生成CSV文件
+    def write_csv(self, filename):
+        with open(filename, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=self.fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for job in self.iter_records():
+                writer.writerow(job)
+        return filename
+
+    # 由日志流式生成Parquet文件（需要pyarrow）
+    def write_parquet(self, filename):
+        from parquet_output import ParquetJobWriter
+        
+        with ParquetJobWriter(filename, self.fieldnames) as writer:
+            for job in self.iter_records():
+                writer.write(job)
+        return filename
+
+    # 生成最终的JSON和CSV文件，parquet为True时再生成Parquet文件；prefix为文件名前缀（不含时间戳和后缀）。
+    # 返回 (JSON文件名, CSV文件名) 或 (JSON文件名, CSV文件名, Parquet文件名)
+    def finalize(self, prefix="1010兼职网职位信息", parquet=False):
+        self.sync()
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_filename = self.write_json(f"{prefix}_{timestamp}.json")
+        print(f"\n职位信息已保存到文件: {json_filename}")
+        csv_filename = self.write_csv(f"{prefix}_{timestamp}.csv")
+        print(f"\n职位信息已保存到CSV文件: {csv_filename}")
+        if not parquet:
+            return json_filename, csv_filename
+        parquet_filename = self.write_parquet(f"{prefix}_{timestamp}.parquet")
+        print(f"\n职位信息已保存到Parquet文件: {parquet_filename}")
+        return json_filename, csv_filename, parquet_filename
+
+    # 删除日志文件
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
@@ -0,0 +1,192 @@
+# 爬取过程的运行指标：各阶段耗时直方图（driver.get、等待列表、详情获取、翻页等待、保存文件等），
+# 超时与回退次数（如“无法获取职位详情”）、写入字节数等计数；运行结束时输出摘要，
+# 写出JSON和Prometheus文本格式的指标文件，并列出明显偏慢的操作，便于根据数据调整并发数和等待时间。
+import heapq
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# 耗时直方图的桶上限（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# 每个阶段保留的最慢操作数量
+SLOWEST_KEPT = 10
+# 耗时超过该阶段中位数多少倍时视为慢操作
+OUTLIER_FACTOR = 3.0
+
+METRIC_NAME_PATTERN = re.compile(r'[^a-zA-Z0-9_]')
+
+
+class Histogram:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 每个桶的计数，最后一个为超过最大上限的部分（+Inf）
+        self.bucket_counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+        # 最慢的几次操作 [(耗时, 标签)]，小顶堆
+        self.slowest = []
+
+    def observe(self, seconds, label=None):
+        index = len(self.buckets)
+        for i, upper in enumerate(self.buckets):
+            if seconds <= upper:
+                index = i
+                break
+        self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += seconds
+        self.min = seconds if self.min is None else min(self.min, seconds)
+        self.max = seconds if self.max is None else max(self.max, seconds)
+        entry = (seconds, label or '')
+        if len(self.slowest) < SLOWEST_KEPT:
+            heapq.heappush(self.slowest, entry)
+        elif entry > self.slowest[0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    # 由桶计数估计分位数（桶内线性插值，与Prometheus的histogram_quantile相同）
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        cumulative = 0
+        lower = 0.0
+        for i, bucket_count in enumerate(self.bucket_counts):
+            upper = self.buckets[i] if i < len(self.buckets) else self.max
+            if bucket_count and cumulative + bucket_count >= rank:
+                # 估计值不超出实际观测到的范围
+                value = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(max(value, self.min), self.max)
+            cumulative += bucket_count
+            lower = upper
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 6),
+            'mean': round(self.sum / self.count, 6) if self.count else None,
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p90': self.quantile(0.9),
+            'p99': self.quantile(0.99),
+            'buckets': dict(zip([str(upper) for upper in self.buckets] + ['+Inf'], self.bucket_counts)),
+            'slowest': [{'seconds': seconds, 'label': label} for seconds, label in sorted(self.slowest, reverse=True)],
+        }
+
+
+class CrawlMetrics:
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        # 列表线程和详情协程会同时记录
+        self.lock = threading.Lock()
+        self.reset()
+
+    # 清空所有指标，重新开始计时
+    def reset(self):
+        with self.lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started_at = time.time()
+
+    # 记录一次阶段耗时，label一般为页面地址，用于列出慢操作
+    def observe(self, stage, seconds, label=None):
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram(self.buckets)
+            histogram.observe(seconds, label)
+
+    # 以上下文管理器方式记录一段代码的耗时（出错时也会记录）
+    @contextmanager
+    def timer(self, stage, label=None):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start, label)
+
+    # 计数加n（超时次数、回退次数、写入字节数等）
+    def increment(self, name, n=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def summary(self):
+        with self.lock:
+            return {
+                'started_at': datetime.fromtimestamp(self.started_at).isoformat(timespec='seconds'),
+                'duration': round(time.time() - self.started_at, 3),
+                'counters': dict(sorted(self.counters.items())),
+                'stages': {stage: histogram.to_dict() for stage, histogram in sorted(self.histograms.items())},
+            }
+
+    # 明显偏慢的操作：耗时超过所在阶段中位数factor倍的最慢记录，按耗时从长到短排列
+    def slow_outliers(self, factor=OUTLIER_FACTOR, limit=SLOWEST_KEPT):
+        outliers = []
+        with self.lock:
+            for stage, histogram in self.histograms.items():
+                median = histogram.quantile(0.5)
+                for seconds, label in histogram.slowest:
+                    if histogram.count > 1 and seconds > median * factor:
+                        outliers.append((seconds, stage, label))
+        outliers.sort(reverse=True)
+        return outliers[:limit]
+
+    # Prometheus文本格式
+    def to_prometheus(self, prefix='crawl'):
+        lines = []
+        with self.lock:
+            name = f"{prefix}_stage_seconds"
+            lines.append(f"# HELP {name} Time spent in each crawl stage.")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, histogram in sorted(self.histograms.items()):
+                cumulative = 0
+                for upper, bucket_count in zip(list(histogram.buckets) + ['+Inf'], histogram.bucket_counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{upper}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {histogram.count}')
+            for counter, value in sorted(self.counters.items()):
+                counter_name = f"{prefix}_{METRIC_NAME_PATTERN.sub('_', counter)}_total"
+                lines.append(f"# TYPE {counter_name} counter")
+                lines.append(f"{counter_name} {value}")
+        return '\n'.join(lines) + '\n'
+
+    # 写出JSON和Prometheus格式的指标文件，返回 (JSON文件名, Prometheus文件名)
+    def write_summary(self, prefix="1010兼职网爬取指标"):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        json_filename = f"{prefix}_{timestamp}.json"
+        prom_filename = f"{prefix}_{timestamp}.prom"
+        summary = self.summary()
+        summary['slow_outliers'] = [{'seconds': seconds, 'stage': stage, 'label': label}
+                                    for seconds, stage, label in self.slow_outliers()]
+        with open(json_filename, 'w', encoding='utf-8') as f:
+            json.dump(summary, f, ensure_ascii=False, indent=4)
+        with open(prom_filename, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        return json_filename, prom_filename
+
+    # 输出各阶段耗时、计数和慢操作
+    def print_summary(self):
+        summary = self.summary()
+        if summary['stages']:
+            print(f"\n{'阶段':<18}{'次数':>8}{'总耗时(秒)':>12}{'平均':>10}{'p50':>10}{'p99':>10}{'最长':>10}")
+            for stage, stat in summary['stages'].items():
+                print(f"{stage:<20}{stat['count']:>8}{stat['sum']:>14.2f}{stat['mean']:>10.3f}"
+                      f"{stat['p50']:>10.3f}{stat['p99']:>10.3f}{stat['max']:>10.3f}")
+        for counter, value in summary['counters'].items():
+            print(f"{counter}: {value}")
+        outliers = self.slow_outliers()
+        if outliers:
+            print("\n明显偏慢的操作:")
+            for seconds, stage, label in outliers:
+                print(f"  {stage} {seconds:.2f} 秒 {label}")
+
+
+# 全局指标，爬虫各模块共用
+metrics = CrawlMetrics()
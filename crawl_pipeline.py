@@ -0,0 +1,174 @@
+# 列表页与详情页重叠执行的生产者/消费者爬取流水线
+# 列表页（Selenium）在后台线程中逐页提取职位条目并放入有界队列，多个详情协程并发消费，
+# 这样列表页加载和翻页延迟期间详情获取不会停顿，详情较慢时队列写满会反过来让列表页等待。
+import asyncio
+import signal
+import threading
+import time
+
+from crawl_metrics import metrics
+from detail_fetcher import DETAIL_ERROR, create_session, fetch_job_detail
+
+# 通知详情协程退出的队列结束标记
+_DONE = object()
+
+
+class CrawlPipeline:
+    def __init__(self, extract_listing, workers=8, queue_size=64, page_delay=None, timeout=10, on_job=None,
+                 filter_jobs=None, keep_results=True, state=None, initial_jobs=()):
+        # extract_listing(page_url) 返回本页职位信息列表（职位详情为None）
+        self.extract_listing = extract_listing
+        # filter_jobs(page_jobs) 返回需要获取详情的新职位；整页都被过滤掉时停止翻页
+        self.filter_jobs = filter_jobs
+        # 可恢复的爬取状态（CrawlState），记录页码、条目进度和未完成的职位
+        self.state = state
+        # 恢复运行时上次未完成的职位，在第一页之前处理
+        self.initial_jobs = list(initial_jobs)
+        self.workers = workers
+        self.queue_size = queue_size
+        # page_delay(page_num) 返回处理完一页后的等待秒数
+        self.page_delay = page_delay
+        self.timeout = timeout
+        # 每个职位获取完详情后的回调
+        self.on_job = on_job
+        self.stop_event = threading.Event()
+        # {(页序号, 条目序号): 职位信息}，结束时按顺序合并；结果已由on_job写出时可不保留，节省内存
+        self.keep_results = keep_results
+        self.results = {}
+        self.jobs_done = 0
+        self.pages_done = 0
+
+    # 请求停止：不再读取新的列表页，已入队的职位继续处理完毕
+    def stop(self):
+        if not self.stop_event.is_set():
+            print("\n收到停止请求，等待已入队的职位详情处理完毕...")
+        self.stop_event.set()
+
+    # 生产者：在后台线程中运行，逐页提取职位并放入队列
+    def _produce(self, loop, queue, pages):
+        def put(key, job):
+            # 队列已满时阻塞，形成背压
+            asyncio.run_coroutine_threadsafe(queue.put((key, job)), loop).result()
+
+        for item_index, job in enumerate(self.initial_jobs):
+            put((-1, item_index), job)
+
+        for page_index, (page_num, page_url) in enumerate(pages):
+            if self.stop_event.is_set():
+                break
+            skip = self.state.begin_page(page_num) if self.state else 0
+            page_jobs = self.extract_listing(page_url)
+            if skip:
+                print(f"跳过本页已处理的前 {skip} 个职位")
+            listed = page_jobs[skip:]
+            new_jobs = listed
+            if self.filter_jobs and listed:
+                new_jobs = self.filter_jobs(listed)
+                print(f"本页 {len(listed)} 个职位中有 {len(listed) - len(new_jobs)} 个已爬取过，跳过详情获取")
+                if not new_jobs:
+                    print("本页职位均已爬取过，停止翻页")
+                    self.pages_done += 1
+                    break
+            new_ids = {id(job) for job in new_jobs}
+
+            page_finished = True
+            for item_index, job in enumerate(listed, skip):
+                if self.stop_event.is_set():
+                    page_finished = False
+                    break
+                if id(job) not in new_ids:
+                    continue
+                # 先记为未完成再入队，崩溃后恢复时不会遗漏
+                if self.state:
+                    self.state.add_pending(item_index + 1, [job])
+                put((page_index, item_index), job)
+            if not page_finished:
+                break
+            if self.state:
+                self.state.finish_page(page_num)
+            self.pages_done += 1
+
+            if self.page_delay and page_index < len(pages) - 1:
+                delay = self.page_delay(page_num)
+                print(f"等待 {delay} 秒后继续...")
+                # 等待期间详情协程继续工作；收到停止请求时立即结束等待
+                with metrics.timer('page_delay', page_url):
+                    self.stop_event.wait(delay)
+
+    # 消费者：从队列中取出职位并获取详情
+    async def _consume(self, session, queue, semaphore):
+        while True:
+            item = await queue.get()
+            try:
+                if item is _DONE:
+                    return
+                key, job = item
+                try:
+                    job['职位详情'] = await fetch_job_detail(session, job['职位链接'], semaphore)
+                except Exception as e:
+                    print(f"获取职位详情时出错: {job['职位链接']} {str(e)}")
+                    metrics.increment('detail_error')
+                    job['职位详情'] = DETAIL_ERROR
+                if self.keep_results:
+                    self.results[key] = job
+                self.jobs_done += 1
+                print(f"已添加职位: {job['职位标题']}")
+                if self.on_job:
+                    self.on_job(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, pages):
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=self.queue_size)
+        semaphore = asyncio.Semaphore(self.workers)
+        async with create_session(self.workers, self.timeout) as session:
+            consumers = [asyncio.ensure_future(self._consume(session, queue, semaphore)) for _ in range(self.workers)]
+            try:
+                await loop.run_in_executor(None, self._produce, loop, queue, pages)
+            finally:
+                # 列表阶段结束（完成、停止或出错）后，让消费者处理完剩余条目再退出
+                for _ in consumers:
+                    await queue.put(_DONE)
+                await asyncio.gather(*consumers)
+
+    # 按页面和条目顺序合并结果，与串行爬取的顺序一致
+    def merged(self):
+        return [self.results[key] for key in sorted(self.results)]
+
+    def run(self, pages):
+        # 第一次Ctrl+C平稳停止，第二次恢复默认行为立即中断
+        previous_handler = None
+        if threading.current_thread() is threading.main_thread():
+            def handle_interrupt(signum, frame):
+                signal.signal(signal.SIGINT, signal.default_int_handler)
+                self.stop()
+            previous_handler = signal.signal(signal.SIGINT, handle_interrupt)
+
+        start = time.perf_counter()
+        try:
+            asyncio.run(self._run(list(pages)))
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+            elapsed = time.perf_counter() - start
+            print(f"\n流水线结束：处理列表页 {self.pages_done} 个，获取职位 {self.jobs_done} 个，耗时 {elapsed:.1f} 秒")
+        # 被中断时已入队的职位处理完毕后再向调用方报告中断
+        if self.stop_event.is_set():
+            raise KeyboardInterrupt
+        return self.merged()
+
+
+# 运行流水线并把结果合并到job_list；出错或中断时也会先合并已完成的职位再抛出异常
+# job_list为None时不保留结果，职位只通过on_job回调输出
+def run_pipeline(pages, extract_listing, job_list=None, workers=8, queue_size=64, page_delay=None, on_job=None,
+                 filter_jobs=None, state=None, initial_jobs=()):
+    pipeline = CrawlPipeline(extract_listing, workers=workers, queue_size=queue_size,
+                             page_delay=page_delay, on_job=on_job, filter_jobs=filter_jobs,
+                             keep_results=job_list is not None, state=state, initial_jobs=initial_jobs)
+    try:
+        pipeline.run(pages)
+    finally:
+        if job_list is not None:
+            job_list.extend(pipeline.merged())
+    return job_list
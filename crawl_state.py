@@ -0,0 +1,154 @@
+# 可恢复的爬取状态：记录当前页、本页已交给详情获取的条目数以及尚未完成的职位，程序崩溃或被中断后可用 --resume 从中断处继续。
+# 每个职位的变化（交给详情获取、写入日志）只追加一行到变更日志（与职位日志一样定期fsync），开始和完成一页时
+# 才把完整状态原子写入状态文件并清空变更日志；读取时在状态文件上依次应用变更日志。
+import json
+import os
+import threading
+import time
+
+# 默认状态文件
+DEFAULT_STATE_FILE = "1010兼职网爬取状态.json"
+# 变更日志文件的后缀（接在状态文件名之后）
+DELTA_SUFFIX = '.delta.jsonl'
+
+
+class CrawlState:
+    def __init__(self, path=DEFAULT_STATE_FILE, journal_path=None, start_page=1, end_page=1,
+                 fsync_every=20, fsync_interval=5.0):
+        self.path = path
+        self.delta_path = path + DELTA_SUFFIX
+        self.journal_path = journal_path
+        self.start_page = start_page
+        self.end_page = end_page
+        # 当前正在处理的页码
+        self.page_num = start_page
+        # 当前页中已交给详情获取的列表条目数（按列表页原始顺序）
+        self.item_index = 0
+        # 已提取列表信息但尚未写入日志的职位 {职位链接: 职位信息}
+        self.pending = {}
+        # 变更日志每写入fsync_every行或距上次同步超过fsync_interval秒时fsync一次
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._delta_file = None
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        # 流水线方式下列表线程和详情协程会同时更新状态
+        self.lock = threading.Lock()
+
+    # 读取状态文件并应用变更日志，不存在时返回None
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_FILE):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        state = cls(path, data['journal_path'], data['start_page'], data['end_page'])
+        state.page_num = data['page_num']
+        state.item_index = data['item_index']
+        state.pending = data['pending']
+        for delta in state._iter_deltas():
+            state._apply(delta)
+        return state
+
+    # 逐行读取变更日志；进程被强制结束时最后一行可能不完整，直接跳过
+    def _iter_deltas(self):
+        if not os.path.exists(self.delta_path):
+            return
+        with open(self.delta_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    break
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+
+    def _apply(self, delta):
+        # 写入完整状态后、清空变更日志前中断时，日志中可能还有之前页面的条目数，只应用当前页的
+        if 'item_index' in delta and delta['page_num'] == self.page_num:
+            self.item_index = delta['item_index']
+        for job in delta.get('add', ()):
+            self.pending[job['职位链接']] = job
+        if 'done' in delta:
+            self.pending.pop(delta['done'], None)
+
+    # 追加一行变更（调用时已持有锁）
+    def _append_delta(self, delta):
+        if self._delta_file is None:
+            self._delta_file = open(self.delta_path, 'a', encoding='utf-8')
+        self._delta_file.write(json.dumps(delta, ensure_ascii=False) + '\n')
+        self._delta_file.flush()
+        self._unsynced += 1
+        if self._unsynced >= self.fsync_every or time.monotonic() - self._last_sync >= self.fsync_interval:
+            os.fsync(self._delta_file.fileno())
+            self._unsynced = 0
+            self._last_sync = time.monotonic()
+
+    def _close_delta(self):
+        if self._delta_file is not None:
+            self._delta_file.close()
+            self._delta_file = None
+
+    # 写入完整状态：先写临时文件再替换，保证状态文件任何时候都是完整的；之后清空变更日志
+    def save(self):
+        with self.lock:
+            data = {
+                'journal_path': self.journal_path,
+                'start_page': self.start_page,
+                'end_page': self.end_page,
+                'page_num': self.page_num,
+                'item_index': self.item_index,
+                'pending': self.pending,
+            }
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self._close_delta()
+            if os.path.exists(self.delta_path):
+                os.remove(self.delta_path)
+            self._unsynced = 0
+
+    # 开始处理某一页，返回需要跳过的已处理条目数
+    def begin_page(self, page_num):
+        with self.lock:
+            if page_num != self.page_num:
+                self.page_num = page_num
+                self.item_index = 0
+            skip = self.item_index
+        self.save()
+        return skip
+
+    # 列表条目已交给详情获取：item_index为本页已处理到的条目数，jobs为其中需要获取详情的职位
+    def add_pending(self, item_index, jobs=()):
+        with self.lock:
+            self.item_index = item_index
+            for job in jobs:
+                self.pending[job['职位链接']] = job
+            self._append_delta({'page_num': self.page_num, 'item_index': item_index, 'add': list(jobs)})
+
+    # 职位已写入日志
+    def complete(self, job):
+        with self.lock:
+            self.pending.pop(job['职位链接'], None)
+            self._append_delta({'done': job['职位链接']})
+
+    # 当前页已全部处理
+    def finish_page(self, page_num):
+        with self.lock:
+            self.page_num = page_num + 1
+            self.item_index = 0
+        self.save()
+
+    # 爬取完成后删除状态文件和变更日志
+    def clear(self):
+        with self.lock:
+            self._close_delta()
+        for path in (self.path, self.path + '.tmp', self.delta_path):
+            if os.path.exists(path):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
@@ -0,0 +1,208 @@
+# 1010兼职网职位详情的异步HTTP抓取模块
+# 使用连接池复用的HTTP客户端并发获取详情页，用lxml解析与Selenium相同的详情区块，
+# 从而避免每个职位都打开/切换/关闭一次浏览器标签页。
+import asyncio
+import re
+import time
+
+import aiohttp
+import lxml.html
+
+from crawl_metrics import metrics
+
+# 详情页中职位详情区块的XPath（与Selenium版本保持一致）
+DETAIL_XPATH = '/html/body/div[4]/div[2]/span[4]/div[2]'
+
+# 与原有Selenium流程相同的失败占位文本
+DETAIL_NOT_FOUND = "无法获取职位详情"
+DETAIL_ERROR = "获取职位详情时出错"
+
+# 模拟普通浏览器的请求头
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+                  '(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36 Edg/124.0.0.0',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'zh-CN,zh;q=0.9',
+}
+
+# HTTP响应缓存，通过set_response_cache设置
+response_cache = None
+# 请求调度器（RateScheduler），通过set_rate_scheduler设置
+rate_scheduler = None
+# 详情页的自适应等待时间（AdaptiveTimeout）和熔断器（CircuitBreaker），通过set_failure_policy设置
+detail_timeout = None
+circuit_breaker = None
+
+# 块级元素，提取文本时在其前后换行，尽量与Selenium的element.text一致
+BLOCK_TAGS = {'div', 'p', 'li', 'ul', 'ol', 'table', 'tr', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'}
+# 不可见元素，提取文本时跳过
+SKIP_TAGS = {'script', 'style', 'noscript'}
+# HTML源码中的连续空白在浏览器中显示为一个空格
+WHITESPACE = re.compile(r'[ \t\r\n\f]+')
+
+
+# 将lxml元素转换为与浏览器可见文本相近的字符串：<br>换行，块级元素另起一行，源码空白折叠
+def element_text(element):
+    lines = []
+    current = []
+
+    def end_line(force):
+        line = ''.join(current).replace('\xa0', ' ').strip()
+        current.clear()
+        if line or force:
+            lines.append(line)
+
+    def walk(node):
+        if not isinstance(node.tag, str) or node.tag in SKIP_TAGS:
+            return
+        if node.tag == 'br':
+            end_line(True)
+            return
+        is_block = node.tag in BLOCK_TAGS
+        if is_block:
+            end_line(False)
+        if node.text:
+            current.append(WHITESPACE.sub(' ', node.text))
+        for child in node:
+            walk(child)
+            if child.tail:
+                current.append(WHITESPACE.sub(' ', child.tail))
+        if is_block:
+            end_line(False)
+
+    walk(element)
+    end_line(False)
+    return '\n'.join(lines).strip()
+
+
+# 从详情页HTML中解析职位详情，找不到详情区块时返回None
+def parse_job_detail(html):
+    if not html:
+        return None
+    try:
+        document = lxml.html.document_fromstring(html)
+    except Exception:
+        return None
+    elements = document.getroottree().xpath(DETAIL_XPATH)
+    if not elements:
+        return None
+    return element_text(elements[0])
+
+
+# 设置所有HTTP请求共用的响应缓存（ResponseCache），为None时不使用缓存
+def set_response_cache(cache):
+    global response_cache
+    response_cache = cache
+
+
+# 设置所有HTTP请求共用的调度器（RateScheduler），为None时不限速
+def set_rate_scheduler(scheduler):
+    global rate_scheduler
+    rate_scheduler = scheduler
+
+
+# 设置详情页的自适应等待时间和熔断器，为None时使用会话的固定超时、不熔断
+def set_failure_policy(timeout=None, breaker=None):
+    global detail_timeout, circuit_breaker
+    detail_timeout = timeout
+    circuit_breaker = breaker
+
+
+# 获取一个页面的HTML，状态码不是200时返回None；timeout为请求本身的超时秒数，不含等待调度器名额的时间。
+# timing为字典时，真正发出请求的时刻（取得调度器名额之后）写入timing['start']，直接使用缓存时不写入
+async def fetch_html(session, url, timeout=None, timing=None):
+    kwargs = {'timeout': aiohttp.ClientTimeout(total=timeout)} if timeout is not None else {}
+    if response_cache is not None:
+        return await response_cache.fetch(session, url, rate_scheduler, timing, **kwargs)
+    if rate_scheduler is not None:
+        request = rate_scheduler.get(session, url, timing, **kwargs)
+    else:
+        if timing is not None:
+            timing['start'] = time.perf_counter()
+        request = session.get(url, **kwargs)
+    async with request as response:
+        if response.status != 200:
+            print(f"获取页面失败: {url} 状态码 {response.status}")
+            return None
+        return await response.read()
+
+
+# 把详情页的请求结果报告给熔断器，成功时的耗时用于调整等待时间（elapsed为None表示来自缓存，不计入）
+def record_result(job_url, ok, elapsed=None):
+    if circuit_breaker is not None:
+        circuit_breaker.record(job_url, ok)
+    if ok and elapsed is not None and detail_timeout is not None:
+        detail_timeout.observe(elapsed)
+
+
+# 获取单个职位详情，通过信号量限制并发数
+async def fetch_job_detail(session, job_url, semaphore):
+    async with semaphore:
+        # 站点熔断期间直接返回占位文本，稍后由重试队列重新获取
+        if circuit_breaker is not None and not circuit_breaker.allow(job_url):
+            metrics.increment('detail_deferred')
+            return DETAIL_NOT_FOUND
+        # 只统计请求本身的耗时：从取得调度器名额、真正发出请求时开始计时，不含排队等待的时间（另计为rate_wait）；
+        # 缓存命中时不计时
+        timing = {}
+        try:
+            # 超时只限制请求本身，等待调度器名额的时间不计入，否则并发排队的详情会在发出前就超时
+            timeout = detail_timeout.current() if detail_timeout is not None else None
+            html = await fetch_html(session, job_url, timeout, timing)
+        except asyncio.TimeoutError:
+            print(f"获取职位详情超时: {job_url}")
+            metrics.increment('detail_timeout')
+            record_result(job_url, False)
+            return DETAIL_NOT_FOUND
+        except aiohttp.ClientError as e:
+            print(f"打开职位详情页面失败: {job_url} {str(e)}")
+            metrics.increment('detail_error')
+            record_result(job_url, False)
+            return DETAIL_ERROR
+        finally:
+            if 'start' in timing:
+                metrics.observe('http_detail', time.perf_counter() - timing['start'], job_url)
+        if html is None:
+            metrics.increment('detail_not_found')
+            record_result(job_url, False)
+            return DETAIL_NOT_FOUND
+        record_result(job_url, True, time.perf_counter() - timing['start'] if 'start' in timing else None)
+
+    with metrics.timer('parse_detail', job_url):
+        job_detail = parse_job_detail(html)
+    if job_detail is None:
+        print(f"获取职位详情失败: {job_url} 未找到详情区块")
+        metrics.increment('detail_not_found')
+        return DETAIL_NOT_FOUND
+    metrics.increment('detail_bytes_downloaded', len(html))
+    return job_detail
+
+
+# 创建连接池大小与并发数一致的HTTP会话
+def create_session(concurrency=8, timeout=10, headers=None):
+    connector = aiohttp.TCPConnector(limit=concurrency, limit_per_host=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+    return aiohttp.ClientSession(connector=connector, timeout=client_timeout,
+                                 headers=headers or DEFAULT_HEADERS)
+
+
+# 并发获取多个职位详情，返回 {职位链接: 职位详情}
+async def fetch_job_details_async(job_urls, concurrency=8, timeout=10, headers=None):
+    semaphore = asyncio.Semaphore(concurrency)
+    async with create_session(concurrency, timeout, headers) as session:
+        # 去重后再请求，同一链接只获取一次
+        unique_urls = list(dict.fromkeys(job_urls))
+        details = await asyncio.gather(*(fetch_job_detail(session, url, semaphore) for url in unique_urls))
+    return dict(zip(unique_urls, details))
+
+
+# 同步调用入口，供原有的同步爬虫流程使用
+def fetch_job_details(job_urls, concurrency=8, timeout=10, headers=None):
+    if not job_urls:
+        return {}
+    start = time.perf_counter()
+    details = asyncio.run(fetch_job_details_async(job_urls, concurrency, timeout, headers))
+    elapsed = time.perf_counter() - start
+    rate = len(details) / elapsed if elapsed > 0 else 0
+    print(f"已通过HTTP获取 {len(details)} 个职位详情，耗时 {elapsed:.2f} 秒（{rate:.1f} 页/秒）")
+    return details
@@ -0,0 +1,183 @@
+# 从职位详情中提取结构化字段：时薪、班次时间和时长、折算日薪、地铁站、联系人、电话前缀、微信号。
+# 正则在导入时预编译；爬虫在每个职位入库时调用extract_detail_fields，
+# 历史数据用extract_detail_frame按列整体提取（pandas的str.extract），结果与逐条提取相同：
+#   python detail_fields.py 1010兼职网职位信息_20250506_170502.csv
+import argparse
+import os
+import re
+import sys
+
+# 提取出的字段（输出文件中追加在原有字段之后）
+DETAIL_FIELDS = ['时薪', '班次开始', '班次结束', '班次时长', '日薪', '地铁站', '联系人', '电话前缀', '微信']
+
+# 时薪：“18块一小时”“20元/小时”，或“时薪20”“小时工资20”
+HOURLY_PATTERN = re.compile(
+    r'(\d+(?:\.\d+)?)\s*(?:元|块钱|块|r|R)?\s*(?:/|一个|1个|一|每|1)\s*(?:小时|h|H)(?![a-zA-Z])'
+    r'|(?:时薪|小时工资|每小时)\s*[:：]?\s*(\d+(?:\.\d+)?)')
+# 班次时间：“17：00-5：00”“18:00__6:00”“8点-20点”，开始时间必须带冒号或“点”，避免匹配“20-48岁”
+SHIFT_PATTERN = re.compile(
+    r'(\d{1,2})\s*[:：点]\s*(\d{2})?\s*[-—~～至到_]+\s*(?:次日|第二天|晚上|早上|凌晨)?\s*(\d{1,2})\s*(?:[:：点]\s*(\d{2}))?')
+# 明确写出的日薪：“日薪200”“一天170”“180元/天”“（10小时170）”
+DAILY_PATTERN = re.compile(
+    r'(?:日薪|一天|每天|天薪)\s*[:：]?\s*(\d{2,4})(?![\d:：\-—~～])(?!\s*(?:小时|个小时|点|号|人|天))'
+    r'|(\d{2,4})\s*(?:元|块)?\s*/\s*天'
+    r'|\d{1,2}\s*个?小时\s*(\d{2,4})(?!\d)\s*(?:元|块)?\s*[)）]')
+# 地铁站：取“地铁站/地铁口”前面的文字，再用STATION_PREFIX_PATTERN去掉前面的线路、动词、日期和区名，
+# 剩下2到6个字的才作为站名
+METRO_PATTERN = re.compile(r'([一-龥A-Za-z0-9]{2,12}?)(?:地铁站|地铁口)')
+STATION_PREFIX_PATTERN = re.compile(
+    r'^(?:.*(?:号线|[到在近去往至的]))?(?:今天|明天|后天|本?周[一二三四五六日天]+)?(?:\d{1,2}[号日])?'
+    r'(?:深圳|龙岗|宝安|龙华|福田|南山|罗湖|盐田|光明|坪山|大鹏)?(?=[一-龥]{2})')
+STATION_LENGTH = (2, 6)
+# 合理的时薪和日薪范围，超出范围的多半是住宿费、餐补或月薪，不采用
+HOURLY_RANGE = (5, 300)
+DAILY_RANGE = (50, 2000)
+# 联系人：“联系人：张先生”或“王经理”
+CONTACT_PATTERN = re.compile(
+    r'联系人[ \t]*[:：]?[ \t]*([一-龥]{1,4}(?:先生|女士|小姐|经理)?)'
+    r'|([一-龥](?:先生|女士|小姐|经理))')
+# 手机号只保留前三位
+PHONE_PATTERN = re.compile(r'(?<!\d)(1[3-9]\d)(?:[\s-]?[\d*＊xX]){8}(?!\d)')
+# 微信号
+WECHAT_PATTERN = re.compile(
+    r'(?:微信|VX|vx|Vx|V信|v信|wx|WX|薇信|威信|加V|加v)\s*号?\s*[:：]?\s*([A-Za-z][-_A-Za-z0-9]{5,19}|1[3-9]\d{9})')
+
+
+# 班次时长（小时），结束时间不晚于开始时间时按跨夜计算
+def shift_hours(start_hour, start_minute, end_hour, end_minute):
+    hours = (end_hour + end_minute / 60 - start_hour - start_minute / 60) % 24
+    return round(hours, 2) if hours else None
+
+
+def _first(match):
+    if match is None:
+        return None
+    return next((group for group in match.groups() if group is not None), None)
+
+
+def _number(text):
+    return float(text) if text is not None else None
+
+
+# 在范围内的数值原样返回，否则返回None
+def _within(value, bounds):
+    return value if value is not None and bounds[0] <= value <= bounds[1] else None
+
+
+# 薪资列中的数字（可能是字符串或数字），不是数字时返回None
+def _price(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# 从单个职位提取结构化字段，返回 {字段: 值}，提取不到的为None
+def extract_detail_fields(job):
+    text = job.get('职位详情') or ''
+    fields = dict.fromkeys(DETAIL_FIELDS)
+
+    hourly = _number(_first(HOURLY_PATTERN.search(text)))
+    if hourly is None and job.get('薪资单位') == '小时':
+        hourly = _price(job.get('薪资'))
+    hourly = fields['时薪'] = _within(hourly, HOURLY_RANGE)
+
+    shift = SHIFT_PATTERN.search(text)
+    if shift:
+        start_hour, start_minute = int(shift.group(1)), int(shift.group(2) or 0)
+        end_hour, end_minute = int(shift.group(3)), int(shift.group(4) or 0)
+        if start_hour <= 24 and end_hour <= 24 and start_minute < 60 and end_minute < 60:
+            fields['班次开始'] = f"{start_hour % 24:02d}:{start_minute:02d}"
+            fields['班次结束'] = f"{end_hour % 24:02d}:{end_minute:02d}"
+            fields['班次时长'] = shift_hours(start_hour, start_minute, end_hour, end_minute)
+
+    # 日薪：优先使用明确写出的日薪，其次按时薪乘班次时长折算，最后使用按天计的薪资
+    daily = _number(_first(DAILY_PATTERN.search(text)))
+    if daily is None and hourly is not None and fields['班次时长'] is not None:
+        daily = round(hourly * fields['班次时长'], 2)
+    if daily is None and job.get('薪资单位') == '天':
+        daily = _price(job.get('薪资'))
+    fields['日薪'] = _within(daily, DAILY_RANGE)
+
+    metro = METRO_PATTERN.search(text)
+    if metro:
+        station = STATION_PREFIX_PATTERN.sub('', metro.group(1))
+        fields['地铁站'] = station if STATION_LENGTH[0] <= len(station) <= STATION_LENGTH[1] else None
+
+    fields['联系人'] = _first(CONTACT_PATTERN.search(text))
+    phone = PHONE_PATTERN.search(text)
+    fields['电话前缀'] = phone.group(1) if phone else None
+    wechat = WECHAT_PATTERN.search(text)
+    fields['微信'] = wechat.group(1) if wechat else None
+    return fields
+
+
+# 对整张表按列提取结构化字段，返回以DETAIL_FIELDS为列的DataFrame（索引与df相同）
+def extract_detail_frame(df):
+    import numpy as np
+    import pandas as pd
+
+    text = df['职位详情'].fillna('').astype(str)
+    unit = df['薪资单位'] if '薪资单位' in df.columns else pd.Series('', index=df.index)
+    price = pd.to_numeric(df['薪资'], errors='coerce') if '薪资' in df.columns else pd.Series(np.nan, index=df.index)
+    fields = pd.DataFrame(index=df.index)
+
+    hourly = pd.to_numeric(text.str.extract(HOURLY_PATTERN).bfill(axis=1).iloc[:, 0], errors='coerce')
+    hourly = hourly.where(hourly.notna(), price.where(unit == '小时'))
+    fields['时薪'] = hourly.where(hourly.between(*HOURLY_RANGE))
+
+    shift = text.str.extract(SHIFT_PATTERN).apply(pd.to_numeric)
+    start_hour, start_minute = shift[0], shift[1].fillna(0)
+    end_hour, end_minute = shift[2], shift[3].fillna(0)
+    valid = (start_hour <= 24) & (end_hour <= 24) & (start_minute < 60) & (end_minute < 60)
+    fields['班次开始'] = _clock(start_hour, start_minute).where(valid)
+    fields['班次结束'] = _clock(end_hour, end_minute).where(valid)
+    hours = ((end_hour + end_minute / 60 - start_hour - start_minute / 60) % 24).round(2)
+    fields['班次时长'] = hours.where(valid & (hours > 0))
+
+    daily = pd.to_numeric(text.str.extract(DAILY_PATTERN).bfill(axis=1).iloc[:, 0], errors='coerce')
+    daily = daily.where(daily.notna(), (fields['时薪'] * fields['班次时长']).round(2))
+    daily = daily.where(daily.notna(), price.where(unit == '天'))
+    fields['日薪'] = daily.where(daily.between(*DAILY_RANGE))
+
+    station = text.str.extract(METRO_PATTERN)[0].str.replace(STATION_PREFIX_PATTERN, '', regex=True)
+    fields['地铁站'] = station.where(station.str.len().between(*STATION_LENGTH))
+
+    fields['联系人'] = text.str.extract(CONTACT_PATTERN).bfill(axis=1).iloc[:, 0]
+    fields['电话前缀'] = text.str.extract(PHONE_PATTERN)[0]
+    fields['微信'] = text.str.extract(WECHAT_PATTERN)[0]
+    return fields
+
+
+# “时:分”形式的时间，缺失值保持缺失
+def _clock(hour, minute):
+    formatted = (hour % 24).astype('Int64').astype(str).str.zfill(2) + ':' + minute.astype('Int64').astype(str).str.zfill(2)
+    return formatted.where(hour.notna())
+
+
+def main():
+    import pandas as pd
+
+    parser = argparse.ArgumentParser(description='从职位详情中提取结构化字段')
+    parser.add_argument('input', help='职位信息CSV文件')
+    parser.add_argument('-o', '--output', default=None, help='输出CSV文件，默认为 <输入文件名>_fields.csv')
+    parser.add_argument('--overwrite', action='store_true', help='允许输出文件覆盖已有的文件（包括输入文件）')
+    args = parser.parse_args()
+
+    # 默认写入新文件，不覆盖原始快照
+    output = args.output or os.path.splitext(args.input)[0] + '_fields.csv'
+    if os.path.exists(output) and not args.overwrite:
+        print(f"错误：输出文件 {output} 已存在，如需覆盖请加上 --overwrite")
+        sys.exit(1)
+
+    df = pd.read_csv(args.input)
+    fields = extract_detail_frame(df)
+    df = pd.concat([df.drop(columns=[name for name in DETAIL_FIELDS if name in df.columns]), fields], axis=1)
+    df.to_csv(output, index=False, encoding='utf-8-sig')
+    print(f"已提取 {len(df)} 个职位的结构化字段，保存到: {output}")
+    for name in DETAIL_FIELDS:
+        print(f"  {name}: {fields[name].notna().sum()} 个")
+
+
+if __name__ == "__main__":
+    main()
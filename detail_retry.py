@@ -0,0 +1,125 @@
+# 职位详情获取失败的处理：
+#   AdaptiveTimeout：根据实际加载耗时计算等待时间（平均耗时 + 4倍波动，限制在上下限之间），代替固定等待10秒
+#   CircuitBreaker：同一站点连续失败过多时暂停详情获取一段时间，期间的职位直接记为失败，不再逐个等待超时
+#   RetryQueue：失败的职位先以占位文本写入日志，运行结束前按指数退避重试，成功后在日志中修正原记录
+import time
+from urllib.parse import urlsplit
+
+from crawl_metrics import metrics
+from detail_fetcher import DETAIL_ERROR, DETAIL_NOT_FOUND
+
+
+# 职位详情是否为失败时的占位文本
+def is_placeholder(detail):
+    return detail is None or detail in (DETAIL_NOT_FOUND, DETAIL_ERROR)
+
+
+class AdaptiveTimeout:
+    def __init__(self, initial=10.0, minimum=3.0, maximum=10.0):
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        # 耗时的平滑平均值和平均偏差（与TCP重传超时的计算方法相同）
+        self.mean = None
+        self.deviation = 0.0
+
+    # 记录一次成功加载的耗时
+    def observe(self, seconds):
+        if self.mean is None:
+            self.mean = seconds
+            self.deviation = seconds / 2
+        else:
+            self.deviation = 0.75 * self.deviation + 0.25 * abs(seconds - self.mean)
+            self.mean = 0.875 * self.mean + 0.125 * seconds
+
+    # 当前的等待时间（秒）
+    def current(self):
+        if self.mean is None:
+            return self.initial
+        return min(self.maximum, max(self.minimum, self.mean + 4 * self.deviation))
+
+
+class CircuitBreaker:
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        # 连续失败多少次后暂停
+        self.failure_threshold = failure_threshold
+        # 暂停的秒数，之后重新放行请求，再次失败时立即重新暂停
+        self.cooldown = cooldown
+        # {主机: 连续失败次数}
+        self.failures = {}
+        # {主机: 暂停结束时间}
+        self.open_until = {}
+
+    # 是否允许向该地址发出请求
+    def allow(self, url):
+        return self.wait_time(url) <= 0
+
+    # 距离允许请求还需等待的秒数
+    def wait_time(self, url):
+        return max(0.0, self.open_until.get(urlsplit(url).netloc, 0.0) - time.monotonic())
+
+    # 记录请求结果
+    def record(self, url, ok):
+        host = urlsplit(url).netloc
+        if ok:
+            if self.failures.get(host, 0) >= self.failure_threshold:
+                print(f"[熔断] {host} 已恢复，继续获取职位详情")
+            self.failures[host] = 0
+            return
+        self.failures[host] = self.failures.get(host, 0) + 1
+        if self.failures[host] >= self.failure_threshold and self.allow(url):
+            self.open_until[host] = time.monotonic() + self.cooldown
+            metrics.increment('circuit_open')
+            print(f"[熔断] {host} 连续失败 {self.failures[host]} 次，暂停获取职位详情 {self.cooldown:.0f} 秒")
+
+
+class RetryQueue:
+    def __init__(self, max_attempts=3, base_delay=5.0, max_delay=60.0, breaker=None):
+        self.max_attempts = max_attempts
+        # 第n次重试前等待 base_delay * 2**(n-1) 秒，不超过max_delay
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.breaker = breaker
+        # {职位链接: [职位信息, 已重试次数, 下次重试时间]}
+        self.entries = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    # 加入一个详情获取失败的职位
+    def add(self, job):
+        if job['职位链接'] not in self.entries:
+            self.entries[job['职位链接']] = [job, 0, time.monotonic() + self.base_delay]
+
+    # 按指数退避重试所有职位：fetch(jobs)返回 {职位链接: 职位详情}，成功的职位调用on_success(job, detail)；
+    # 返回最终仍然失败的职位
+    def run(self, fetch, on_success):
+        failed = []
+        while self.entries:
+            now = time.monotonic()
+            next_try = min(entry[2] for entry in self.entries.values())
+            # 站点处于熔断状态时等到恢复再重试
+            if self.breaker is not None:
+                next_try = max(next_try, now + max(self.breaker.wait_time(url) for url in self.entries))
+            if next_try > now:
+                print(f"等待 {next_try - now:.1f} 秒后重试 {len(self.entries)} 个职位详情...")
+                time.sleep(next_try - now)
+            due = [entry for entry in self.entries.values() if entry[2] <= time.monotonic()]
+            details = fetch([entry[0] for entry in due])
+            for entry in due:
+                job = entry[0]
+                detail = details.get(job['职位链接'])
+                if not is_placeholder(detail):
+                    del self.entries[job['职位链接']]
+                    metrics.increment('retry_succeeded')
+                    on_success(job, detail)
+                    continue
+                entry[1] += 1
+                if entry[1] >= self.max_attempts:
+                    del self.entries[job['职位链接']]
+                    metrics.increment('retry_gave_up')
+                    print(f"职位详情重试 {entry[1]} 次仍然失败: {job['职位链接']}")
+                    failed.append(job)
+                else:
+                    entry[2] = time.monotonic() + min(self.max_delay, self.base_delay * 2 ** entry[1])
+        return failed
@@ -0,0 +1,242 @@
+# Edge浏览器池：按需启动（第一次使用时才启动浏览器），每个浏览器加载一定页数或内存增长过多后自动重启，
+# 使用前做健康检查，可选的轻量配置会屏蔽图片、字体、样式表等爬取用不到的资源，并记录每个浏览器的页面加载耗时。
+import queue
+import statistics
+import threading
+import time
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.edge.options import Options
+from selenium.webdriver.support.ui import WebDriverWait
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+# 轻量配置中屏蔽的资源（Chrome DevTools协议的URL通配符）
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.svg', '*.ico', '*.bmp',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*.css', '*.mp4', '*.mp3',
+]
+
+# 每加载多少页检查一次浏览器内存
+MEMORY_CHECK_INTERVAL = 10
+
+
+# 创建Edge浏览器选项，lightweight为True时屏蔽图片、字体和样式表
+def create_edge_options(headless=False, lightweight=True):
+    edge_options = Options()
+    if headless:
+        edge_options.add_argument('--headless')
+    # 添加一些额外的选项，使爬虫更稳定
+    edge_options.add_argument('--disable-gpu')
+    edge_options.add_argument('--no-sandbox')
+    edge_options.add_argument('--disable-dev-shm-usage')
+    edge_options.add_argument('--disable-extensions')
+    if lightweight:
+        edge_options.add_experimental_option('prefs', {
+            'profile.managed_default_content_settings.images': 2,
+            'profile.managed_default_content_settings.stylesheets': 2,
+            'profile.managed_default_content_settings.fonts': 2,
+        })
+    return edge_options
+
+
+# 浏览器进程及其子进程占用的内存（MB），没有安装psutil时返回None
+def browser_memory_mb(driver):
+    if psutil is None:
+        return None
+    try:
+        process = psutil.Process(driver.service.process.pid)
+        processes = [process] + process.children(recursive=True)
+        return sum(p.memory_info().rss for p in processes) / 1024 / 1024
+    except Exception:
+        return None
+
+
+class ManagedDriver:
+    def __init__(self, driver_id, driver, wait_timeout=10):
+        self.driver_id = driver_id
+        self.driver = driver
+        self.wait = WebDriverWait(driver, wait_timeout)
+        self.pages_loaded = 0
+        self.started_at = time.time()
+        self.load_times = []
+        self.baseline_memory = browser_memory_mb(driver)
+        self.memory = self.baseline_memory
+
+    # 加载页面并记录耗时
+    def get(self, url):
+        start = time.perf_counter()
+        try:
+            self.driver.get(url)
+        finally:
+            self.record_load(time.perf_counter() - start)
+
+    # 记录一次页面加载（例如在新标签页中打开的详情页），每隔几页检查一次内存
+    def record_load(self, elapsed):
+        self.load_times.append(elapsed)
+        self.pages_loaded += 1
+        if self.pages_loaded % MEMORY_CHECK_INTERVAL == 0:
+            self.memory = browser_memory_mb(self.driver)
+
+    # 相对启动时增长的内存（MB），无法获取时返回0
+    def memory_growth(self):
+        if self.memory is None or self.baseline_memory is None:
+            return 0
+        return self.memory - self.baseline_memory
+
+    # 健康检查：能执行脚本并且至少有一个窗口
+    def is_healthy(self):
+        try:
+            return self.driver.execute_script('return 1') == 1 and len(self.driver.window_handles) > 0
+        except Exception:
+            return False
+
+    def quit(self):
+        try:
+            self.driver.quit()
+        except Exception:
+            pass
+
+
+class DriverPool:
+    def __init__(self, size=1, max_pages=200, max_memory_growth_mb=500, headless=False, lightweight=True,
+                 page_load_timeout=30, wait_timeout=10, on_create=None):
+        self.size = size
+        # 每个浏览器最多加载的页数，为None时不按页数重启
+        self.max_pages = max_pages
+        # 内存增长超过该值（MB）时重启，需要psutil
+        self.max_memory_growth_mb = max_memory_growth_mb
+        self.headless = headless
+        self.lightweight = lightweight
+        self.page_load_timeout = page_load_timeout
+        self.wait_timeout = wait_timeout
+        # 每启动一个浏览器后调用 on_create(driver)
+        self.on_create = on_create
+        self.available = queue.Queue()
+        self.lock = threading.Lock()
+        self.started = 0
+        self.recycled = 0
+        self.next_id = 1
+        # 已退出浏览器的页面加载统计，{浏览器编号: 加载耗时列表}
+        self.retired_timings = {}
+        self.active = {}
+
+    def _start(self):
+        with self.lock:
+            driver_id = self.next_id
+            self.next_id += 1
+        print(f"正在启动Edge浏览器（#{driver_id}）...")
+        try:
+            driver = webdriver.Edge(options=create_edge_options(self.headless, self.lightweight))
+        except Exception as e:
+            print(f"启动Edge浏览器失败: {str(e)}")
+            print("请确保已安装Microsoft Edge浏览器和对应版本的WebDriver")
+            with self.lock:
+                self.started -= 1
+            raise
+        driver.set_page_load_timeout(self.page_load_timeout)
+        if self.lightweight:
+            # 屏蔽偏好设置覆盖不到的资源（例如CSS中引用的字体和背景图片）
+            try:
+                driver.execute_cdp_cmd('Network.enable', {})
+                driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+            except Exception as e:
+                print(f"设置资源屏蔽失败: {str(e)}")
+        if self.on_create:
+            self.on_create(driver)
+        managed = ManagedDriver(driver_id, driver, self.wait_timeout)
+        with self.lock:
+            self.active[driver_id] = managed
+        print(f"Edge浏览器启动成功！（#{driver_id}）")
+        return managed
+
+    def _retire(self, managed, reason):
+        print(f"重启浏览器 #{managed.driver_id}（{reason}，已加载 {managed.pages_loaded} 页）")
+        managed.quit()
+        with self.lock:
+            self.active.pop(managed.driver_id, None)
+            self.retired_timings[managed.driver_id] = managed.load_times
+            self.started -= 1
+            self.recycled += 1
+
+    # 取出一个浏览器：优先复用空闲的，数量未达上限时启动新的，否则等待
+    def acquire(self):
+        while True:
+            try:
+                managed = self.available.get_nowait()
+            except queue.Empty:
+                with self.lock:
+                    can_start = self.started < self.size
+                    if can_start:
+                        self.started += 1
+                if can_start:
+                    return self._start()
+                managed = self.available.get()
+            if managed.is_healthy():
+                return managed
+            self._retire(managed, "健康检查失败")
+
+    # 归还浏览器，达到页数或内存上限时退出，下次使用时重新启动
+    def release(self, managed):
+        with self.lock:
+            closed = managed.driver_id not in self.active
+        # 浏览器池关闭时仍在使用的浏览器已经退出，不再放回
+        if closed:
+            return
+        if self.max_pages and managed.pages_loaded >= self.max_pages:
+            self._retire(managed, f"达到 {self.max_pages} 页上限")
+        elif self.max_memory_growth_mb and managed.memory_growth() > self.max_memory_growth_mb:
+            self._retire(managed, f"内存增长 {managed.memory_growth():.0f} MB")
+        else:
+            self.available.put(managed)
+
+    # 以上下文管理器方式使用浏览器
+    @contextmanager
+    def driver(self):
+        managed = self.acquire()
+        try:
+            yield managed
+        finally:
+            self.release(managed)
+
+    # 每个浏览器的页面加载耗时统计
+    def timings(self):
+        with self.lock:
+            all_timings = dict(self.retired_timings)
+            all_timings.update({driver_id: managed.load_times for driver_id, managed in self.active.items()})
+        stats = {}
+        for driver_id, load_times in sorted(all_timings.items()):
+            if not load_times:
+                continue
+            stats[driver_id] = {
+                'pages': len(load_times),
+                'mean': statistics.mean(load_times),
+                'median': statistics.median(load_times),
+                'max': max(load_times),
+            }
+        return stats
+
+    def print_timings(self):
+        for driver_id, stat in self.timings().items():
+            print(f"浏览器 #{driver_id}: 加载 {stat['pages']} 页，平均 {stat['mean']:.2f} 秒，"
+                  f"中位数 {stat['median']:.2f} 秒，最长 {stat['max']:.2f} 秒")
+        if self.recycled:
+            print(f"共重启浏览器 {self.recycled} 次")
+
+    # 关闭所有浏览器并清空池的状态，之后仍可继续使用（例如重试阶段），届时重新启动浏览器；
+    # 加载耗时统计保留
+    def close(self):
+        with self.lock:
+            remaining = list(self.active.values())
+            for managed in remaining:
+                self.retired_timings[managed.driver_id] = managed.load_times
+            self.active = {}
+            self.available = queue.Queue()
+            self.started = 0
+        for managed in remaining:
+            managed.quit()
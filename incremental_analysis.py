@@ -0,0 +1,334 @@
+# 增量分析：把分析需要的汇总保存在状态文件中（各分组的数量、总和和可合并的分位数草图，结算方式 × 薪资单位计数，
+# 每日发布数量，关键词出现次数和各关键词的薪资草图），每次只把新爬取的职位累加进去，图表和报告由状态生成，
+# 不需要重新读取全部历史数据。同一职位（相同职位ID）只计入第一次出现时的内容；已处理过的文件（大小和修改时间
+# 都没变）直接跳过；职位库只读取上次处理以后首次抓取的职位。已计入的职位ID不放在状态文件中，而是追加到状态文件旁的
+# SQLite文件（CountedJobs），状态文件的大小和保存时间只与分组数量有关，与累计的职位数无关。
+#   python 职位数据可视化分析.py 1010兼职网职位信息_20250506_170502.csv --state 1010兼职网分析状态.json
+#   state = AnalysisState.load('1010兼职网分析状态.json')
+#   state.add_jobs(preprocessed_df)
+#   analysis.run_analyses(IncrementalCube(state), results_dir='分析结果')
+import json
+import os
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+from analysis_charts import histogram
+from analysis_cube import AnalysisCube, sketch_summary
+from job_ids import JOB_ID_PATTERN
+from keyword_matcher import KeywordMatcher
+from publish_dates import PUBLISH_DATE_FIELD
+from quantile_sketch import DEFAULT_K, QuantileSketch
+from title_keywords import TITLE_KEYWORDS
+
+# 默认状态文件
+DEFAULT_STATE_FILE = "1010兼职网分析状态.json"
+# 状态文件格式版本，不同版本的状态不能继续累加
+STATE_VERSION = 2
+# 按这些字段分组统计薪资
+DIMENSIONS = ['薪资单位', '结算方式', '公司名称']
+# 统计整体分布的数值字段
+VALUE_FIELDS = ['薪资', '日薪', '时薪']
+# 分组计数的字段组合
+PAIR = ('结算方式', '薪资单位')
+# 查询已计入的职位ID时每批的个数（不超过SQLite的参数个数上限）
+ID_QUERY_BATCH = 500
+
+
+# 状态文件对应的已计入职位ID文件，例如 1010兼职网分析状态.json -> 1010兼职网分析状态_已计入职位.sqlite3
+def counted_jobs_path(state_path):
+    return os.path.splitext(state_path)[0] + '_已计入职位.sqlite3'
+
+
+# 已计入分析的职位ID（只追加）。新增的ID在save时才提交，与状态文件一起保存；path为None时只保存在内存中
+class CountedJobs:
+    def __init__(self, path=None):
+        self.path = path
+        self.conn = sqlite3.connect(path or ':memory:')
+        self.conn.execute("CREATE TABLE IF NOT EXISTS counted_jobs (job_id INTEGER PRIMARY KEY)")
+        self.conn.commit()
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM counted_jobs").fetchone()[0]
+
+    # 记录一批不重复的职位ID，返回其中之前没有记录过的（布尔数组）
+    def add_new(self, ids):
+        ids = [int(job_id) for job_id in ids]
+        known = set()
+        for start in range(0, len(ids), ID_QUERY_BATCH):
+            batch = ids[start:start + ID_QUERY_BATCH]
+            placeholders = ','.join('?' * len(batch))
+            known.update(row[0] for row in self.conn.execute(
+                f"SELECT job_id FROM counted_jobs WHERE job_id IN ({placeholders})", batch))
+        new = np.array([job_id not in known for job_id in ids], dtype=bool)
+        self.conn.executemany("INSERT INTO counted_jobs (job_id) VALUES (?)",
+                              [(job_id,) for job_id, is_new in zip(ids, new) if is_new])
+        return new
+
+    # 所有已记录的职位ID
+    def ids(self):
+        return [row[0] for row in self.conn.execute("SELECT job_id FROM counted_jobs")]
+
+    # 提交新增的ID；path与当前文件不同时先把全部ID复制到path，之后写入path
+    def save(self, path):
+        self.conn.commit()
+        if path != self.path:
+            target = sqlite3.connect(path)
+            self.conn.backup(target)
+            self.conn.close()
+            self.conn = target
+            self.path = path
+
+    def close(self):
+        self.conn.close()
+
+
+# 按keys分组把values加入各分组的草图 {分组: QuantileSketch}（没有的分组新建）：只排序一次，再按分组切开
+def update_group_sketches(sketches, keys, values, k=DEFAULT_K):
+    keys = pd.Series(keys).reset_index(drop=True)
+    values = pd.to_numeric(pd.Series(values), errors='coerce').reset_index(drop=True)
+    keep = (keys.notna() & values.notna()).to_numpy()
+    codes, labels = pd.factorize(keys[keep])
+    values = values.to_numpy(dtype=float)[keep]
+    order = np.lexsort((values, codes))
+    groups = np.split(values[order], np.cumsum(np.bincount(codes, minlength=len(labels)))[:-1])
+    for label, group_values in zip(labels, groups):
+        label = str(label)
+        if label not in sketches:
+            sketches[label] = QuantileSketch(k)
+        sketches[label].extend_sorted(group_values)
+
+
+class AnalysisState:
+    # track_seen为False时不记录职位ID（不去重，内存与职位数无关），用于一次性统计本身不重复的数据
+    def __init__(self, keywords=TITLE_KEYWORDS, match_mode='longest', k=DEFAULT_K, track_seen=True):
+        self.keywords = list(keywords)
+        self.match_mode = match_mode
+        self.k = k
+        # 已处理的文件 {路径: [大小, 修改时间]}，职位库 {路径: 已处理的最晚首次抓取时间}
+        self.files = {}
+        self.stores = {}
+        # 已计入的职位ID（CountedJobs），不去重时为None
+        self.seen = CountedJobs() if track_seen else None
+        self.total = 0
+        # 出现过的字段
+        self.columns = set()
+        self.groups = {dimension: {} for dimension in DIMENSIONS}
+        self.values = {}
+        self.pairs = {}
+        self.daily = {}
+        self.keyword_counts = {}
+        self.keyword_salaries = {}
+        self._matcher = None
+
+    # 关键词自动机，第一次使用时构建，之后各批数据共用（同时缓存已匹配过的标题）
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self.keywords)
+        return self._matcher
+
+    def _sketch(self, sketches, key):
+        if key not in sketches:
+            sketches[key] = QuantileSketch(self.k)
+        return sketches[key]
+
+    # 文件的大小和修改时间，用于判断文件是否已处理过
+    @staticmethod
+    def file_signature(path):
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime]
+
+    # 文件是否已处理过（且之后没有修改）
+    def has_file(self, path):
+        return self.files.get(os.path.abspath(path)) == self.file_signature(path)
+
+    # 记录已处理的文件
+    def mark_file(self, path):
+        self.files[os.path.abspath(path)] = self.file_signature(path)
+
+    # 把预处理后的职位累加到状态中，返回新计入的职位数（记录职位ID时，已计入的职位和没有职位ID的职位跳过）
+    def add_jobs(self, df):
+        if self.seen is not None:
+            df = self._unseen(df)
+        if df.empty:
+            return 0
+        self.total += len(df)
+        self.columns.update(df.columns)
+
+        for name in VALUE_FIELDS:
+            if name in df.columns:
+                self._sketch(self.values, name).update(pd.to_numeric(df[name], errors='coerce'))
+        for dimension in DIMENSIONS:
+            if dimension in df.columns:
+                update_group_sketches(self.groups[dimension], df[dimension], df['薪资'], self.k)
+        if all(name in df.columns for name in PAIR):
+            for labels, count in df.groupby(list(PAIR), observed=True, sort=False).size().items():
+                key = tuple(str(label) for label in labels)
+                self.pairs[key] = self.pairs.get(key, 0) + int(count)
+        if PUBLISH_DATE_FIELD in df.columns:
+            dates = pd.to_datetime(df[PUBLISH_DATE_FIELD], errors='coerce').dropna().dt.strftime('%Y-%m-%d')
+            for date, count in dates.value_counts(sort=False).items():
+                self.daily[date] = self.daily.get(date, 0) + int(count)
+        if '职位标题' in df.columns:
+            matches = self.matcher.match_matrix(df['职位标题'], self.match_mode)
+            for keyword, count in matches.keyword_counts().items():
+                self.keyword_counts[keyword] = self.keyword_counts.get(keyword, 0) + count
+            keywords = np.asarray(self.keywords, dtype=object)[matches.columns]
+            update_group_sketches(self.keyword_salaries, keywords, df['薪资'].to_numpy()[matches.rows], self.k)
+        return len(df)
+
+    # 去掉已计入的职位，并记录新职位的ID
+    def _unseen(self, df):
+        if '职位链接' not in df.columns:
+            raise ValueError("增量分析需要“职位链接”字段来识别已计入的职位")
+        ids = pd.to_numeric(df['职位链接'].astype(str).str.extract(JOB_ID_PATTERN.pattern)[0], errors='coerce')
+        new = (ids.notna() & ~ids.duplicated()).to_numpy(copy=True)
+        new[new] = self.seen.add_new(ids[new].astype(np.int64))
+        return df[new]
+
+    # 合并另一个状态（例如不同文件、不同进程分别统计的结果），两者的关键词和匹配方式必须相同。
+    # 两个状态中都有的职位会重复计入（计数和草图无法减去），合并前应保证数据不重叠
+    def merge(self, other):
+        if other.keywords != self.keywords or other.match_mode != self.match_mode:
+            raise ValueError("关键词列表或匹配方式不同的状态不能合并")
+        self.files.update(other.files)
+        self.stores.update(other.stores)
+        if self.seen is not None and other.seen is not None:
+            self.seen.add_new(other.seen.ids())
+        self.total += other.total
+        self.columns |= other.columns
+        for dimension, group in other.groups.items():
+            self._merge_sketches(self.groups.setdefault(dimension, {}), group)
+        self._merge_sketches(self.values, other.values)
+        self._merge_sketches(self.keyword_salaries, other.keyword_salaries)
+        for counts, other_counts in ((self.pairs, other.pairs), (self.daily, other.daily),
+                                     (self.keyword_counts, other.keyword_counts)):
+            for key, count in other_counts.items():
+                counts[key] = counts.get(key, 0) + count
+        return self
+
+    def _merge_sketches(self, sketches, other_sketches):
+        for key, sketch in other_sketches.items():
+            self._sketch(sketches, key).merge(sketch)
+
+    def to_dict(self):
+        sketches = lambda group: {label: sketch.to_dict() for label, sketch in group.items()}
+        return {
+            'version': STATE_VERSION, 'keywords': self.keywords, 'match_mode': self.match_mode, 'k': self.k,
+            'files': self.files, 'stores': self.stores,
+            'counted_jobs': len(self.seen) if self.seen is not None else None, 'total': self.total,
+            'columns': sorted(self.columns),
+            'groups': {dimension: sketches(group) for dimension, group in self.groups.items()},
+            'values': sketches(self.values),
+            'pairs': [list(key) + [count] for key, count in self.pairs.items()],
+            'daily': self.daily, 'keyword_counts': self.keyword_counts,
+            'keyword_salaries': sketches(self.keyword_salaries),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        if data.get('version') != STATE_VERSION:
+            raise ValueError(f"状态文件版本 {data.get('version')} 与当前版本 {STATE_VERSION} 不同，请删除后重新生成")
+        sketches = lambda group: {label: QuantileSketch.from_dict(sketch) for label, sketch in group.items()}
+        state = cls(data['keywords'], data['match_mode'], data['k'], track_seen=False)
+        state.files = data['files']
+        state.stores = data['stores']
+        state.total = data['total']
+        state.columns = set(data['columns'])
+        state.groups = {dimension: sketches(group) for dimension, group in data['groups'].items()}
+        state.values = sketches(data['values'])
+        state.pairs = {tuple(item[:-1]): item[-1] for item in data['pairs']}
+        state.daily = data['daily']
+        state.keyword_counts = data['keyword_counts']
+        state.keyword_salaries = sketches(data['keyword_salaries'])
+        return state
+
+    # 读取状态文件和已计入职位ID文件，状态文件不存在时返回新的空状态（keywords、match_mode只用于新状态）
+    @classmethod
+    def load(cls, path=DEFAULT_STATE_FILE, keywords=TITLE_KEYWORDS, match_mode='longest'):
+        if not os.path.exists(path):
+            state = cls(keywords, match_mode, track_seen=False)
+            state.seen = CountedJobs(counted_jobs_path(path))
+            return state
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        state = cls.from_dict(data)
+        if data['counted_jobs'] is not None:
+            state.seen = CountedJobs(counted_jobs_path(path))
+            # ID文件缺失或比状态文件旧时，无法判断哪些职位已计入
+            if len(state.seen) != data['counted_jobs']:
+                state.seen.close()
+                raise ValueError(f"已计入职位文件 {counted_jobs_path(path)} 与状态文件不一致，请删除两者后重新生成")
+        return state
+
+    # 保存状态文件（先写临时文件再替换，中断时不会损坏原文件），再提交新增的已计入职位ID。
+    # 两步之间中断时ID文件中的个数少于状态文件中记录的个数，下次读取时会报错，不会重复计入
+    def save(self, path=DEFAULT_STATE_FILE):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(json.dumps(self.to_dict(), ensure_ascii=False))
+        os.replace(temp_path, path)
+        if self.seen is not None:
+            self.seen.save(counted_jobs_path(path))
+
+    def close(self):
+        if self.seen is not None:
+            self.seen.close()
+
+
+# 由增量状态提供与AnalysisCube相同的汇总接口，各分析和报告可以直接使用；分位数、箱线图和直方图来自分位数草图
+class IncrementalCube(AnalysisCube):
+    def __init__(self, state):
+        self.state = state
+        self.total = state.total
+        self._cache = {}
+
+    def has(self, *columns):
+        return all(name in self.state.columns for name in columns)
+
+    def group(self, dimension, value='薪资'):
+        if value != '薪资' or dimension not in self.state.groups:
+            raise ValueError(f"增量状态中没有按“{dimension}”分组的“{value}”统计")
+        return self._cached(('group', dimension), lambda: sketch_summary(self.state.groups[dimension], dimension))
+
+    def summary(self, value='薪资'):
+        def compute():
+            sketch = self.state.values.get(value)
+            return sketch_summary({0: sketch}).iloc[0] if sketch is not None and sketch.count else None
+        return self._cached(('summary', value), compute)
+
+    def counts(self, dimensions):
+        dimensions = [dimensions] if isinstance(dimensions, str) else list(dimensions)
+        if tuple(dimensions) == PAIR:
+            index = pd.MultiIndex.from_tuples(list(self.state.pairs), names=dimensions)
+            return pd.Series(list(self.state.pairs.values()), index=index, name='count').sort_index()
+        if len(dimensions) == 1:
+            return self.group(dimensions[0])['count']
+        raise ValueError(f"增量状态中没有按 {dimensions} 的分组计数")
+
+    # 直方图由草图中保存的数值（按其代表的数据个数加权）计算
+    def histogram(self, value, dimension=None):
+        def of(sketch):
+            values, weights = sketch.weighted_items()
+            return histogram(values, weights=weights, mean=sketch.sum / sketch.count, median=sketch.quantile(0.5))
+
+        def compute():
+            if dimension is None:
+                return of(self.state.values[value])
+            return {label: (sketch.count, of(sketch))
+                    for label, sketch in self.state.groups[dimension].items() if sketch.count}
+        return self._cached(('histogram', value, dimension), compute)
+
+    def daily_counts(self):
+        counts = pd.Series(self.state.daily, dtype='int64').sort_index()
+        counts.index = pd.to_datetime(counts.index).date
+        counts.index.name = '发布日期'
+        return counts
+
+    def keywords(self, keywords, mode='longest', value='薪资'):
+        if list(keywords) != self.state.keywords or mode != self.state.match_mode:
+            raise ValueError("关键词列表或匹配方式与增量状态中的不同，请删除状态文件后重新生成")
+        counts = dict(sorted(self.state.keyword_counts.items(), key=lambda item: item[1], reverse=True))
+        return counts, self._cached(('keywords',), lambda: sketch_summary(self.state.keyword_salaries, '关键词'))
@@ -0,0 +1,11 @@
+# 职位ID：从职位链接中解析数字职位ID。不依赖其他模块，爬虫、职位库和增量分析都从这里导入
+import re
+
+# 职位链接中的职位ID，例如 https://sz.1010jz.com/jiazheng/a1794984.html -> 1794984
+JOB_ID_PATTERN = re.compile(r'/a(\d+)\.html')
+
+
+# 从职位链接中解析数字职位ID，无法解析时返回None
+def parse_job_id(job_url):
+    match = JOB_ID_PATTERN.search(job_url or '')
+    return int(match.group(1)) if match else None
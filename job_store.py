@@ -0,0 +1,264 @@
+# 职位库：所有运行爬取的职位按职位ID写入同一个SQLite数据库（已有的职位更新为最新内容，保留首次抓取时间），
+# 公司名称、结算方式、薪资单位和发布日期上建有索引。分析脚本直接在库中分组计数和筛选，只把结果取回pandas，
+# 不需要把所有历史快照读入内存。已有的CSV/JSON/Parquet快照可以导入：
+#   python job_store.py 1010兼职网职位信息_20250506_170502.csv
+import argparse
+import json
+import sqlite3
+import threading
+from datetime import datetime
+
+from crawl_journal import JOB_FIELDS
+from detail_fields import DETAIL_FIELDS
+from job_ids import parse_job_id
+from parquet_output import FLOAT_FIELDS, INTEGER_FIELDS
+from publish_dates import PUBLISH_DATE_FIELD, crawl_time, parse_publish_dates
+
+# 默认职位库文件
+DEFAULT_STORE_FILE = "1010兼职网职位库.sqlite3"
+
+# 库中保存的字段（不含职位ID和抓取时间）
+STORE_FIELDS = JOB_FIELDS + ['重复发布次数', '城市', '分类'] + DETAIL_FIELDS + [PUBLISH_DATE_FIELD]
+# 建索引的字段
+INDEXED_FIELDS = ['公司名称', '结算方式', '薪资单位', PUBLISH_DATE_FIELD]
+# 累计多少条写入后提交一次
+COMMIT_EVERY = 100
+
+
+def _column_type(name):
+    if name in FLOAT_FIELDS:
+        return 'REAL'
+    if name in INTEGER_FIELDS:
+        return 'INTEGER'
+    return 'TEXT'
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+# 由 {字段: 值或值列表} 生成WHERE子句和参数，值为列表时表示取值在列表中
+def build_where(where=None, condition=None):
+    clauses = [condition] if condition else []
+    params = []
+    for name, value in (where or {}).items():
+        if isinstance(value, (list, tuple, set)):
+            values = list(value)
+            clauses.append(f"{_quote(name)} IN ({','.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        else:
+            clauses.append(f"{_quote(name)} = ?")
+            params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class JobStore:
+    # condition为所有查询附加的SQL条件，例如分析时只统计有薪资的职位：'"薪资" IS NOT NULL'
+    def __init__(self, path=DEFAULT_STORE_FILE, condition=None):
+        self.path = path
+        self.condition = condition
+        # 流水线方式下详情协程会同时写入，用锁保护同一个连接
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        columns = ',\n'.join(f"{_quote(name)} {_column_type(name)}" for name in STORE_FIELDS)
+        self.conn.execute(f"""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id INTEGER PRIMARY KEY,
+                {columns},
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        for name in INDEXED_FIELDS:
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS {_quote('idx_jobs_' + name)} ON jobs ({_quote(name)})")
+        self.conn.commit()
+        self._uncommitted = 0
+
+    def __len__(self):
+        where, params = build_where(condition=self.condition)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM jobs{where}", params).fetchone()[0]
+
+    def _row(self, job, published):
+        values = []
+        for name in STORE_FIELDS:
+            if name == PUBLISH_DATE_FIELD:
+                values.append(published)
+                continue
+            value = job.get(name)
+            if value == '':
+                value = None
+            if value is not None and name in FLOAT_FIELDS | INTEGER_FIELDS:
+                try:
+                    value = float(value) if name in FLOAT_FIELDS else int(float(value))
+                except (TypeError, ValueError):
+                    value = None
+            values.append(value)
+        return values
+
+    # 写入一批职位：新职位插入，已有的职位（相同职位ID）更新为最新内容，新数据中为空的字段保留原值；返回写入的职位数。
+    # crawl_time为爬取时间（默认为现在），只有月日的发布时间按它推断年份；year为发布时间所属的年份，指定时不再推断
+    def upsert_many(self, jobs, year=None, crawl_time=None):
+        now = datetime.now().isoformat(timespec='seconds')
+        if year:
+            # 以该年最后一刻为爬取时间，月日都不会晚于它，全部按该年解析
+            crawl_time = datetime(year, 12, 31, 23, 59, 59)
+        jobs = list(jobs)
+        dates = parse_publish_dates([job.get('发布时间') for job in jobs], crawl_time)
+        dates = dates.dt.strftime('%Y-%m-%d').astype(object).where(dates.notna(), None)
+        rows = []
+        for job, published in zip(jobs, dates):
+            job_id = parse_job_id(job.get('职位链接'))
+            # 没有职位ID的链接无法去重，不写入
+            if job_id is not None:
+                rows.append([job_id] + self._row(job, published) + [now, now])
+        if not rows:
+            return 0
+        names = ', '.join(_quote(name) for name in STORE_FIELDS)
+        # 新数据中没有的字段（例如旧快照中没有结构化字段）保留原值
+        updates = ', '.join(f"{_quote(name)} = COALESCE(excluded.{_quote(name)}, {_quote(name)})" for name in STORE_FIELDS)
+        with self.lock:
+            self.conn.executemany(f"""
+                INSERT INTO jobs (job_id, {names}, first_seen, last_seen)
+                VALUES ({','.join('?' * (len(STORE_FIELDS) + 3))})
+                ON CONFLICT(job_id) DO UPDATE SET {updates}, last_seen = excluded.last_seen
+            """, rows)
+            self._uncommitted += len(rows)
+            if self._uncommitted >= COMMIT_EVERY:
+                self._commit()
+        return len(rows)
+
+    # 写入一个职位
+    def upsert(self, job):
+        return self.upsert_many([job])
+
+    # 修正已写入的职位：fields中的字段覆盖职位链接为job_url的记录
+    def update(self, job_url, fields):
+        job_id = parse_job_id(job_url)
+        fields = {name: value for name, value in fields.items() if name in STORE_FIELDS}
+        if job_id is None or not fields:
+            return
+        assignments = ', '.join(f"{_quote(name)} = ?" for name in fields)
+        with self.lock:
+            self.conn.execute(f"UPDATE jobs SET {assignments} WHERE job_id = ?", list(fields.values()) + [job_id])
+            self._uncommitted += 1
+            if self._uncommitted >= COMMIT_EVERY:
+                self._commit()
+
+    def _commit(self):
+        self.conn.commit()
+        self._uncommitted = 0
+
+    # 提交尚未提交的写入
+    def commit(self):
+        with self.lock:
+            self._commit()
+
+    # 执行查询，返回DataFrame
+    def query(self, sql, params=()):
+        import pandas as pd
+
+        with self.lock:
+            return pd.read_sql_query(sql, self.conn, params=list(params))
+
+    # 附加条件、where和not_null（这些字段不为空）合并后的WHERE子句和参数
+    def _where(self, where=None, not_null=()):
+        clauses = [f"({self.condition})"] if self.condition else []
+        clauses += [f"{_quote(name)} IS NOT NULL" for name in not_null]
+        return build_where(where, ' AND '.join(clauses))
+
+    # 按字段分组计数（在库中完成），返回以分组字段为索引的Series；分组字段为空的职位不计入
+    def count_by(self, columns):
+        columns = [columns] if isinstance(columns, str) else list(columns)
+        clause, params = self._where(not_null=columns)
+        names = ', '.join(_quote(name) for name in columns)
+        counts = self.query(f"SELECT {names}, COUNT(*) AS count FROM jobs{clause} GROUP BY {names} ORDER BY {names}", params)
+        return counts.set_index(columns)['count']
+
+    # 职位数量最多的n个分组（在库中分组、排序），返回以分组字段为索引、按数量从多到少排列的Series，
+    # 数量相同时按分组第一次出现的顺序；分组字段或not_null中的字段为空的职位不计入
+    def top_by(self, column, n, not_null=()):
+        clause, params = self._where(not_null=[column] + list(not_null))
+        name = _quote(column)
+        counts = self.query(f"SELECT {name}, COUNT(*) AS count FROM jobs{clause} GROUP BY {name} "
+                            f"ORDER BY count DESC, MIN(job_id) LIMIT ?", params + [n])
+        return counts.set_index(column)['count']
+
+    # 只取回需要的字段和满足条件的职位，not_null中的字段为空的职位不取回
+    def select(self, columns, where=None, not_null=()):
+        clause, params = self._where(where, not_null)
+        names = ', '.join(_quote(name) for name in columns)
+        return self.query(f"SELECT {names} FROM jobs{clause}", params)
+
+    # 分块取回需要的字段，每块最多chunk_size个职位（按职位ID分页，每块一次查询），内存只与块大小有关
+    def iter_select(self, columns, chunk_size, not_null=()):
+        clause, params = self._where(not_null=not_null)
+        clause += " AND job_id > ?" if clause else " WHERE job_id > ?"
+        names = ', '.join(_quote(name) for name in columns)
+        last_id = -1
+        while True:
+            chunk = self.query(f"SELECT job_id, {names} FROM jobs{clause} ORDER BY job_id LIMIT ?",
+                               params + [last_id, chunk_size])
+            if chunk.empty:
+                return
+            last_id = int(chunk['job_id'].iloc[-1])
+            yield chunk.drop(columns='job_id')
+            if len(chunk) < chunk_size:
+                return
+
+    # 取回首次抓取时间不早于since（ISO格式，None为全部）的职位，按首次抓取时间排列，另附first_seen列
+    def select_since(self, columns, since=None):
+        clauses = [f"({self.condition})"] if self.condition else []
+        params = []
+        if since:
+            clauses.append("first_seen >= ?")
+            params.append(since)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        names = ', '.join(_quote(name) for name in columns)
+        return self.query(f"SELECT {names}, first_seen FROM jobs{where} ORDER BY first_seen", params)
+
+    def close(self):
+        with self.lock:
+            self._commit()
+            self.conn.close()
+
+
+# 数据中是否有这些字段（数据来源可以是DataFrame，也可以是职位库）
+def has_columns(data, columns):
+    available = STORE_FIELDS if isinstance(data, JobStore) else data.columns
+    return all(name in available for name in columns)
+
+
+# 读取一个快照文件（JSON、CSV或Parquet）中的职位
+def read_snapshot(path):
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    from parquet_output import read_jobs
+
+    df = read_jobs(path)
+    return df.astype(object).where(df.notna(), None).to_dict('records')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='把职位信息快照导入职位库')
+    parser.add_argument('files', nargs='+', help='JSON、CSV或Parquet快照文件')
+    parser.add_argument('--store', default=DEFAULT_STORE_FILE, help='职位库文件')
+    parser.add_argument('--year', type=int, default=None,
+                        help='发布时间所属年份，默认按文件名中的爬取时间（没有时为文件修改时间）推断')
+    args = parser.parse_args()
+
+    store = JobStore(args.store)
+    try:
+        for path in args.files:
+            count = store.upsert_many(read_snapshot(path), year=args.year, crawl_time=crawl_time(path))
+            print(f"已导入 {path}：{count} 个职位")
+        print(f"职位库 {args.store} 共有 {len(store)} 个职位")
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
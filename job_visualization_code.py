@@ -1,19 +1,43 @@
+import os
+import re
+import sys
 import pandas as pd
 import matplotlib.pyplot as plt
 from wordcloud import WordCloud
 import jieba
 import seaborn as sns
+from parquet_output import read_jobs
+from publish_dates import crawl_time, parse_publish_dates
 
 # 解决中文显示问题
 plt.rcParams['font.sans-serif'] = ['SimHei']
 plt.rcParams['axes.unicode_minus'] = False
 
-# 读取数据
-df = pd.read_csv('1010兼职网职位信息_20250506_170502.csv')
+# 读取数据：命令行指定的文件（例如sharded_crawl.py生成的带时间戳的文件），不指定时读取当前目录下最新的职位信息文件；
+# 有同名的Parquet文件时优先读取，只读取用到的列（不读取职位详情）
+#   python job_visualization_code.py 1010兼职网职位信息_20250601_090000.parquet
+if len(sys.argv) > 1:
+    data_file = sys.argv[1]
+else:
+    # 只取爬虫正常结束时生成的快照（前缀后直接是时间戳），不取“_错误恢复_”等部分数据文件；
+    # 文件名中的时间戳按字符串排序即按时间排序
+    snapshot_pattern = re.compile(r'^1010兼职网职位信息_\d{8}_\d{6}\.(csv|parquet)$')
+    snapshots = sorted(file for file in os.listdir('.') if snapshot_pattern.match(file))
+    if not snapshots:
+        print("错误：当前目录下找不到1010兼职网职位信息的CSV或Parquet文件！")
+        sys.exit(1)
+    data_file = snapshots[-1]
+if data_file.endswith('.csv') and os.path.exists(data_file[:-len('.csv')] + '.parquet'):
+    data_file = data_file[:-len('.csv')] + '.parquet'
+print(f"读取数据文件: {data_file}")
+df = read_jobs(data_file, ['职位标题', '薪资', '薪资单位', '结算方式', '城市', '发布时间'])
 
 # 数据清洗：处理薪资列，将无法转换的值设为缺失值
 df['薪资'] = pd.to_numeric(df['薪资'], errors='coerce')
 df = df.dropna(subset=['薪资'])
+# Parquet文件中的字典编码字段为category类型，去掉已不存在的取值
+for column in df.select_dtypes('category').columns:
+    df[column] = df[column].cat.remove_unused_categories()
 
 # 绘制不同结算方式下平均薪资的柱状图
 average_salary = df.groupby('结算方式')['薪资'].mean().round(2).reset_index()
@@ -94,25 +118,8 @@ else:
 
 # 分析每日职位发布数量
 if '发布时间' in df.columns:
-    import re
-    from datetime import datetime
-
-    def standardize_date(date_str):
-        if pd.isna(date_str):
-            return None
-        match = re.search(r'(\d{2})-(\d{2})', str(date_str)) # 假设格式为MM-DD
-        if match:
-            month, day = match.groups()
-            current_year = datetime.now().year
-            return f"{current_year}-{month}-{day}"
-        # 尝试匹配 YYYY-MM-DD 或 YYYY/MM/DD
-        match_ymd = re.search(r'(\d{4})[-/](\d{1,2})[-/](\d{1,2})', str(date_str))
-        if match_ymd:
-            return date_str # Already in a good format or close enough for pd.to_datetime
-        return None
-
-    df['标准发布时间'] = df['发布时间'].apply(standardize_date)
-    df['标准发布时间'] = pd.to_datetime(df['标准发布时间'], errors='coerce')
+    # 批量解析发布时间（MM-DD、完整日期、“3天前”等），只有月日时按文件名中的爬取时间推断年份
+    df['标准发布时间'] = parse_publish_dates(df['发布时间'], crawl_time(data_file))
     df_time_analysis = df.dropna(subset=['标准发布时间'])
 
     if not df_time_analysis.empty:
@@ -0,0 +1,133 @@
+# 职位标题关键词匹配：用关键词列表构建一个Aho-Corasick自动机，一次扫描所有标题，得到“行 × 关键词”的稀疏匹配矩阵，
+# 关键词出现次数和含有某个关键词的行都从矩阵中取得，不再对每个关键词分别扫描全部标题。
+# 相同的标题只扫描一次（重复发布的职位标题很多），再按行展开。
+#   matcher = KeywordMatcher(TITLE_KEYWORDS)
+#   matrix = matcher.match_matrix(df['职位标题'], mode='longest')
+#   matrix.keyword_counts()              # {关键词: 出现次数}
+#   df.loc[matrix.rows_with('快递'), '薪资']
+# 匹配方式：
+#   overlap  所有出现都计数，“快递分拣员”同时计为“快递”“快递分拣”“快递分拣员”（与str.count相同）
+#   longest  从左到右取最长的关键词，匹配的文字不再参与其他关键词，“快递分拣员”只计为“快递分拣员”
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+MATCH_MODES = ('overlap', 'longest')
+# 缓存的标题匹配结果个数上限（分批匹配时，之前批次出现过的标题不再扫描），超过时清空重新缓存
+MATCH_CACHE_SIZE = 200000
+
+
+# 稀疏匹配矩阵（坐标格式）：第rows[i]行含有counts[i]次第columns[i]个关键词，shape为 (行数, 关键词数)
+class KeywordMatrix(namedtuple('KeywordMatrix', ['rows', 'columns', 'counts', 'shape', 'keywords'])):
+    __slots__ = ()
+
+    # 各关键词的出现次数（按关键词列表的顺序），without_zero为True时去掉没有出现的关键词
+    def keyword_counts(self, without_zero=True):
+        totals = np.bincount(self.columns, weights=self.counts, minlength=self.shape[1]).astype(int)
+        return {keyword: int(total) for keyword, total in zip(self.keywords, totals) if total or not without_zero}
+
+    # 含有某个关键词的行号（升序）
+    def rows_with(self, keyword):
+        return self.rows[self.columns == self.keywords.index(keyword)]
+
+
+class KeywordMatcher:
+    def __init__(self, keywords):
+        self.keywords = list(dict.fromkeys(keywords))
+        # {(文字, 匹配方式): {关键词序号: 次数}}
+        self.cache = {}
+        # 字典树：goto[状态][字符] -> 下一个状态；depth为状态对应前缀的长度
+        self.goto = [{}]
+        self.depth = [0]
+        # 以该状态结尾的关键词序号（包括沿失配指针能到达的更短关键词），按长度从长到短
+        self.output = [[]]
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.depth.append(self.depth[state] + 1)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+        self._build_fail_links()
+
+    # 按广度优先顺序计算失配指针，并把失配状态的输出合并到当前状态
+    def _build_fail_links(self):
+        self.fail = [0] * len(self.goto)
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                target = self.goto[fallback].get(char, 0)
+                self.fail[child] = target if target != child else 0
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+                queue.append(child)
+
+    # 一段文字中的所有匹配，返回 [(起始位置, 结束位置, 关键词序号)]，按结束位置排列
+    def find_all(self, text):
+        goto, fail, output, keywords = self.goto, self.fail, self.output, self.keywords
+        matches = []
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                matches.append((position + 1 - len(keywords[index]), position + 1, index))
+        return matches
+
+    # 从左到右取最长的关键词，匹配到的文字不再重叠
+    def find_longest(self, text):
+        chosen = []
+        end = 0
+        for start, stop, index in sorted(self.find_all(text), key=lambda match: (match[0], -match[1])):
+            if start >= end:
+                chosen.append((start, stop, index))
+                end = stop
+        return chosen
+
+    # 一段文字中各关键词的出现次数 {关键词序号: 次数}
+    def count(self, text, mode='longest'):
+        if mode not in MATCH_MODES:
+            raise ValueError(f"未知的匹配方式: {mode}，可选: {', '.join(MATCH_MODES)}")
+        matches = self.find_longest(text) if mode == 'longest' else self.find_all(text)
+        counts = {}
+        for _, _, index in matches:
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+    # 对一列文字（缺失值视为没有匹配）构建稀疏匹配矩阵
+    def match_matrix(self, texts, mode='longest'):
+        codes, uniques = pd.factorize(pd.Series(texts), use_na_sentinel=True)
+        # 先对不重复的文字计数，得到按文字分组的压缩行格式（indptr、columns、counts）
+        columns, counts, lengths = [], [], []
+        if len(self.cache) + len(uniques) > MATCH_CACHE_SIZE:
+            self.cache = {}
+        for text in uniques:
+            key = (str(text), mode)
+            text_counts = self.cache.get(key)
+            if text_counts is None:
+                text_counts = self.cache[key] = self.count(key[0], mode)
+            columns.extend(text_counts.keys())
+            counts.extend(text_counts.values())
+            lengths.append(len(text_counts))
+        columns = np.asarray(columns, dtype=np.int64)
+        counts = np.asarray(counts, dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths, dtype=np.int64)])
+
+        # 再按每行文字的编号展开为行的坐标：每行取对应文字在columns中的一段
+        lengths = np.zeros(len(codes), dtype=np.int64)
+        present = codes >= 0
+        lengths[present] = np.diff(indptr)[codes[present]]
+        rows = np.repeat(np.arange(len(codes)), lengths)
+        starts = np.zeros(len(codes), dtype=np.int64)
+        starts[present] = indptr[codes[present]]
+        offsets = np.arange(len(rows)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        positions = np.repeat(starts, lengths) + offsets
+        return KeywordMatrix(rows, columns[positions], counts[positions], (len(codes), len(self.keywords)),
+                             self.keywords)
@@ -0,0 +1,128 @@
+# 列表页职位信息的批量提取
+# 原有方式对每个职位列表项分别调用find_element/get_attribute，一页约200次WebDriver往返；
+# 这里提供两种一次性提取整页的方式：
+#   1. extract_listing_rows(driver)：一次execute_script在浏览器内取出所有行，返回JSON数组
+#   2. parse_listing_html(html, base_url)：用lxml解析driver.page_source或HTTP获取的HTML
+# 两种方式的结果都经过build_job转换，字段含义与原有逐个元素提取的方式一致。
+import re
+from urllib.parse import urljoin
+
+import lxml.html
+from lxml import etree
+
+from detail_fetcher import element_text
+
+# 列表页中职位列表的XPath（与Selenium版本保持一致）
+LISTING_XPATH = '/html/body/div[4]/div/div/ul[1]'
+
+# 薪资文本中的数字和单位，例如 "180元/天"
+PRICE_PATTERN = re.compile(r'(\d+)\s*元/(\w+)')
+
+# 在浏览器中一次性提取整页职位信息的脚本，找不到职位列表时返回null
+EXTRACT_LISTING_SCRIPT = """
+var list = document.evaluate(arguments[0], document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+if (!list) { return null; }
+function text(item, selector) {
+    var element = item.querySelector(selector);
+    return element ? element.innerText.trim() : null;
+}
+return Array.prototype.map.call(list.getElementsByTagName('li'), function (item) {
+    var link = item.querySelector('span.jobtitle a');
+    return {
+        title: link ? link.innerText.trim() : null,
+        href: link ? link.href : null,
+        price: text(item, 'span.price'),
+        payment_type: text(item, 'span.payment_type'),
+        company: text(item, 'span.listcompany a'),
+        publish_time: text(item, 'span.listzptime')
+    };
+});
+"""
+
+
+# 把薪资文本拆分为数字和单位，匹配不到时保留原文本
+def split_price(price_text):
+    if price_text is None:
+        return "未提供", ""
+    price_match = PRICE_PATTERN.search(price_text)
+    if price_match:
+        return price_match.group(1), price_match.group(2)
+    return price_text, ""
+
+
+# 把一行提取结果转换为职位信息字典；没有职位标题链接的列表项返回None
+def build_job(row):
+    if row.get('href') is None:
+        return None
+    price, price_unit = split_price(row.get('price'))
+    payment_type = row.get('payment_type')
+    company = row.get('company')
+    publish_time = row.get('publish_time')
+    return {
+        '职位标题': row.get('title') or '',
+        '薪资': price,
+        '薪资单位': price_unit,
+        '结算方式': payment_type if payment_type is not None else "未提供",
+        '公司名称': company if company is not None else "未提供",
+        '发布时间': publish_time if publish_time is not None else "未提供",
+        '职位详情': None,
+        '职位链接': row['href']
+    }
+
+
+# 转换整页的提取结果
+def rows_to_jobs(rows):
+    jobs = []
+    for index, row in enumerate(rows, 1):
+        job = build_job(row)
+        if job is None:
+            print(f"处理职位时出错: 第 {index} 个列表项缺少职位标题链接")
+            continue
+        jobs.append(job)
+    return jobs
+
+
+# 通过一次execute_script取出整页职位信息，找不到职位列表时返回None
+def extract_listing_rows(driver):
+    return driver.execute_script(EXTRACT_LISTING_SCRIPT, LISTING_XPATH)
+
+
+# 与CSS选择器 span.<class_name> 等价的XPath
+def _span_xpath(class_name, suffix=''):
+    return etree.XPath(f".//span[contains(concat(' ', normalize-space(@class), ' '), ' {class_name} ')]{suffix}")
+
+
+# 列表项中各字段对应的XPath，与逐个元素提取时使用的CSS选择器一一对应
+TITLE_LINK = _span_xpath('jobtitle', '//a')
+PRICE = _span_xpath('price')
+PAYMENT_TYPE = _span_xpath('payment_type')
+COMPANY = _span_xpath('listcompany', '//a')
+PUBLISH_TIME = _span_xpath('listzptime')
+
+
+# 取第一个匹配元素的文本
+def _first_text(item, xpath):
+    elements = xpath(item)
+    return element_text(elements[0]) if elements else None
+
+
+# 解析列表页HTML，返回与extract_listing_rows相同结构的行；找不到职位列表时返回None
+def parse_listing_html(html, base_url):
+    document = lxml.html.document_fromstring(html)
+    lists = document.getroottree().xpath(LISTING_XPATH)
+    if not lists:
+        return None
+    rows = []
+    for item in lists[0].iter('li'):
+        links = TITLE_LINK(item)
+        link = links[0] if links else None
+        href = link.get('href') if link is not None else None
+        rows.append({
+            'title': element_text(link) if link is not None else None,
+            'href': urljoin(base_url, href) if href is not None else None,
+            'price': _first_text(item, PRICE),
+            'payment_type': _first_text(item, PAYMENT_TYPE),
+            'company': _first_text(item, COMPANY),
+            'publish_time': _first_text(item, PUBLISH_TIME),
+        })
+    return rows
@@ -0,0 +1,274 @@
+# 近似重复职位检测：中介经常只改日期前缀（如“6号”“6日”）和地点、班次时间，重复发布几乎相同的职位。
+# 对“职位标题 + 职位详情”去掉日期和固定尾注、把数字统一后取字符2-gram，计算MinHash签名，用LSH分段找候选，
+# 估计的Jaccard相似度达到阈值（默认同一公司）即视为同一职位的重复发布。
+# 阈值按同一中介的重复发布调整，python near_duplicates.py 检查示例中的重复发布能被合并、不同的职位不会被合并。
+# 索引用SQLite持久化，跨多次运行累计每个原始职位的重复发布次数；也可在内存中对已有数据分组去重。
+import argparse
+import hashlib
+import random
+import sys
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from datetime import datetime
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# 默认索引文件
+DEFAULT_NEAR_DUP_FILE = "1010兼职网近似重复职位.sqlite3"
+
+# 签名长度和LSH分段数（每段 NUM_PERM // BANDS 个值），相似度为0.55时成为候选的概率约99.7%
+NUM_PERM = 96
+BANDS = 32
+# 字符n-gram长度
+SHINGLE_SIZE = 2
+# 估计的Jaccard相似度达到该值时视为重复发布
+DEFAULT_THRESHOLD = 0.55
+# 签名方式的版本（保存在索引文件中），签名方式改变后旧索引不能继续使用
+SIGNATURE_VERSION = 2
+
+# 日期前缀，例如 "6号"、"6日"、"5月6号"、"7-12号"、"4月15/18日"
+DATE_PATTERN = re.compile(r'\d{1,2}月\d{1,2}(?:[-~/至到]\d{1,2})?[号日]?|\d{1,2}(?:[-~/至到]\d{1,2})?[号日]')
+# 详情页末尾的固定文字
+BOILERPLATE_PATTERN = re.compile(r'禁止转载|联系我时请?说明在1010兼职网看到的')
+# 空白和标点
+NOISE_PATTERN = re.compile(r'[\s\W_]+')
+# 数字（时薪、班次时间、地铁线路等），统一为0后只比较文字
+DIGIT_PATTERN = re.compile(r'\d+')
+
+# 哈希函数 (a * x + b) mod p 的参数，固定随机种子使签名跨运行保持一致；
+# p取2^31-1，x为32位哈希，计算过程不超出64位整数，numpy和纯Python得到相同的签名
+MERSENNE_PRIME = (1 << 31) - 1
+_random = random.Random(1010)
+HASH_PARAMS = [(_random.randrange(1, MERSENNE_PRIME), _random.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+if np is not None:
+    _HASH_A = np.array([a for a, _ in HASH_PARAMS], dtype=np.uint64)[:, None]
+    _HASH_B = np.array([b for _, b in HASH_PARAMS], dtype=np.uint64)[:, None]
+
+
+# 去掉日期、固定尾注、空白和标点，数字统一为0，只保留用于比较的文字
+def normalize_text(text):
+    text = DATE_PATTERN.sub('', text or '')
+    text = BOILERPLATE_PATTERN.sub('', text)
+    text = DIGIT_PATTERN.sub('0', text)
+    return NOISE_PATTERN.sub('', text).lower()
+
+
+# 字符n-gram集合（哈希为32位整数）
+def shingles(text, size=SHINGLE_SIZE):
+    if len(text) < size:
+        return {zlib.crc32(text.encode('utf-8'))} if text else set()
+    return {zlib.crc32(text[i:i + size].encode('utf-8')) for i in range(len(text) - size + 1)}
+
+
+# 计算MinHash签名
+def minhash(shingle_hashes):
+    if not shingle_hashes:
+        return [MERSENNE_PRIME] * NUM_PERM
+    if np is not None:
+        values = np.fromiter(shingle_hashes, dtype=np.uint64, count=len(shingle_hashes))
+        return ((_HASH_A * values + _HASH_B) % MERSENNE_PRIME).min(axis=1).tolist()
+    return [min((a * x + b) % MERSENNE_PRIME for x in shingle_hashes) for a, b in HASH_PARAMS]
+
+
+# 职位的MinHash签名：标题和详情一起计算
+def job_signature(job):
+    return minhash(shingles(normalize_text(f"{job.get('职位标题') or ''}\n{job.get('职位详情') or ''}")))
+
+
+# 由签名估计Jaccard相似度
+def similarity(signature, other):
+    return sum(1 for x, y in zip(signature, other) if x == y) / len(signature)
+
+
+# 每个LSH分段的桶编号
+def band_keys(signature, bands=BANDS):
+    rows = len(signature) // bands
+    keys = []
+    for band in range(bands):
+        data = array('Q', signature[band * rows:(band + 1) * rows]).tobytes()
+        keys.append(int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'big', signed=True))
+    return keys
+
+
+class NearDuplicateIndex:
+    def __init__(self, path=DEFAULT_NEAR_DUP_FILE, threshold=DEFAULT_THRESHOLD, same_company=True):
+        self.path = path
+        self.threshold = threshold
+        # 是否只在同一公司的职位之间判断重复
+        self.same_company = same_company
+        # 流水线方式下详情协程会同时访问，用锁保护同一个连接
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                company TEXT,
+                signature BLOB NOT NULL,
+                canonical_id INTEGER,
+                repost_count INTEGER NOT NULL DEFAULT 0,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        # 只有原始职位进入LSH桶，重复发布的职位通过canonical_id指向原始职位
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS lsh_buckets (
+                band INTEGER NOT NULL,
+                bucket INTEGER NOT NULL,
+                posting_id INTEGER NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_lsh_buckets ON lsh_buckets (band, bucket)")
+        # 新索引记录签名方式的版本；已有数据的旧版本索引无法与新签名比较
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SIGNATURE_VERSION:
+            if self.conn.execute("SELECT COUNT(*) FROM postings").fetchone()[0]:
+                self.conn.close()
+                raise ValueError(f"近似重复职位索引 {path} 的签名方式已更改，请删除后重新生成")
+            self.conn.execute(f"PRAGMA user_version = {SIGNATURE_VERSION}")
+        self.conn.commit()
+
+    # 原始职位数量
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM postings WHERE canonical_id IS NULL").fetchone()[0]
+
+    # 找到与签名最相似的原始职位，返回 (职位ID, 职位链接, 相似度)，没有达到阈值的返回None
+    def _find_canonical(self, signature, keys, company):
+        candidates = set()
+        for band, bucket in enumerate(keys):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT posting_id FROM lsh_buckets WHERE band = ? AND bucket = ?", (band, bucket)))
+        best = None
+        for posting_id in candidates:
+            url, candidate_company, candidate_signature = self.conn.execute(
+                "SELECT url, company, signature FROM postings WHERE id = ?", (posting_id,)).fetchone()
+            if self.same_company and company and candidate_company and company != candidate_company:
+                continue
+            score = similarity(signature, array('Q', candidate_signature))
+            if score >= self.threshold and (best is None or score > best[2]):
+                best = (posting_id, url, score)
+        return best
+
+    # 加入一个职位，返回 (原始职位链接, 原始职位的重复发布次数)；不是重复发布时原始职位链接就是它本身
+    def add(self, job):
+        url = job['职位链接']
+        company = job.get('公司名称')
+        signature = job_signature(job)
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            # 已经记录过的职位（例如恢复运行时重复处理）直接返回原有结果
+            row = self.conn.execute("SELECT id, canonical_id FROM postings WHERE url = ?", (url,)).fetchone()
+            if row is not None:
+                canonical_id = row[1] or row[0]
+                canonical_url, repost_count = self.conn.execute(
+                    "SELECT url, repost_count FROM postings WHERE id = ?", (canonical_id,)).fetchone()
+                return canonical_url, repost_count
+
+            keys = band_keys(signature)
+            match = self._find_canonical(signature, keys, company)
+            blob = array('Q', signature).tobytes()
+            if match is None:
+                cursor = self.conn.execute(
+                    "INSERT INTO postings (url, company, signature, first_seen, last_seen) VALUES (?, ?, ?, ?, ?)",
+                    (url, company, blob, now, now))
+                self.conn.executemany("INSERT INTO lsh_buckets (band, bucket, posting_id) VALUES (?, ?, ?)",
+                                      [(band, bucket, cursor.lastrowid) for band, bucket in enumerate(keys)])
+                self.conn.commit()
+                return url, 0
+
+            canonical_id, canonical_url, _ = match
+            self.conn.execute(
+                "INSERT INTO postings (url, company, signature, canonical_id, first_seen, last_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?)", (url, company, blob, canonical_id, now, now))
+            self.conn.execute("UPDATE postings SET repost_count = repost_count + 1, last_seen = ? WHERE id = ?",
+                              (now, canonical_id))
+            repost_count = self.conn.execute("SELECT repost_count FROM postings WHERE id = ?",
+                                             (canonical_id,)).fetchone()[0]
+            self.conn.commit()
+            return canonical_url, repost_count
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# 对一批职位在内存中分组，返回每个职位所属原始职位的序号（原始职位为其本身的序号）
+def group_near_duplicates(jobs, threshold=DEFAULT_THRESHOLD, same_company=True):
+    index = NearDuplicateIndex(':memory:', threshold, same_company)
+    first_index = {}
+    groups = []
+    try:
+        for position, job in enumerate(jobs):
+            # 内存索引只用于分组，职位链接缺失或重复时用序号代替
+            url = job.get('职位链接') or f"#{position}"
+            if url in first_index:
+                url = f"{url}#{position}"
+            canonical_url, _ = index.add(dict(job, 职位链接=url))
+            first_index.setdefault(url, position)
+            groups.append(first_index[canonical_url])
+    finally:
+        index.close()
+    return groups
+
+
+# 检查用的示例（1010兼职网职位信息_20250506_170502.csv中同一中介的职位）：前两个是只改了日期、地点和班次的重复发布，
+# 应合并为一个；第三个是另一家快递公司的职位，不应合并
+_COMPANY = '深圳市信达人力资源管理有限公司'
+_FOOTER = ('\n禁止转载\n\n联系我时请说明在1010兼职网看到的\n联系人：袁生\n公司地址：深圳市罗湖清水河街道 [交通地图]\n'
+           '手机：185 {phone} ****点击查看完整电话\n微信：if{wechat}\n提示：请不要交钱给任何单位')
+REPOST_EXAMPLE = [
+    {'职位标题': '6号龙岗龙城广场附近圆通日结', '公司名称': _COMPANY,
+     '职位链接': 'https://sz.1010jz.com/jiazheng/a1794984.html',
+     '职位详情': '龙岗龙城广场地铁站附近圆通扫描分拣建包兼职日结，男女都要， 日结18块一小时，17：00-5：00（10小时170）'
+                 '晚上到14号线嶂背地铁站B出口导航到定位集合、保险一天3块\n\n兼职要求：带身份证或照片，不要拖鞋、凉鞋，'
+                 '短裤超过膝盖可以' + _FOOTER.format(phone='6588', wechat='5015')},
+    {'职位标题': '6日龙岗永湖附近圆通分拣扫描日结', '公司名称': _COMPANY,
+     '职位链接': 'https://sz.1010jz.com/jiazheng/a1797242.html',
+     '职位详情': '龙岗永湖地铁站附近圆通日结，男女都要，日结18块一小时，18:00__6:00，到三号线永湖地铁站A2出口导航到定位集合 。'
+                 '保险一天3块。' + _FOOTER.format(phone='2081', wechat='2066')},
+]
+DIFFERENT_EXAMPLE = {
+    '职位标题': '6号龙岗平湖中通快递日结', '公司名称': _COMPANY, '职位链接': 'https://sz.1010jz.com/jiazheng/a1798952.html',
+    '职位详情': '龙岗平湖中通兼职晚班，男女都要，20-48岁。日结17块一小时，男女都要，20：00-6：00\n晚上7点半集合'
+                + _FOOTER.format(phone='8883', wechat='8254').replace('袁生', '袁'),
+}
+
+
+# 检查阈值：示例中的重复发布能被合并、不同的职位不会被合并，通过时返回True
+def check_examples(threshold=DEFAULT_THRESHOLD):
+    groups = group_near_duplicates(REPOST_EXAMPLE + [DIFFERENT_EXAMPLE], threshold)
+    score = similarity(job_signature(REPOST_EXAMPLE[0]), job_signature(REPOST_EXAMPLE[1]))
+    other = similarity(job_signature(REPOST_EXAMPLE[0]), job_signature(DIFFERENT_EXAMPLE))
+    print(f"重复发布示例的估计相似度 {score:.2f}，不同职位示例 {other:.2f}，阈值 {threshold}")
+    return groups == [0, 0, 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查近似重复职位的合并阈值')
+    parser.add_argument('input', nargs='?', help='职位信息CSV文件，统计按阈值会合并的职位数')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='估计的Jaccard相似度阈值')
+    args = parser.parse_args()
+
+    if not check_examples(args.threshold):
+        print("检查失败：示例中的重复发布没有合并，或不同的职位被合并")
+        sys.exit(1)
+    print("检查通过：示例中的重复发布已合并，不同的职位保持独立")
+    if args.input:
+        import pandas as pd
+
+        jobs = pd.read_csv(args.input).to_dict('records')
+        groups = group_near_duplicates(jobs, args.threshold)
+        collapsed = sum(1 for position, group in enumerate(groups) if group != position)
+        print(f"{args.input}: {len(jobs)} 个职位中有 {collapsed} 个是近似重复的职位")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+# 列式输出：把职位信息经Arrow写成Parquet文件，字段类型固定（薪资等为数值，薪资单位、结算方式、公司名称
+# 按字典编码，发布时间另存一列解析后的日期），并启用压缩；分析脚本按列读取，不需要时跳过体积最大的“职位详情”。
+# 需要安装pyarrow，没有安装时只输出JSON和CSV。
+import csv
+from datetime import datetime
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+from publish_dates import PUBLISH_DATE_FIELD, parse_publish_dates
+
+# 压缩算法
+PARQUET_COMPRESSION = 'zstd'
+# 每个行组的职位数，写入时攒够一组再写，内存占用与职位总数无关
+ROW_GROUP_SIZE = 50000
+
+# 取值种类少、重复多的字段，按字典编码（读入pandas后为category类型）
+DICTIONARY_FIELDS = {'薪资单位', '结算方式', '公司名称', '城市', '分类'}
+# 数值字段
+FLOAT_FIELDS = {'薪资', '时薪', '班次时长', '日薪'}
+INTEGER_FIELDS = {'重复发布次数'}
+
+
+# 是否可以写Parquet文件
+def parquet_available():
+    return pa is not None
+
+
+# 输出字段对应的Arrow表结构
+def job_schema(fieldnames):
+    fields = []
+    for name in fieldnames:
+        if name in DICTIONARY_FIELDS:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        elif name in FLOAT_FIELDS:
+            fields.append(pa.field(name, pa.float64()))
+        elif name in INTEGER_FIELDS:
+            fields.append(pa.field(name, pa.int32()))
+        else:
+            fields.append(pa.field(name, pa.string()))
+    if '发布时间' in fieldnames:
+        fields.append(pa.field(PUBLISH_DATE_FIELD, pa.timestamp('s')))
+    return pa.schema(fields)
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_int(value):
+    number = _to_float(value)
+    return int(number) if number is not None else None
+
+
+def _to_str(value):
+    return None if value is None or value == '' else str(value)
+
+
+class ParquetJobWriter:
+    def __init__(self, filename, fieldnames, crawl_time=None, row_group_size=ROW_GROUP_SIZE,
+                 compression=PARQUET_COMPRESSION):
+        if pa is None:
+            raise ImportError("写Parquet文件需要安装pyarrow")
+        self.filename = filename
+        self.fieldnames = list(fieldnames)
+        # 发布时间只有月日，按爬取时间推断年份
+        self.crawl_time = crawl_time or datetime.now()
+        self.row_group_size = row_group_size
+        self.schema = job_schema(self.fieldnames)
+        self.writer = pq.ParquetWriter(filename, self.schema, compression=compression, use_dictionary=True)
+        self.rows = []
+        self.count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    # 写入一个职位
+    def write(self, job):
+        self.rows.append(job)
+        self.count += 1
+        if len(self.rows) >= self.row_group_size:
+            self.flush()
+
+    # 把已攒下的职位写成一个行组
+    def flush(self):
+        if not self.rows:
+            return
+        arrays = []
+        for field in self.schema:
+            if field.name == PUBLISH_DATE_FIELD:
+                values = parse_publish_dates([job.get('发布时间') for job in self.rows], self.crawl_time)
+                arrays.append(pa.array(values, type=field.type, from_pandas=True))
+            elif field.name in FLOAT_FIELDS:
+                arrays.append(pa.array([_to_float(job.get(field.name)) for job in self.rows], type=field.type))
+            elif field.name in INTEGER_FIELDS:
+                arrays.append(pa.array([_to_int(job.get(field.name)) for job in self.rows], type=field.type))
+            else:
+                values = pa.array([_to_str(job.get(field.name)) for job in self.rows], type=pa.string())
+                if field.name in DICTIONARY_FIELDS:
+                    values = values.dictionary_encode().cast(field.type)
+                arrays.append(values)
+        self.writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.rows = []
+
+    def close(self):
+        if self.writer is not None:
+            self.flush()
+            self.writer.close()
+            self.writer = None
+
+
+# 保存职位列表到Parquet文件
+def write_parquet(jobs, filename, fieldnames):
+    with ParquetJobWriter(filename, fieldnames) as writer:
+        for job in jobs:
+            writer.write(job)
+    return filename
+
+
+# 文件中的字段名（Parquet读取表结构，CSV只读表头）
+def job_columns(path):
+    if path.endswith('.parquet'):
+        return pq.read_schema(path).names
+    with open(path, 'r', encoding='utf-8-sig', newline='') as f:
+        return next(csv.reader(f), [])
+
+
+# 读取职位文件（Parquet或CSV）为DataFrame，columns为需要的字段（文件中没有的字段忽略），为None时读取全部字段；
+# Parquet文件只读取这些列，字典编码字段读入后为category类型
+def read_jobs(path, columns=None):
+    import pandas as pd
+
+    if columns is not None:
+        wanted = set(columns)
+        columns = [name for name in job_columns(path) if name in wanted]
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns)
+
+
+# 分块读取职位文件，每次返回不超过chunk_size行的DataFrame，内存占用与文件大小无关；columns与read_jobs相同
+def iter_jobs(path, columns=None, chunk_size=ROW_GROUP_SIZE):
+    import pandas as pd
+
+    if columns is not None:
+        wanted = set(columns)
+        columns = [name for name in job_columns(path) if name in wanted]
+    if path.endswith('.parquet'):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunk_size)
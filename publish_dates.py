@@ -0,0 +1,67 @@
+# 发布时间解析：网站上的发布时间有完整日期、只有月日、“3天前”、“今天”、只有时分等写法，批量解析为日期；
+# 只有月日时按爬取时间推断年份（爬取时间取快照文件名中的时间戳）。Parquet输出、职位库和分析脚本共用。
+import os
+import re
+from datetime import datetime
+
+# 由“发布时间”解析出的日期列，与分析脚本中的列名相同
+PUBLISH_DATE_FIELD = '标准发布时间'
+# 发布时间的几种写法：完整日期、只有月日（网站上最常见）、“3天前”“2小时前”、“今天”“昨天”、只有时分（当天）
+FULL_DATE_PATTERN = r'(?P<year>\d{4})[-/.年](?P<month>\d{1,2})[-/.月](?P<day>\d{1,2})'
+MONTH_DAY_PATTERN = r'(?P<month>\d{1,2})[-/.月](?P<day>\d{1,2})'
+RELATIVE_PATTERN = r'(?P<amount>\d+)\s*(?P<unit>分钟|小时|天|周)前'
+RELATIVE_UNITS = {'分钟': 60, '小时': 3600, '天': 86400, '周': 7 * 86400}
+RELATIVE_DAYS = {'刚刚': 0, '今天': 0, '昨天': 1, '前天': 2}
+TIME_ONLY_PATTERN = r'^\d{1,2}:\d{2}(:\d{2})?$'
+# 只有月日的日期比爬取时间晚超过这么多天时，视为上一年的日期（例如1月初爬取到的12月下旬的职位）
+FUTURE_TOLERANCE_DAYS = 1
+# 快照文件名中的爬取时间，例如 1010兼职网职位信息_20250506_170502.csv
+CRAWL_TIME_PATTERN = re.compile(r'_(\d{8}_\d{6})')
+
+
+# 快照文件的爬取时间：取文件名中的时间戳，没有时取文件修改时间，文件不存在时返回None
+def crawl_time(path):
+    match = CRAWL_TIME_PATTERN.search(os.path.basename(path))
+    if match:
+        return datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+    if os.path.exists(path):
+        return datetime.fromtimestamp(os.path.getmtime(path))
+    return None
+
+
+def _dates(year, month, day):
+    import pandas as pd
+
+    return pd.to_datetime(pd.DataFrame({'year': year, 'month': month, 'day': day}), errors='coerce')
+
+
+# 批量解析发布时间，返回日期（datetime64，精确到天，无法解析时为NaT），values为Series时保留其索引。
+# reference为爬取时间（默认为现在）：只有月日的日期按爬取时间所在年份解析，晚于爬取时间的算作上一年；
+# 相对时间从爬取时间往前推算。相同的取值只解析一次
+def parse_publish_dates(values, reference=None):
+    import numpy as np
+    import pandas as pd
+
+    reference = pd.Timestamp(reference or datetime.now())
+    values = values if isinstance(values, pd.Series) else pd.Series(list(values), dtype=object)
+    codes, uniques = pd.factorize(values)
+    text = pd.Series(np.asarray(uniques, dtype=object), dtype=object).astype(str).str.strip()
+
+    full = text.str.extract(FULL_DATE_PATTERN).astype(float)
+    dates = _dates(full['year'], full['month'], full['day'])
+
+    month_day = text.str.extract(MONTH_DAY_PATTERN).astype(float)
+    this_year = _dates(reference.year, month_day['month'], month_day['day'])
+    last_year = _dates(reference.year - 1, month_day['month'], month_day['day'])
+    rolled_over = this_year > reference.normalize() + pd.Timedelta(days=FUTURE_TOLERANCE_DAYS)
+    dates = dates.fillna(this_year.mask(rolled_over, last_year))
+
+    relative = text.str.extract(RELATIVE_PATTERN)
+    seconds = relative['amount'].astype(float) * relative['unit'].map(RELATIVE_UNITS)
+    seconds = seconds.fillna(text.map(RELATIVE_DAYS) * 86400)
+    seconds = seconds.mask(seconds.isna() & text.str.match(TIME_ONLY_PATTERN), 0)
+    dates = dates.fillna(reference - pd.to_timedelta(seconds, unit='s')).dt.normalize()
+
+    # 按编号展开到每一行，缺失值（编号为-1）取最后追加的NaT
+    parsed = np.append(dates.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))[codes]
+    return pd.Series(parsed, index=values.index, name=PUBLISH_DATE_FIELD)
@@ -0,0 +1,144 @@
+# 可合并的分位数草图（KLL sketch）：用固定大小的内存近似一组数值的分位数，不保存全部数据。
+# 两个草图可以合并（不同文件、不同进程、不同时间段的数据分别统计后再合并），合并后的误差与一次统计全部数据相同。
+# 数量、总和、最小值、最大值是精确的；分位数的排名误差约为 1.7/k（k=200 时约1%），与数据量无关，
+# 每个草图保存的数值不超过约 3k 个。
+#   sketch = QuantileSketch()
+#   sketch.update(values)
+#   sketch.merge(other_sketch)
+#   sketch.quantiles([0.25, 0.5, 0.75])
+import math
+
+import numpy as np
+
+# 草图大小（最高层压缩器的容量），越大越精确
+DEFAULT_K = 200
+# 每往下一层，压缩器容量乘以这个比例
+CAPACITY_RATIO = 2 / 3
+# 压缩器的最小容量
+MIN_CAPACITY = 2
+
+
+class QuantileSketch:
+    def __init__(self, k=DEFAULT_K):
+        self.k = k
+        # 第h层中的每个数值代表2^h个原始数值
+        self.levels = [np.empty(0)]
+        # 各层下次压缩时升层的起始位置（0为偶数位、1为奇数位），每次压缩后交替，
+        # 代替随机选择，相同的数据（按相同顺序加入和合并）总是得到相同的草图
+        self.offsets = [0]
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def __len__(self):
+        return self.count
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(int(math.ceil(self.k * CAPACITY_RATIO ** depth)), MIN_CAPACITY)
+
+    def _add_level(self):
+        self.levels.append(np.empty(0))
+        self.offsets.append(0)
+
+    # 压缩超过容量的层：排序后交替取偶数位或奇数位的一半升到上一层
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self._add_level()
+                items = np.sort(items)
+                # 个数为奇数时留下一个，保证升层的个数为偶数
+                kept, items = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = items[self.offsets[level]::2]
+                self.offsets[level] ^= 1
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    # 加入一批数值（缺失值忽略）
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+        return self
+
+    # 加入一批已排序、没有缺失值的数值（按分组批量加入时使用，省去检查和求最值）
+    def extend_sorted(self, values):
+        if not len(values):
+            return self
+        self.count += len(values)
+        self.sum += float(values.sum())
+        self.min = min(self.min, float(values[0]))
+        self.max = max(self.max, float(values[-1]))
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        if len(self.levels[0]) > self._capacity(0):
+            self._compress()
+        return self
+
+    # 合并另一个草图
+    def merge(self, other):
+        while len(self.levels) < len(other.levels):
+            self._add_level()
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    # 保存的数值及其权重（按数值排序），可作为加权样本绘制直方图
+    def weighted_items(self):
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        order = np.argsort(values, kind='stable')
+        return values[order], weights[order]
+
+    # 近似分位数（q为0~1之间的数或数组），0和1分别为精确的最小值和最大值；空草图返回nan
+    def quantiles(self, q):
+        q = np.asarray(q, dtype=float)
+        if not self.count:
+            return np.full(q.shape, np.nan)
+        values, weights = self.weighted_items()
+        # 与numpy.percentile的线性插值一致：第i个保存的数值代表排名在 [累计权重-权重, 累计权重) 的原始数值
+        ranks = np.cumsum(weights) - weights / 2
+        ranks = (ranks - ranks[0]) / max(ranks[-1] - ranks[0], 1e-12) if len(values) > 1 else np.zeros(1)
+        result = np.interp(q, ranks, values) if len(values) > 1 else np.full(q.shape, values[0])
+        return np.where(q <= 0, self.min, np.where(q >= 1, self.max, result))
+
+    def quantile(self, q):
+        return float(self.quantiles(q))
+
+    # 保存为可写入JSON的字典
+    def to_dict(self):
+        return {'k': self.k, 'count': self.count, 'sum': self.sum,
+                'min': self.min if self.count else None, 'max': self.max if self.count else None,
+                'levels': [items.tolist() for items in self.levels], 'offsets': self.offsets}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data['k'])
+        sketch.levels = [np.asarray(items, dtype=float) for items in data['levels']] or [np.empty(0)]
+        sketch.offsets = list(data.get('offsets') or [0] * len(sketch.levels))
+        sketch.count = data['count']
+        sketch.sum = data['sum']
+        sketch.min = data['min'] if data['min'] is not None else math.inf
+        sketch.max = data['max'] if data['max'] is not None else -math.inf
+        return sketch
+
+
+# 由一组数值建立草图
+def sketch_of(values, k=DEFAULT_K):
+    return QuantileSketch(k).update(values)
@@ -0,0 +1,213 @@
+# 按站点自适应的请求调度：每个主机一个令牌桶限制请求速率，并用AIMD（加性增、乘性减）调整速率和并发上限。
+# 响应快且没有错误时逐步加快，遇到超时、429或5xx时立即减半并短暂退避（429时遵守Retry-After），
+# 速率和并发都不超过设定的上限。列表页（浏览器）和详情页（HTTP）共用同一个调度器，代替固定的翻页等待。
+# 多个进程爬取同一站点时，用SchedulerManager在一个管理进程中保存调度器，各进程通过SharedRateScheduler共用，
+# 同一主机的速率和并发上限是所有进程合计的，不会随进程数成倍增加。
+import asyncio
+import threading
+import time
+from contextlib import asynccontextmanager
+from multiprocessing.managers import BaseManager
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from crawl_metrics import metrics
+
+# 视为服务器过载的状态码
+BACKOFF_STATUSES = {429, 500, 502, 503, 504}
+# 并发已满时重新检查的间隔（秒）
+SLOT_POLL_INTERVAL = 0.05
+# 状态日志的输出间隔（秒）
+LOG_INTERVAL = 10.0
+
+
+class HostLimiter:
+    def __init__(self, host, rate, concurrency):
+        self.host = host
+        # 当前允许的请求速率（次/秒）和并发上限
+        self.rate = rate
+        self.concurrency = concurrency
+        self.tokens = 1.0
+        self.last_refill = time.monotonic()
+        self.in_flight = 0
+        # 退避结束时间，此前不发出新请求
+        self.paused_until = 0.0
+        # 上次减速时间，同一波失败只减速一次
+        self.last_decrease = 0.0
+        # 响应耗时的指数移动平均
+        self.latency = None
+        self.successes = 0
+        self.failures = 0
+
+    def describe(self):
+        state = "退避中" if self.paused_until > time.monotonic() else "正常"
+        latency = f"{self.latency:.2f} 秒" if self.latency is not None else "-"
+        return (f"[调速] {self.host} 速率 {self.rate:.2f} 次/秒，并发上限 {int(self.concurrency)}，"
+                f"平均响应 {latency}，成功 {self.successes} 次，失败 {self.failures} 次，{state}")
+
+
+class RateScheduler:
+    def __init__(self, initial_rate=2.0, max_rate=8.0, min_rate=0.2, initial_concurrency=2, max_concurrency=8,
+                 rate_step=0.1, decrease_factor=0.5, slow_latency=5.0, backoff=2.0, max_backoff=60.0):
+        self.initial_rate = initial_rate
+        self.max_rate = max_rate
+        self.min_rate = min_rate
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        # 每次成功后速率增加的量
+        self.rate_step = rate_step
+        self.decrease_factor = decrease_factor
+        # 响应超过该秒数时视为过载
+        self.slow_latency = slow_latency
+        # 失败后的退避秒数（没有Retry-After时）和上限
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hosts = {}
+        # 浏览器线程和HTTP协程会同时使用
+        self.lock = threading.Lock()
+        self.last_log = time.monotonic()
+
+    def _limiter(self, url):
+        host = urlsplit(url).netloc
+        limiter = self.hosts.get(host)
+        if limiter is None:
+            limiter = self.hosts[host] = HostLimiter(host, self.initial_rate,
+                                                     min(self.initial_concurrency, self.max_concurrency))
+        return limiter
+
+    # 尝试占用一个请求名额，成功返回0，否则返回建议等待的秒数
+    def try_acquire(self, url):
+        with self.lock:
+            limiter = self._limiter(url)
+            now = time.monotonic()
+            if limiter.paused_until > now:
+                return limiter.paused_until - now
+            if limiter.in_flight >= int(limiter.concurrency):
+                return SLOT_POLL_INTERVAL
+            # 补充令牌，桶容量为1秒的请求量
+            capacity = max(1.0, limiter.rate)
+            limiter.tokens = min(capacity, limiter.tokens + (now - limiter.last_refill) * limiter.rate)
+            limiter.last_refill = now
+            if limiter.tokens < 1:
+                return (1 - limiter.tokens) / limiter.rate
+            limiter.tokens -= 1
+            limiter.in_flight += 1
+            return 0
+
+    # 协程中等待请求名额
+    async def acquire(self, url):
+        start = time.perf_counter()
+        while True:
+            delay = self.try_acquire(url)
+            if not delay:
+                break
+            await asyncio.sleep(delay)
+        metrics.observe('rate_wait', time.perf_counter() - start, url)
+
+    # 线程中等待请求名额（浏览器加载页面前调用）
+    def acquire_sync(self, url):
+        start = time.perf_counter()
+        while True:
+            delay = self.try_acquire(url)
+            if not delay:
+                break
+            time.sleep(delay)
+        metrics.observe('rate_wait', time.perf_counter() - start, url)
+
+    # 报告请求结果：status为HTTP状态码（浏览器请求为None），error表示超时或连接失败，
+    # retry_after为服务器要求的等待秒数
+    def release(self, url, latency, status=None, error=False, retry_after=None):
+        with self.lock:
+            limiter = self._limiter(url)
+            limiter.in_flight = max(0, limiter.in_flight - 1)
+            limiter.latency = latency if limiter.latency is None else 0.8 * limiter.latency + 0.2 * latency
+            overloaded = error or status in BACKOFF_STATUSES or latency > self.slow_latency
+            if overloaded:
+                limiter.failures += 1
+                self._decrease(limiter, status, retry_after)
+            else:
+                limiter.successes += 1
+                limiter.rate = min(self.max_rate, limiter.rate + self.rate_step)
+                limiter.concurrency = min(self.max_concurrency, limiter.concurrency + 1 / limiter.concurrency)
+            if time.monotonic() - self.last_log >= LOG_INTERVAL:
+                self.last_log = time.monotonic()
+                for host_limiter in self.hosts.values():
+                    print(host_limiter.describe())
+
+    def _decrease(self, limiter, status, retry_after):
+        now = time.monotonic()
+        metrics.increment('rate_backoff')
+        pause = retry_after if retry_after is not None else self.backoff
+        limiter.paused_until = max(limiter.paused_until, now + min(pause, self.max_backoff))
+        # 上次减速后至少过一个响应周期才再次减速，避免同一波失败把速率降到最低
+        if now - limiter.last_decrease < max(limiter.latency or 0, 1.0):
+            return
+        limiter.last_decrease = now
+        limiter.rate = max(self.min_rate, limiter.rate * self.decrease_factor)
+        limiter.concurrency = max(1.0, limiter.concurrency * self.decrease_factor)
+        reason = f"状态码 {status}" if status else "超时或响应过慢"
+        print(f"[调速] {limiter.host} {reason}，降速至 {limiter.rate:.2f} 次/秒，并发上限 {int(limiter.concurrency)}，"
+              f"暂停 {min(pause, self.max_backoff):.1f} 秒")
+
+    # 按调度发出GET请求，用法与session.get相同：async with scheduler.get(session, url) as response
+    # timing为字典时，取得名额、真正发出请求的时刻写入timing['start']（不含排队等待的时间）
+    @asynccontextmanager
+    async def get(self, session, url, timing=None, **kwargs):
+        await self.acquire(url)
+        start = time.perf_counter()
+        if timing is not None:
+            timing['start'] = start
+        status = None
+        retry_after = None
+        error = False
+        try:
+            async with session.get(url, **kwargs) as response:
+                status = response.status
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                yield response
+        except (asyncio.TimeoutError, asyncio.CancelledError, aiohttp.ClientError):
+            # 请求超时或被外层取消，同样按超时处理
+            error = True
+            raise
+        finally:
+            self.release(url, time.perf_counter() - start, status, error, retry_after)
+
+    # 输出所有主机的当前状态
+    def print_status(self):
+        with self.lock:
+            for limiter in self.hosts.values():
+                print(limiter.describe())
+
+
+# 在管理进程中保存调度器的管理器：
+#   with SchedulerManager() as manager:
+#       proxy = manager.RateScheduler(max_concurrency=8)   # 代理可以传给其他进程
+class SchedulerManager(BaseManager):
+    pass
+
+
+SchedulerManager.register('RateScheduler', RateScheduler, exposed=['try_acquire', 'release', 'print_status'])
+
+
+# 多个进程共用的调度器：占用和归还请求名额都交给管理进程中的调度器（proxy），等待在本进程中进行
+class SharedRateScheduler(RateScheduler):
+    def __init__(self, proxy):
+        self.proxy = proxy
+
+    def try_acquire(self, url):
+        return self.proxy.try_acquire(url)
+
+    def release(self, url, latency, status=None, error=False, retry_after=None):
+        self.proxy.release(url, latency, status, error, retry_after)
+
+    def print_status(self):
+        self.proxy.print_status()
+
+
+# 解析Retry-After响应头（秒数形式），无法解析时返回None
+def parse_retry_after(value):
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,297 @@
+# 本地HTTP响应缓存：按URL索引，响应正文按SHA-256内容寻址存放，记录响应头、ETag/Last-Modified，
+# 列表页和详情页使用不同的有效期，过期后用条件请求重新验证，总大小超过上限时按最近最少使用淘汰。
+# 缓存的页面与实时页面走同一套解析代码，修改选择器后可以离线重新解析：
+#   python response_cache.py --stats
+#   python response_cache.py --reparse
+import argparse
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# 默认缓存目录
+DEFAULT_CACHE_DIR = ".http_cache"
+# 默认缓存总大小上限（字节）
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# 各类页面的缓存有效期（秒）：列表页变化快，详情页发布后基本不变
+PAGE_TTLS = {
+    'listing': 10 * 60,
+    'detail': 7 * 24 * 3600,
+    'other': 24 * 3600,
+}
+
+LISTING_URL_PATTERN = re.compile(r'/index\d*\.html$')
+DETAIL_URL_PATTERN = re.compile(r'/a\d+\.html$')
+
+# 重新验证时需要保存的响应头
+KEPT_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Date')
+
+CachedResponse = namedtuple('CachedResponse', ['url', 'status', 'headers', 'body', 'content_hash',
+                                               'fetched_at', 'page_type'])
+
+
+# 根据URL判断页面类型
+def page_type(url):
+    path = url.split('?', 1)[0]
+    if LISTING_URL_PATTERN.search(path):
+        return 'listing'
+    if DETAIL_URL_PATTERN.search(path):
+        return 'detail'
+    return 'other'
+
+
+class ResponseCache:
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES, ttls=None, offline=False):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.ttls = dict(PAGE_TTLS, **(ttls or {}))
+        # 离线模式：只使用缓存，不发出任何请求
+        self.offline = offline
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self._stores_since_evict = 0
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        # 流水线方式下列表线程和详情协程会同时访问；多个分片进程共用同一目录时依靠SQLite的文件锁
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                page_type TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_content_hash ON responses (content_hash)")
+        self.conn.commit()
+
+    def _object_path(self, content_hash):
+        return os.path.join(self.directory, 'objects', content_hash[:2], content_hash)
+
+    def _read_object(self, content_hash):
+        try:
+            with open(self._object_path(content_hash), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    # 查找缓存条目并更新最近访问时间，不存在或正文文件丢失时返回None
+    def lookup(self, url):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, content_hash, fetched_at, page_type FROM responses WHERE url = ?",
+                (url,)).fetchone()
+            if row is None:
+                return None
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+        status, headers, content_hash, fetched_at, kind = row
+        body = self._read_object(content_hash)
+        if body is None:
+            return None
+        return CachedResponse(url, status, json.loads(headers), body, content_hash, fetched_at, kind)
+
+    # 条目是否仍在有效期内
+    def is_fresh(self, entry, now=None):
+        now = now or time.time()
+        return now - entry.fetched_at < self.ttls.get(entry.page_type, self.ttls['other'])
+
+    # 重新验证用的条件请求头
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry.headers.get('ETag'):
+            headers['If-None-Match'] = entry.headers['ETag']
+        if entry.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = entry.headers['Last-Modified']
+        return headers
+
+    # 保存响应，正文按内容哈希存放，相同内容只存一份
+    def store(self, url, status, headers, body):
+        content_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, 'wb') as f:
+                f.write(body)
+            os.replace(temp_path, path)
+        kept = {name: headers[name] for name in KEPT_HEADERS if headers.get(name)}
+        now = time.time()
+        kind = page_type(url)
+        with self.lock:
+            self.conn.execute("""
+                INSERT OR REPLACE INTO responses
+                (url, status, headers, etag, last_modified, content_hash, size, page_type, fetched_at, last_access)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (url, status, json.dumps(kept), kept.get('ETag'), kept.get('Last-Modified'),
+                  content_hash, len(body), kind, now, now))
+            self.conn.commit()
+            self._stores_since_evict += 1
+        if self._stores_since_evict >= 50:
+            self.evict()
+        return CachedResponse(url, status, kept, body, content_hash, now, kind)
+
+    # 收到304后刷新获取时间
+    def refresh(self, url):
+        now = time.time()
+        with self.lock:
+            self.conn.execute("UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?", (now, now, url))
+            self.conn.commit()
+
+    # 缓存总大小（相同内容只计算一次）
+    def total_bytes(self):
+        with self.lock:
+            return self.conn.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT content_hash, size FROM responses)").fetchone()[0]
+
+    # 总大小超过上限时，按最近访问时间从旧到新删除条目，直到降到上限的90%以下
+    def evict(self):
+        self._stores_since_evict = 0
+        total = self.total_bytes()
+        if total <= self.max_bytes:
+            return 0
+        target = self.max_bytes * 0.9
+        removed = 0
+        with self.lock:
+            rows = self.conn.execute("SELECT url, content_hash, size FROM responses ORDER BY last_access").fetchall()
+            for url, content_hash, size in rows:
+                if total <= target:
+                    break
+                self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                removed += 1
+                # 没有其它URL引用同一内容时才删除正文文件
+                still_used = self.conn.execute("SELECT 1 FROM responses WHERE content_hash = ? LIMIT 1",
+                                               (content_hash,)).fetchone()
+                if not still_used:
+                    total -= size
+                    try:
+                        os.remove(self._object_path(content_hash))
+                    except OSError:
+                        pass
+            self.conn.commit()
+        print(f"缓存超过上限，已淘汰 {removed} 个最久未使用的页面")
+        return removed
+
+    # 获取页面：有效期内直接返回缓存，过期时发送条件请求，未缓存时正常请求并保存；失败返回None
+    # scheduler（RateScheduler）不为None时，只有真正发出的请求受其限速；
+    # timing为字典时，真正发出请求的时刻写入timing['start']，直接返回缓存时不写入
+    async def fetch(self, session, url, scheduler=None, timing=None, **kwargs):
+        entry = self.lookup(url)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            self.hits += 1
+            return entry.body
+        if self.offline:
+            print(f"离线模式：缓存中没有页面 {url}")
+            self.misses += 1
+            return None
+
+        headers = self.conditional_headers(entry) if entry is not None else {}
+        if scheduler is not None:
+            request = scheduler.get(session, url, timing, headers=headers, **kwargs)
+        else:
+            if timing is not None:
+                timing['start'] = time.perf_counter()
+            request = session.get(url, headers=headers, **kwargs)
+        async with request as response:
+            if response.status == 304 and entry is not None:
+                self.refresh(url)
+                self.revalidated += 1
+                return entry.body
+            if response.status != 200:
+                print(f"获取页面失败: {url} 状态码 {response.status}")
+                return None
+            body = await response.read()
+            self.store(url, response.status, response.headers, body)
+            self.misses += 1
+            return body
+
+    # 遍历缓存中的条目（可按页面类型过滤），按URL排序
+    def iter_entries(self, kind=None):
+        with self.lock:
+            if kind:
+                urls = [row[0] for row in self.conn.execute(
+                    "SELECT url FROM responses WHERE page_type = ? ORDER BY url", (kind,))]
+            else:
+                urls = [row[0] for row in self.conn.execute("SELECT url FROM responses ORDER BY url")]
+        for url in urls:
+            entry = self.lookup(url)
+            if entry is not None:
+                yield entry
+
+    def stats(self):
+        with self.lock:
+            counts = dict(self.conn.execute("SELECT page_type, COUNT(*) FROM responses GROUP BY page_type").fetchall())
+        return {'pages': counts, 'bytes': self.total_bytes(), 'hits': self.hits,
+                'revalidated': self.revalidated, 'misses': self.misses}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# 只用缓存重新解析所有列表页和详情页，不产生任何网络请求，结果生成新的JSON和CSV文件
+def reparse_cache(cache):
+    from crawl_journal import JobJournal
+    from detail_fetcher import DETAIL_NOT_FOUND, parse_job_detail
+    from listing_extractor import parse_listing_html, rows_to_jobs
+
+    journal_path = os.path.join(cache.directory, 'reparse.journal.jsonl')
+    if os.path.exists(journal_path):
+        os.remove(journal_path)
+    journal = JobJournal(journal_path)
+    seen_urls = set()
+    for listing in cache.iter_entries('listing'):
+        rows = parse_listing_html(listing.body, listing.url) or []
+        for job in rows_to_jobs(rows):
+            if job['职位链接'] in seen_urls:
+                continue
+            seen_urls.add(job['职位链接'])
+            detail = cache.lookup(job['职位链接'])
+            job['职位详情'] = (parse_job_detail(detail.body) if detail else None) or DETAIL_NOT_FOUND
+            journal.append(job)
+    print(f"从缓存中重新解析出 {len(journal)} 个职位")
+    filenames = journal.finalize() if len(journal) else None
+    journal.remove()
+    return filenames
+
+
+def main():
+    parser = argparse.ArgumentParser(description='1010兼职网HTTP响应缓存')
+    parser.add_argument('--cache-dir', default=DEFAULT_CACHE_DIR, help='缓存目录')
+    parser.add_argument('--stats', action='store_true', help='显示缓存统计信息')
+    parser.add_argument('--reparse', action='store_true', help='只用缓存离线重新解析所有页面')
+    parser.add_argument('--max-mb', type=float, default=None, help='按新的大小上限（MB）淘汰缓存')
+    args = parser.parse_args()
+
+    cache = ResponseCache(args.cache_dir)
+    try:
+        if args.max_mb is not None:
+            cache.max_bytes = int(args.max_mb * 1024 * 1024)
+            cache.evict()
+        if args.reparse:
+            reparse_cache(cache)
+        if args.stats or not (args.reparse or args.max_mb is not None):
+            stats = cache.stats()
+            print(f"缓存目录: {os.path.abspath(cache.directory)}")
+            print(f"页面数量: {stats['pages']}")
+            print(f"占用空间: {stats['bytes'] / 1024 / 1024:.1f} MB")
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    main()
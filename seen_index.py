@@ -0,0 +1,71 @@
+# 已爬取职位索引：用SQLite持久化记录每个职位ID的首次和最近出现时间，
+# 增量爬取时跳过已知职位的详情获取，并在整页都是已知职位时提前停止翻页。
+import sqlite3
+import threading
+from datetime import datetime
+
+from detail_fetcher import DETAIL_ERROR, DETAIL_NOT_FOUND
+from job_ids import parse_job_id
+
+# 默认索引文件
+DEFAULT_INDEX_FILE = "1010兼职网已爬取职位.sqlite3"
+
+
+class SeenIndex:
+    def __init__(self, path=DEFAULT_INDEX_FILE):
+        self.path = path
+        # 流水线方式下列表线程和详情协程会同时访问，用锁保护同一个连接
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS seen_jobs (
+                job_id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen_jobs").fetchone()[0]
+
+    # 过滤掉已知职位，返回新职位列表；已知职位只更新最近出现时间
+    def filter_new(self, jobs):
+        ids = [parse_job_id(job['职位链接']) for job in jobs]
+        wanted = [job_id for job_id in ids if job_id is not None]
+        now = datetime.now().isoformat(timespec='seconds')
+        with self.lock:
+            known = set()
+            if wanted:
+                placeholders = ','.join('?' * len(wanted))
+                known = {row[0] for row in self.conn.execute(
+                    f"SELECT job_id FROM seen_jobs WHERE job_id IN ({placeholders})", wanted)}
+                self.conn.executemany("UPDATE seen_jobs SET last_seen = ? WHERE job_id = ?",
+                                      [(now, job_id) for job_id in known])
+                self.conn.commit()
+        # 解析不出ID的职位无法判断是否已爬取，按新职位处理
+        return [job for job, job_id in zip(jobs, ids) if job_id is None or job_id not in known]
+
+    # 记录已成功获取详情的职位；获取失败的职位不记录，下次运行时重新获取
+    def mark_seen(self, jobs):
+        now = datetime.now().isoformat(timespec='seconds')
+        rows = []
+        for job in jobs:
+            job_id = parse_job_id(job['职位链接'])
+            if job_id is None or job.get('职位详情') in (None, DETAIL_NOT_FOUND, DETAIL_ERROR):
+                continue
+            rows.append((job_id, job['职位链接'], now, now))
+        if not rows:
+            return
+        with self.lock:
+            self.conn.executemany("""
+                INSERT INTO seen_jobs (job_id, url, first_seen, last_seen) VALUES (?, ?, ?, ?)
+                ON CONFLICT(job_id) DO UPDATE SET last_seen = excluded.last_seen
+            """, rows)
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,257 @@
+# 多城市、多分类的分片爬取：把 城市 × 分类 × 页码范围 切分为多个分片，分配到进程池并行爬取，
+# 每个工作进程使用自己的HTTP会话（或自己的Edge浏览器），结果按职位ID去重后合并为一个文件，并增加“城市”“分类”两列。
+# 自适应调速器只有一个，保存在管理进程中由所有工作进程共用，同一城市子域名的请求速率和并发是所有分片合计的。
+# 用法：
+#   python sharded_crawl.py --cities sz gz dg --categories job --pages 1-10 --workers 4
+#   python sharded_crawl.py --cities sz=深圳 --categories gongren paifa --pages 1-5 --listing-mode selenium
+import argparse
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import aiohttp
+
+from crawl_journal import JOB_FIELDS, JobJournal
+from detail_fields import DETAIL_FIELDS, extract_detail_fields
+from parquet_output import parquet_available
+from detail_fetcher import create_session, fetch_html, fetch_job_detail, set_rate_scheduler, set_response_cache
+from rate_scheduler import RateScheduler, SchedulerManager, SharedRateScheduler
+from response_cache import ResponseCache
+from listing_extractor import LISTING_XPATH, extract_listing_rows, parse_listing_html, rows_to_jobs
+from job_ids import parse_job_id
+
+# 合并结果中增加的字段，以及从职位详情中提取的结构化字段
+SHARD_FIELDS = JOB_FIELDS + ['城市', '分类'] + DETAIL_FIELDS
+
+# 常见城市子域名对应的城市名称，未列出的子域名直接使用子域名本身，也可用 sz=深圳 的形式指定
+CITY_NAMES = {
+    'sz': '深圳', 'gz': '广州', 'dg': '东莞', 'fs': '佛山', 'bj': '北京', 'sh': '上海',
+    'hz': '杭州', 'nj': '南京', 'wh': '武汉', 'cd': '成都', 'cq': '重庆', 'xa': '西安',
+    'tj': '天津', 'cs': '长沙', 'zz': '郑州', 'xm': '厦门',
+}
+
+# 列表页超时或连接出错时的重试次数，以及第一次重试前的等待秒数（之后每次加倍）
+LISTING_RETRIES = 2
+LISTING_RETRY_DELAY = 2.0
+# 获取列表页时按失败处理的异常
+LISTING_ERRORS = (asyncio.TimeoutError, OSError, aiohttp.ClientError)
+
+# 一个分片：城市子域名、城市名称、分类、起止页码
+Shard = namedtuple('Shard', ['city', 'city_name', 'category', 'start_page', 'end_page'])
+
+
+# 列表页地址，例如 https://sz.1010jz.com/job/index1.html
+def listing_url(city, category, page_num):
+    return f"https://{city}.1010jz.com/{category}/index{page_num}.html"
+
+
+# 把 城市 × 分类 × 页码范围 切分为分片，每个分片最多pages_per_shard页
+def make_shards(cities, categories, start_page, end_page, pages_per_shard=5):
+    shards = []
+    for city in cities:
+        city, _, city_name = city.partition('=')
+        city_name = city_name or CITY_NAMES.get(city, city)
+        for category in categories:
+            for first in range(start_page, end_page + 1, pages_per_shard):
+                last = min(first + pages_per_shard - 1, end_page)
+                shards.append(Shard(city, city_name, category, first, last))
+    return shards
+
+
+# 用浏览器读取列表页（列表页必须由浏览器渲染时使用），每个进程一个无头浏览器，第一次使用时才启动
+class BrowserListing:
+    def __init__(self, scheduler, headless=True):
+        from driver_pool import DriverPool
+
+        self.pool = DriverPool(size=1, headless=headless)
+        self.scheduler = scheduler
+
+    def rows(self, page_url):
+        from selenium.common.exceptions import TimeoutException
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support import expected_conditions as EC
+
+        with self.pool.driver() as managed:
+            self.scheduler.acquire_sync(page_url)
+            start = time.perf_counter()
+            try:
+                managed.get(page_url)
+                managed.wait.until(EC.presence_of_element_located((By.XPATH, LISTING_XPATH)))
+            except TimeoutException:
+                self.scheduler.release(page_url, time.perf_counter() - start, error=True)
+                return None
+            except Exception:
+                self.scheduler.release(page_url, time.perf_counter() - start, error=True)
+                raise
+            self.scheduler.release(page_url, time.perf_counter() - start)
+            return extract_listing_rows(managed.driver)
+
+    def close(self):
+        self.pool.close()
+
+
+# 获取列表页HTML，超时或连接出错（例如断开连接、响应不完整）时按指数退避重试，多次失败时抛出最后一次的异常；
+# 状态码不是200时返回None
+async def fetch_listing_html(session, page_url, retries=LISTING_RETRIES):
+    for attempt in range(retries + 1):
+        try:
+            return await fetch_html(session, page_url)
+        except LISTING_ERRORS as e:
+            print(f"获取列表页失败（第{attempt + 1}次）: {page_url} {str(e)}")
+            if attempt == retries:
+                raise
+            await asyncio.sleep(LISTING_RETRY_DELAY * 2 ** attempt)
+
+
+async def _crawl_shard(shard, journal, concurrency, listing_mode, scheduler):
+    semaphore = asyncio.Semaphore(concurrency)
+    browser = BrowserListing(scheduler) if listing_mode == 'selenium' else None
+    try:
+        async with create_session(concurrency) as session:
+            for page_num in range(shard.start_page, shard.end_page + 1):
+                page_url = listing_url(shard.city, shard.category, page_num)
+                if browser is not None:
+                    rows = await asyncio.get_running_loop().run_in_executor(None, browser.rows, page_url)
+                else:
+                    # 多次失败的页面跳过，继续下一页，本分片已写入的职位保留
+                    try:
+                        html = await fetch_listing_html(session, page_url)
+                    except LISTING_ERRORS:
+                        print(f"[{shard.city}/{shard.category}] 第{page_num}页多次获取失败，跳过")
+                        continue
+                    rows = parse_listing_html(html, page_url) if html else None
+                # 没有职位列表时说明已超过该分类的最后一页
+                if not rows:
+                    print(f"[{shard.city}/{shard.category}] 第{page_num}页没有职位，结束本分片")
+                    break
+                page_jobs = rows_to_jobs(rows)
+                details = await asyncio.gather(*(fetch_job_detail(session, job['职位链接'], semaphore)
+                                                 for job in page_jobs))
+                for job, detail in zip(page_jobs, details):
+                    job['职位详情'] = detail
+                    job['城市'] = shard.city_name
+                    job['分类'] = shard.category
+                    job.update(extract_detail_fields(job))
+                    journal.append(job)
+                print(f"[{shard.city}/{shard.category}] 第{page_num}页完成，{len(page_jobs)} 个职位")
+    finally:
+        if browser is not None:
+            browser.close()
+
+
+# 工作进程入口：爬取一个分片，结果写入分片自己的日志文件，返回 (日志路径, 职位数量)。
+# shared_scheduler为管理进程中调度器的代理（见run_sharded_crawl），为None时使用本进程自己的调度器
+def crawl_shard(shard, journal_path, concurrency=8, listing_mode='http', cache_dir=None, shared_scheduler=None):
+    journal = JobJournal(journal_path, fieldnames=SHARD_FIELDS)
+    # 各进程打开同一个缓存目录
+    cache = ResponseCache(cache_dir) if cache_dir else None
+    set_response_cache(cache)
+    # 列表页和详情页的请求间隔由调速器控制，代替固定的翻页等待
+    if shared_scheduler is not None:
+        scheduler = SharedRateScheduler(shared_scheduler)
+    else:
+        scheduler = RateScheduler(max_concurrency=concurrency)
+    set_rate_scheduler(scheduler)
+    try:
+        asyncio.run(_crawl_shard(shard, journal, concurrency, listing_mode, scheduler))
+        if shared_scheduler is None:
+            scheduler.print_status()
+    finally:
+        journal.close()
+        if cache is not None:
+            cache.close()
+    return journal_path, len(journal)
+
+
+# 按职位ID去重，把各分片日志依次合并到一个日志中，返回合并后的日志
+def merge_shards(journal_paths, merged_path):
+    merged = JobJournal(merged_path, fieldnames=SHARD_FIELDS)
+    seen_ids = set()
+    duplicates = 0
+    for path in journal_paths:
+        for job in JobJournal(path, fieldnames=SHARD_FIELDS).iter_records():
+            job_id = parse_job_id(job['职位链接']) or job['职位链接']
+            if job_id in seen_ids:
+                duplicates += 1
+                continue
+            seen_ids.add(job_id)
+            merged.append(job)
+    merged.sync()
+    print(f"合并完成：{len(merged)} 个职位，去掉重复职位 {duplicates} 个")
+    return merged
+
+
+# 并行爬取所有分片并合并结果，返回最终的JSON和CSV文件名。
+# 所有进程共用一个调度器，concurrency既是每个进程同时获取详情页的数量，也是每个主机合计的并发上限
+def run_sharded_crawl(shards, workers=None, concurrency=8, listing_mode='http', cache_dir=None):
+    workers = workers or os.cpu_count() or 1
+    work_dir = tempfile.mkdtemp(prefix='1010jz_shards_')
+    start = time.perf_counter()
+    print(f"共 {len(shards)} 个分片，使用 {workers} 个进程")
+    try:
+        journal_paths = {}
+        with SchedulerManager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+            scheduler = manager.RateScheduler(max_concurrency=concurrency)
+            futures = {}
+            for index, shard in enumerate(shards):
+                path = os.path.join(work_dir, f"shard_{index}.jsonl")
+                future = executor.submit(crawl_shard, shard, path, concurrency, listing_mode, cache_dir, scheduler)
+                futures[future] = (index, shard)
+            for future in as_completed(futures):
+                index, shard = futures[future]
+                try:
+                    path, count = future.result()
+                    journal_paths[index] = path
+                    print(f"分片 {shard.city}/{shard.category} 第{shard.start_page}-{shard.end_page}页完成，{count} 个职位")
+                except Exception as e:
+                    print(f"分片 {shard.city}/{shard.category} 第{shard.start_page}-{shard.end_page}页出错: {str(e)}")
+                    # 出错前已写入的职位仍然保留
+                    journal_paths[index] = os.path.join(work_dir, f"shard_{index}.jsonl")
+            scheduler.print_status()
+
+        # 按分片顺序合并，保证结果顺序稳定
+        merged = merge_shards([journal_paths[index] for index in sorted(journal_paths)],
+                              os.path.join(work_dir, 'merged.jsonl'))
+        elapsed = time.perf_counter() - start
+        print(f"分片爬取耗时 {elapsed:.1f} 秒")
+        if not len(merged):
+            print("未爬取到任何职位信息")
+            merged.close()
+            return None
+        filenames = merged.finalize(parquet=parquet_available())
+        merged.close()
+        return filenames
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# 解析页码范围，例如 "1-10" 或 "3"
+def parse_page_range(text):
+    first, _, last = text.partition('-')
+    return int(first), int(last or first)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='1010兼职网多城市分片爬取')
+    parser.add_argument('--cities', nargs='+', default=['sz'], help='城市子域名，可写成 sz=深圳 指定城市名称')
+    parser.add_argument('--categories', nargs='+', default=['job'], help='分类路径，例如 job gongren paifa')
+    parser.add_argument('--pages', default='1-5', help='页码范围，例如 1-10')
+    parser.add_argument('--pages-per-shard', type=int, default=5, help='每个分片的页数')
+    parser.add_argument('--workers', type=int, default=None, help='进程数，默认等于CPU核数')
+    parser.add_argument('--concurrency', type=int, default=8, help='每个进程同时获取详情页的数量，也是每个城市所有进程合计的并发上限')
+    parser.add_argument('--listing-mode', choices=['http', 'selenium'], default='http',
+                        help='列表页获取方式：http 直接请求并解析；selenium 每个进程启动自己的Edge浏览器')
+    parser.add_argument('--cache-dir', default=None, help='HTTP响应缓存目录，例如 .http_cache')
+    args = parser.parse_args()
+
+    start_page, end_page = parse_page_range(args.pages)
+    shards = make_shards(args.cities, args.categories, start_page, end_page, args.pages_per_shard)
+    run_sharded_crawl(shards, args.workers, args.concurrency, args.listing_mode, args.cache_dir)
+
+
+if __name__ == "__main__":
+    main()
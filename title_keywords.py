@@ -0,0 +1,9 @@
+# 职位标题中常见的关键词，分析脚本按这些词统计职位标题，合成测试数据也用这些词生成职位标题
+TITLE_KEYWORDS = [
+    '日结', '周结', '月结', '全职', '兼职', '临时', '长期', '短期', '扫描', '分拣', '快递', '客服', '销售', '促销', '服务员', '传单', '派发',
+    '礼仪', '模特', '翻译', '教师', '家教', '设计', '文员', '助理', '实习', '会计', '出纳', '司机', '保安', '保洁', '厨师', '送餐', '外卖',
+    '仓库', '搬运', '装卸', '包装', '质检', '操作', '维修', '安装', '电工', '焊工', '木工', '油漆', '美工', '摄影', '主播', '编辑', '策划',
+    '运营', '程序', '开发', '测试', '网络', '电话', '前台', '收银', '导购', '理货', '采购', '跟单', '物流', '仓管', '快递员', '快递分拣',
+    '快递打包', '快递扫描', '快递装卸', '快递理货', '快递仓管', '快递操作', '快递分拣员', '快递打包员', '快递扫描员', '快递装卸工', '快递理货员', '快递仓管员',
+    '快递操作员'
+]
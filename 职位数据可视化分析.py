@@ -1,218 +1,340 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import re
+# 1010兼职网职位信息数据分析。导入本模块没有副作用：数据由调用方读取（load_data），各分析先计算汇总数据，
+# 再由analysis_charts.py绘制图表并保存到指定目录（可在进程池中并行绘制）；matplotlib、wordcloud在第一次绘图时才导入。
+# 命令行用法：
+#   python 职位数据可视化分析.py                                        # 分析职位库或当前目录下最新的数据文件
+#   python 职位数据可视化分析.py 1010兼职网职位信息_20250506_170502.parquet -a salary company
+#   python 职位数据可视化分析.py 快照1.csv 快照2.parquet -o 分析结果 --dedupe --workers 1
+# 在其他程序中使用：
+#   import 职位数据可视化分析 as analysis
+#   data = analysis.load_data(['1010兼职网职位信息_20250506_170502.parquet'])
+#   analysis.run_analyses(data, ['salary', 'report'], results_dir='分析结果')
+import argparse
 import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+
 import numpy as np
-from matplotlib.font_manager import FontProperties
-
-# 设置中文字体
-try:
-    # 尝试使用微软雅黑字体
-    font = FontProperties(fname=r'C:\Windows\Fonts\msyh.ttc')
-    plt.rcParams['font.sans-serif'] = ['Microsoft YaHei']
-    plt.rcParams['axes.unicode_minus'] = False  # 解决负号显示问题
-except:
-    print("警告：找不到微软雅黑字体，图表中文可能无法正常显示")
-    # 尝试使用其他可能存在的中文字体
-    plt.rcParams['font.sans-serif'] = ['SimHei', 'SimSun', 'Arial Unicode MS']
-
-# 设置图表风格
-sns.set(style="whitegrid")
-plt.style.use('ggplot')
-
-# 定义文件路径
-csv_file_path = None
-
-# 查找当前目录下的CSV文件
-for file in os.listdir():
-    if file.startswith("1010兼职网职位信息") and file.endswith(".csv"):
-        csv_file_path = file
-        break
-
-if csv_file_path is None:
-    print("错误：找不到1010兼职网职位信息的CSV文件！")
-    exit(1)
-
-print(f"正在分析文件: {csv_file_path}")
-
-# 读取CSV文件
-try:
-    df = pd.read_csv(csv_file_path)
-    print(f"成功读取数据，共有{len(df)}条职位信息")
-except Exception as e:
-    print(f"读取CSV文件时出错: {str(e)}")
-    exit(1)
+import pandas as pd
+
+from detail_fields import DETAIL_FIELDS, extract_detail_frame
+from parquet_output import iter_jobs, job_columns, read_jobs
+from publish_dates import PUBLISH_DATE_FIELD, crawl_time, parse_publish_dates
+from job_store import DEFAULT_STORE_FILE, JobStore
+from title_keywords import TITLE_KEYWORDS
+from analysis_cube import AnalysisCube, StoreCube, summary_box_stats
+from incremental_analysis import DEFAULT_STATE_FILE, AnalysisState, IncrementalCube
+from analysis_charts import (Chart, render_bar, render_boxes, render_charts, render_histogram, render_keyword_bars,
+                             render_keyword_boxes, render_line, render_pie, render_stacked_bar, render_unit_histograms,
+                             render_wordcloud, wordcloud_available)
+
+# 分析前合并近似重复的职位（中介只改日期前缀重复发布的职位），避免重复发布多的公司影响薪资和公司统计
+DEDUPE_REPOSTS = False
+
+# 职位库文件（爬虫写入的SQLite数据库，累计所有运行的职位）；没有指定输入文件时，存在职位库则直接在库中
+# 分组统计和筛选，不再读取单个CSV/Parquet快照；为None时只分析快照文件
+JOB_STORE_FILE = DEFAULT_STORE_FILE
+
+# 没有指定输入文件时，在当前目录查找以此开头、后接时间戳的快照文件（例如 1010兼职网职位信息_20250506_170502.csv，
+# 不包括“_错误恢复_”等部分数据文件）
+SNAPSHOT_PREFIX = "1010兼职网职位信息"
+
+# 分析用到的字段，只读取这些列；“职位详情”体积最大，只在需要提取结构化字段或合并重复职位时读取
+ANALYSIS_COLUMNS = ['职位标题', '薪资', '薪资单位', '结算方式', '公司名称', '发布时间', '职位链接',
+                    '重复发布次数', PUBLISH_DATE_FIELD] + DETAIL_FIELDS
+
+# 使用职位库时只统计有薪资的职位，与预处理中去掉薪资缺失的职位相同
+STORE_CONDITION = '"薪资" IS NOT NULL'
+
+# 图表和报告的默认保存目录
+RESULTS_DIR = "可视化分析结果"
+
+# 用分位数草图统计时每次读取的行数
+SKETCH_CHUNK_SIZE = 100000
+
+# 并行绘制图表的进程数，None为CPU核数，1为在当前进程中依次绘制
+CHART_WORKERS = None
+
+# 各分析用到的字段，建立汇总数据时只取出选择的分析用到的字段
+ANALYSIS_FIELDS = {
+    'salary': ['薪资单位', '薪资', '日薪', '时薪'],
+    'payment': ['结算方式', '薪资单位', '薪资'],
+    'publish_time': [PUBLISH_DATE_FIELD],
+    'company': ['公司名称', '薪资'],
+    'job_title': ['职位标题', '薪资'],
+    'report': ['薪资', '结算方式', '薪资单位', '公司名称', '日薪'],
+}
+
+# 职位标题关键词的匹配方式：'longest'只计最长的关键词（“快递分拣员”不再同时计为“快递”“快递分拣”），
+# 'overlap'所有出现都计数
+KEYWORD_MATCH_MODE = 'longest'
+
+# 可折算日薪的职位少于这个数量时不绘制折算日薪分布图，报告中也不引用该图
+MIN_DAILY_CHART_COUNT = 5
 
 # 数据预处理
-def preprocess_data(df):
+def preprocess_data(df, verbose=True):
     # 复制数据框以避免修改原始数据
     df_processed = df.copy()
     
     # 将薪资转换为数值型
     df_processed['薪资'] = pd.to_numeric(df_processed['薪资'], errors='coerce')
     
-    # 处理缺失值
-    print(f"处理前数据行数: {len(df_processed)}")
+    # 处理缺失值（分块处理时verbose为False，不逐块打印）
+    if verbose:
+        print(f"处理前数据行数: {len(df_processed)}")
     df_processed = df_processed.dropna(subset=['薪资'])
-    print(f"处理后数据行数: {len(df_processed)}")
-    
-    # 标准化发布时间格式
-    def standardize_date(date_str):
-        if pd.isna(date_str):
-            return None
-        # 假设格式为MM-DD
-        match = re.search(r'(\d{2})-(\d{2})', str(date_str))
-        if match:
-            month, day = match.groups()
-            # 使用当前年份
-            current_year = datetime.now().year
-            return f"{current_year}-{month}-{day}"
-        return None
-    
-    df_processed['标准发布时间'] = df_processed['发布时间'].apply(standardize_date)
-    df_processed['标准发布时间'] = pd.to_datetime(df_processed['标准发布时间'], errors='coerce')
+    if verbose:
+        print(f"处理后数据行数: {len(df_processed)}")
+    
+    # 去掉字典编码字段中已不存在的取值，避免统计中出现数量为0的分类
+    for column in df_processed.select_dtypes('category').columns:
+        df_processed[column] = df_processed[column].cat.remove_unused_categories()
+    
+    # 从职位详情中提取时薪、折算日薪等结构化字段（爬虫入库时已提取的直接使用）
+    missing_fields = [name for name in DETAIL_FIELDS if name not in df_processed.columns]
+    if missing_fields and '职位详情' in df_processed.columns:
+        df_processed[missing_fields] = extract_detail_frame(df_processed)[missing_fields]
+    
+    # 标准化发布时间格式（load_data已按文件的爬取时间解析；其他来源的数据按现在的时间推断年份）
+    if PUBLISH_DATE_FIELD not in df_processed.columns:
+        df_processed[PUBLISH_DATE_FIELD] = parse_publish_dates(df_processed['发布时间'])
+    df_processed[PUBLISH_DATE_FIELD] = pd.to_datetime(df_processed[PUBLISH_DATE_FIELD], errors='coerce')
     
     return df_processed
 
-# 预处理数据
-df_processed = preprocess_data(df)
+# 合并近似重复的职位，每组只保留第一次出现的一条，并累计“重复发布次数”
+def dedupe_reposts(df):
+    from near_duplicates import group_near_duplicates
+    
+    records = df[['职位标题', '职位详情', '公司名称', '职位链接']].astype(object).fillna('').to_dict('records')
+    groups = np.array(group_near_duplicates(records))
+    positions = np.arange(len(df))
+    repost_counts = np.bincount(groups, minlength=len(df)) - 1
+    # 爬虫已合并过的重复发布次数一并累计
+    if '重复发布次数' in df.columns:
+        previous = pd.to_numeric(df['重复发布次数'], errors='coerce').fillna(0).to_numpy()
+        repost_counts = repost_counts + np.bincount(groups, weights=previous, minlength=len(df)).astype(int)
+    keep = groups == positions
+    df_deduped = df[keep].copy()
+    df_deduped['重复发布次数'] = repost_counts[keep]
+    print(f"合并近似重复职位: {len(df)} 条 -> {len(df_deduped)} 条")
+    return df_deduped
+
+# 没有指定输入文件时使用的数据：存在职位库时使用职位库，否则使用当前目录下最新的快照文件
+# （优先使用Parquet文件，字段类型已确定，可以按列读取）；都没有时返回None
+def find_default_input(directory='.'):
+    if JOB_STORE_FILE and os.path.exists(os.path.join(directory, JOB_STORE_FILE)):
+        return os.path.normpath(os.path.join(directory, JOB_STORE_FILE))
+    for extension in (".parquet", ".csv"):
+        # 文件名中的时间戳按字符串排序即按时间排序
+        pattern = re.compile(re.escape(SNAPSHOT_PREFIX) + r'_\d{8}_\d{6}' + re.escape(extension) + '$')
+        files = sorted(file for file in os.listdir(directory) if pattern.match(file))
+        if files:
+            return os.path.normpath(os.path.join(directory, files[-1]))
+    return None
+
 
-# 创建结果目录
-results_dir = "可视化分析结果"
-os.makedirs(results_dir, exist_ok=True)
+# 是否是职位库文件
+def is_job_store(path):
+    return path.endswith('.sqlite3')
+
+
+# 读取要分析的数据：paths为一个职位库文件，或一个或多个Parquet/CSV快照文件；返回职位库（JobStore，
+# 各分析函数直接查询，爬虫写入时已合并重复发布的职位）或预处理后的DataFrame。
+# 多个快照合并分析，相同职位链接的职位只保留最后一个文件中的
+def load_data(paths, dedupe=DEDUPE_REPOSTS):
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    if any(is_job_store(path) for path in paths):
+        if len(paths) > 1:
+            raise ValueError("职位库只能单独分析，不能与快照文件一起分析")
+        job_store = JobStore(paths[0], condition=STORE_CONDITION)
+        print(f"正在分析职位库: {paths[0]}，共有{len(job_store)}条有薪资的职位信息")
+        return job_store
+    
+    frames = []
+    for path in paths:
+        print(f"正在分析文件: {path}")
+        columns = ANALYSIS_COLUMNS
+        if dedupe or not set(DETAIL_FIELDS) <= set(job_columns(path)):
+            columns = columns + ['职位详情']
+        frame = read_jobs(path, columns)
+        # 发布时间只有月日，按文件的爬取时间推断年份（Parquet文件中已解析的日期可能是旧版本按分析当年写入的，也重新解析）
+        if '发布时间' in frame.columns:
+            frame[PUBLISH_DATE_FIELD] = parse_publish_dates(frame['发布时间'], crawl_time(path))
+        frames.append(frame)
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True).drop_duplicates('职位链接', keep='last')
+    print(f"成功读取数据，共有{len(df)}条职位信息")
+    
+    df_processed = preprocess_data(df)
+    if dedupe:
+        df_processed = dedupe_reposts(df_processed)
+    return df_processed
+
+# 增量分析：把输入中新的职位累加到状态（incremental_analysis.AnalysisState）中，返回新计入的职位数。
+# 已处理过且没有修改的文件跳过；职位库只读取上次处理以后首次抓取的职位
+def update_state(state, inputs, dedupe=DEDUPE_REPOSTS):
+    added = 0
+    for path in inputs:
+        if is_job_store(path):
+            job_store = JobStore(path, condition=STORE_CONDITION)
+            try:
+                rows = job_store.select_since(ANALYSIS_COLUMNS, state.stores.get(os.path.abspath(path)))
+            finally:
+                job_store.close()
+            print(f"职位库 {path} 中上次处理以后首次抓取的职位: {len(rows)} 个")
+            if not rows.empty:
+                state.stores[os.path.abspath(path)] = rows['first_seen'].max()
+                added += state.add_jobs(preprocess_data(rows.drop(columns='first_seen')))
+        elif state.has_file(path):
+            print(f"已处理过，跳过: {path}")
+        else:
+            added += state.add_jobs(load_data([path], dedupe=dedupe))
+            state.mark_file(path)
+    return added
+
+# 用分位数草图统计一个快照文件：分块读取并预处理，逐块累加到新的状态中（不记录职位ID），内存与文件大小无关。
+# 在进程池中运行时每个文件一个任务；dedupe时只在每块内合并近似重复的职位
+def sketch_file(path, dedupe=DEDUPE_REPOSTS, chunk_size=SKETCH_CHUNK_SIZE):
+    state = AnalysisState(TITLE_KEYWORDS, KEYWORD_MATCH_MODE, track_seen=False)
+    columns = ANALYSIS_COLUMNS
+    if dedupe or not set(DETAIL_FIELDS) <= set(job_columns(path)):
+        columns = columns + ['职位详情']
+    reference = crawl_time(path)
+    for chunk in iter_jobs(path, columns, chunk_size):
+        if '发布时间' in chunk.columns:
+            chunk[PUBLISH_DATE_FIELD] = parse_publish_dates(chunk['发布时间'], reference)
+        chunk = preprocess_data(chunk, verbose=False)
+        state.add_jobs(dedupe_reposts(chunk) if dedupe else chunk)
+    return state
+
+# 用分位数草图统计一个或多个快照文件（或职位库），返回合并后的状态：多个文件在进程池中分别统计后合并，
+# 每个分组只保存固定大小的草图。不同文件中的相同职位会重复计入，适合分片爬取、按时间切分等互不重叠的数据
+def load_sketches(paths, dedupe=DEDUPE_REPOSTS, workers=CHART_WORKERS):
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    state = AnalysisState(TITLE_KEYWORDS, KEYWORD_MATCH_MODE, track_seen=False)
+    files = []
+    for path in paths:
+        if is_job_store(path):
+            # 职位库中每个职位只有一条，与快照文件一样分块取回需要的字段，逐块累加
+            job_store = JobStore(path, condition=STORE_CONDITION)
+            try:
+                for chunk in job_store.iter_select(ANALYSIS_COLUMNS, SKETCH_CHUNK_SIZE):
+                    state.add_jobs(preprocess_data(chunk, verbose=False))
+            finally:
+                job_store.close()
+        else:
+            files.append(path)
+    workers = min(workers or os.cpu_count() or 1, len(files))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        states = (executor.map if executor else map)(sketch_file, files, [dedupe] * len(files))
+        for path, file_state in zip(files, states):
+            print(f"已统计文件: {path}，{file_state.total} 条职位信息")
+            state.merge(file_state)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return state
+
+# 各分析函数的参数cube为汇总数据（AnalysisCube）：数据只取一次（职位库时在库中分组，只取回用到的字段），
+# 分组统计、直方图和关键词统计在第一次使用时计算，各图表和报告共用；图表保存到results_dir目录
+
+# 整体统计的 (数量, 均值, 中位数)，没有数据时为 (0, nan, nan)
+def describe(summary):
+    if summary is None:
+        return 0, float('nan'), float('nan')
+    return int(summary['count']), summary['mean'], summary['median']
 
 # 1. 薪资分布分析
-def analyze_salary(df):
+def salary_charts(cube):
     print("\n===== 薪资分布分析 =====")
     
     # 按薪资单位分组计算统计信息
-    salary_stats = df.groupby('薪资单位')['薪资'].agg(['count', 'mean', 'median', 'min', 'max']).reset_index()
+    unit_summary = cube.group('薪资单位')
+    salary_stats = unit_summary[['count', 'mean', 'median', 'min', 'max']].reset_index()
     print("\n薪资统计信息:")
     print(salary_stats)
-    
-    # 绘制不同薪资单位的薪资分布
-    plt.figure(figsize=(12, 8))
-    
-    # 获取唯一的薪资单位
-    unique_units = df['薪资单位'].unique()
-    
-    # 为每个薪资单位创建子图
-    for i, unit in enumerate(unique_units, 1):
-        if pd.isna(unit) or unit == "":
+    charts = []
+    
+    # 不同薪资单位的薪资分布：每个薪资单位一个子图
+    unit_histograms = cube.histogram('薪资', '薪资单位')
+    units = []
+    for i, (unit, (count, hist)) in enumerate(unit_histograms.items(), 1):
+        # 跳过空的和数据量太少的单位
+        if unit == "" or count < 5:
             continue
-            
-        unit_data = df[df['薪资单位'] == unit]
-        
-        # 跳过数据量太少的单位
-        if len(unit_data) < 5:
-            continue
-            
-        plt.subplot(len(unique_units), 1, i)
-        
-        # 使用直方图和核密度估计
-        sns.histplot(unit_data['薪资'], kde=True, bins=20)
-        plt.title(f'薪资分布 - {unit}', fontproperties=font)
-        plt.xlabel('薪资', fontproperties=font)
-        plt.ylabel('频数', fontproperties=font)
-        
-        # 添加均值和中位数线
-        plt.axvline(unit_data['薪资'].mean(), color='r', linestyle='--', label=f'均值: {unit_data["薪资"].mean():.2f}')
-        plt.axvline(unit_data['薪资'].median(), color='g', linestyle='-.', label=f'中位数: {unit_data["薪资"].median():.2f}')
-        plt.legend(prop=font)
-    
-    plt.tight_layout()
-    plt.savefig(f"{results_dir}/薪资分布.png", dpi=300)
-    plt.close()
-    
-    # 绘制薪资单位分布饼图
-    plt.figure(figsize=(10, 8))
-    unit_counts = df['薪资单位'].value_counts()
-    plt.pie(unit_counts, labels=unit_counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
-    plt.title('薪资单位分布', fontproperties=font, fontsize=16)
-    plt.axis('equal')  # 保持饼图为圆形
-    plt.savefig(f"{results_dir}/薪资单位分布.png", dpi=300)
-    plt.close()
-    
-    # 绘制箱线图比较不同薪资单位的分布
-    plt.figure(figsize=(12, 8))
-    sns.boxplot(x='薪资单位', y='薪资', data=df)
-    plt.title('不同薪资单位的薪资分布', fontproperties=font, fontsize=16)
-    plt.xlabel('薪资单位', fontproperties=font, fontsize=14)
-    plt.ylabel('薪资', fontproperties=font, fontsize=14)
-    plt.xticks(rotation=45)
-    plt.savefig(f"{results_dir}/薪资箱线图.png", dpi=300)
-    plt.close()
+        units.append((i, len(unit_histograms), unit, hist))
+    charts.append(Chart(render_unit_histograms, "薪资分布.png", {'units': units}))
+    
+    # 薪资单位分布饼图
+    unit_counts = unit_summary['count'].sort_values(ascending=False)
+    charts.append(Chart(render_pie, "薪资单位分布.png", {'counts': unit_counts, 'title': '薪资单位分布'}))
+    
+    # 箱线图比较不同薪资单位的分布
+    charts.append(Chart(render_boxes, "薪资箱线图.png", {
+        'stats': cube.box_stats('薪资单位'),
+        'title': '不同薪资单位的薪资分布', 'xlabel': '薪资单位', 'ylabel': '薪资'}))
+    
+    # 统一折算为日薪后比较（按小时、按天计薪的职位可以放在一起比较）
+    if not cube.has('日薪', '时薪'):
+        return charts
+    daily_count, daily_mean, daily_median = describe(cube.summary('日薪'))
+    hourly_count, hourly_mean, hourly_median = describe(cube.summary('时薪'))
+    print(f"\n可折算日薪的职位: {daily_count} 个，日薪均值 {daily_mean:.2f}，中位数 {daily_median:.2f}")
+    print(f"可提取时薪的职位: {hourly_count} 个，时薪均值 {hourly_mean:.2f}，中位数 {hourly_median:.2f}")
+    if daily_count >= MIN_DAILY_CHART_COUNT:
+        charts.append(Chart(render_histogram, "折算日薪分布.png",
+                            {'hist': cube.histogram('日薪'), 'title': '折算日薪分布', 'xlabel': '日薪'}))
+    return charts
 
 # 2. 结算方式分析
-def analyze_payment_type(df):
+def payment_type_charts(cube):
     print("\n===== 结算方式分析 =====")
     
     # 统计不同结算方式的数量
-    payment_counts = df['结算方式'].value_counts()
+    payment_counts = cube.group('结算方式')['count'].sort_values(ascending=False)
     print("\n结算方式统计:")
     print(payment_counts)
-    
-    # 绘制结算方式分布饼图
-    plt.figure(figsize=(10, 8))
-    plt.pie(payment_counts, labels=payment_counts.index, autopct='%1.1f%%', startangle=90, shadow=True)
-    plt.title('结算方式分布', fontproperties=font, fontsize=16)
-    plt.axis('equal')  # 保持饼图为圆形
-    plt.savefig(f"{results_dir}/结算方式分布.png", dpi=300)
-    plt.close()
+    charts = [Chart(render_pie, "结算方式分布.png", {'counts': payment_counts, 'title': '结算方式分布'})]
     
     # 分析不同结算方式的薪资差异
-    plt.figure(figsize=(12, 8))
-    sns.boxplot(x='结算方式', y='薪资', data=df)
-    plt.title('不同结算方式的薪资分布', fontproperties=font, fontsize=16)
-    plt.xlabel('结算方式', fontproperties=font, fontsize=14)
-    plt.ylabel('薪资', fontproperties=font, fontsize=14)
-    plt.xticks(rotation=45)
-    plt.savefig(f"{results_dir}/结算方式薪资对比.png", dpi=300)
-    plt.close()
+    charts.append(Chart(render_boxes, "结算方式薪资对比.png", {
+        'stats': cube.box_stats('结算方式'),
+        'title': '不同结算方式的薪资分布', 'xlabel': '结算方式', 'ylabel': '薪资'}))
     
     # 结算方式与薪资单位的关系
-    plt.figure(figsize=(14, 10))
-    payment_unit_counts = df.groupby(['结算方式', '薪资单位']).size().unstack().fillna(0)
-    payment_unit_counts.plot(kind='bar', stacked=True)
-    plt.title('结算方式与薪资单位的关系', fontproperties=font, fontsize=16)
-    plt.xlabel('结算方式', fontproperties=font, fontsize=14)
-    plt.ylabel('职位数量', fontproperties=font, fontsize=14)
-    plt.legend(title='薪资单位', prop=font)
-    plt.xticks(rotation=45)
-    plt.savefig(f"{results_dir}/结算方式与薪资单位关系.png", dpi=300)
-    plt.close()
+    payment_unit_counts = cube.counts(['结算方式', '薪资单位']).unstack().fillna(0)
+    charts.append(Chart(render_stacked_bar, "结算方式与薪资单位关系.png", {
+        'table': payment_unit_counts, 'title': '结算方式与薪资单位的关系', 'xlabel': '结算方式',
+        'ylabel': '职位数量', 'legend_title': '薪资单位'}))
+    return charts
 
 # 3. 发布时间分析
-def analyze_publish_time(df):
+def publish_time_charts(cube):
     print("\n===== 发布时间分析 =====")
     
+    # 按日期统计职位数量（没有发布时间的职位不计入）
+    daily_counts = cube.daily_counts()
+    
     # 检查是否有有效的日期数据
-    if df['标准发布时间'].isna().all():
+    if daily_counts.empty:
         print("没有有效的发布时间数据，跳过发布时间分析")
-        return
-    
-    # 按日期统计职位数量
-    df['发布日期'] = df['标准发布时间'].dt.date
-    daily_counts = df.groupby('发布日期').size()
+        return []
     
     print("\n每日发布职位数量:")
     print(daily_counts)
     
-    # 绘制发布时间趋势图
-    plt.figure(figsize=(14, 8))
-    daily_counts.plot(kind='line', marker='o')
-    plt.title('职位发布时间趋势', fontproperties=font, fontsize=16)
-    plt.xlabel('日期', fontproperties=font, fontsize=14)
-    plt.ylabel('职位数量', fontproperties=font, fontsize=14)
-    plt.grid(True)
-    plt.savefig(f"{results_dir}/职位发布时间趋势.png", dpi=300)
-    plt.close()
+    # 发布时间趋势图
+    charts = [Chart(render_line, "职位发布时间趋势.png", {
+        'series': daily_counts, 'title': '职位发布时间趋势', 'xlabel': '日期', 'ylabel': '职位数量'})]
     
     # 按星期几分析发布数量
-    df['星期'] = df['标准发布时间'].dt.day_name()
-    weekday_counts = df.groupby('星期').size()
+    weekday_counts = daily_counts.groupby(pd.to_datetime(daily_counts.index).day_name()).sum()
     
     # 确保星期几按顺序排列
     weekday_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
@@ -221,134 +343,124 @@ def analyze_publish_time(df):
     # 转换英文星期名为中文
     weekday_counts_ordered = pd.Series([weekday_counts.get(day, 0) for day in weekday_order], index=[weekday_names[day] for day in weekday_order])
     
-    plt.figure(figsize=(12, 8))
-    weekday_counts_ordered.plot(kind='bar')
-    plt.title('不同星期的职位发布数量', fontproperties=font, fontsize=16)
-    plt.xlabel('星期', fontproperties=font, fontsize=14)
-    plt.ylabel('职位数量', fontproperties=font, fontsize=14)
-    plt.savefig(f"{results_dir}/星期职位发布数量.png", dpi=300)
-    plt.close()
+    charts.append(Chart(render_bar, "星期职位发布数量.png", {
+        'data': weekday_counts_ordered, 'title': '不同星期的职位发布数量', 'xlabel': '星期', 'ylabel': '职位数量'}))
+    return charts
 
 # 4. 公司分析
-def analyze_company(df):
+def company_charts(cube):
     print("\n===== 公司分析 =====")
     
     # 统计发布职位最多的公司
-    company_counts = df['公司名称'].value_counts().head(10)
+    top_companies = cube.top('公司名称', 10)
+    company_counts = top_companies['count']
     print("\n发布职位最多的10家公司:")
     print(company_counts)
     
-    # 绘制发布职位最多的公司柱状图
-    plt.figure(figsize=(14, 8))
-    company_counts.plot(kind='bar')
-    plt.title('发布职位最多的公司', fontproperties=font, fontsize=16)
-    plt.xlabel('公司名称', fontproperties=font, fontsize=14)
-    plt.ylabel('职位数量', fontproperties=font, fontsize=14)
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.savefig(f"{results_dir}/发布职位最多的公司.png", dpi=300)
-    plt.close()
+    # 发布职位最多的公司柱状图
+    charts = [Chart(render_bar, "发布职位最多的公司.png", {
+        'data': company_counts, 'title': '发布职位最多的公司', 'xlabel': '公司名称', 'ylabel': '职位数量',
+        'figsize': (14, 8), 'rotation': 45})]
     
     # 分析不同公司的薪资水平
-    top_companies = company_counts.index.tolist()
-    company_salary = df[df['公司名称'].isin(top_companies)].groupby('公司名称')['薪资'].agg(['mean', 'median']).sort_values('mean', ascending=False)
+    company_salary = top_companies[['mean', 'median']].sort_values('mean', ascending=False)
     
     print("\n不同公司的薪资水平:")
     print(company_salary)
     
-    # 绘制不同公司的薪资水平对比
-    plt.figure(figsize=(14, 8))
-    company_salary.plot(kind='bar')
-    plt.title('不同公司的薪资水平对比', fontproperties=font, fontsize=16)
-    plt.xlabel('公司名称', fontproperties=font, fontsize=14)
-    plt.ylabel('薪资', fontproperties=font, fontsize=14)
-    plt.xticks(rotation=45, ha='right')
-    plt.legend(prop=font)
-    plt.tight_layout()
-    plt.savefig(f"{results_dir}/公司薪资水平对比.png", dpi=300)
-    plt.close()
+    # 不同公司的薪资水平对比
+    charts.append(Chart(render_bar, "公司薪资水平对比.png", {
+        'data': company_salary, 'title': '不同公司的薪资水平对比', 'xlabel': '公司名称', 'ylabel': '薪资',
+        'figsize': (14, 8), 'rotation': 45}))
+    return charts
 
 # 5. 职位标题关键词分析
-def analyze_job_title(df):
+def job_title_charts(cube):
     print("\n===== 职位标题关键词分析 =====")
     
-    # 提取职位标题中的关键词
-    all_titles = ' '.join(df['职位标题'].dropna())
-    
-    # 定义一些常见的关键词
-    keywords = ['日结', '周结', '月结', '全职', '兼职', '临时', '长期', '短期', '扫描', '分拣', '快递', '客服', '销售', '促销', '服务员', '传单', '派发', '礼仪', '模特', '翻译', '教师', '家教', '设计', '文员', '助理', '实习', '会计', '出纳', '司机', '保安', '保洁', '厨师', '送餐', '外卖', '仓库', '搬运', '装卸', '包装', '质检', '操作', '维修', '安装', '电工', '焊工', '木工', '油漆', '美工', '摄影', '主播', '编辑', '策划', '运营', '程序', '开发', '测试', '网络', '电话', '前台', '收银', '导购', '理货', '采购', '跟单', '物流', '仓管', '快递员', '快递分拣', '快递打包', '快递扫描', '快递装卸', '快递理货', '快递仓管', '快递操作', '快递分拣员', '快递打包员', '快递扫描员', '快递装卸工', '快递理货员', '快递仓管员', '快递操作员']
-    
-    # 统计关键词出现次数
-    keyword_counts = {}
-    for keyword in keywords:
-        count = all_titles.count(keyword)
-        if count > 0:
-            keyword_counts[keyword] = count
-    
-    # 按出现次数排序
-    keyword_counts = dict(sorted(keyword_counts.items(), key=lambda item: item[1], reverse=True))
+    # 一次扫描所有职位标题，统计常见关键词的出现次数（从多到少）和含有各关键词的职位的薪资
+    keyword_counts, keyword_summary = cube.keywords(TITLE_KEYWORDS, KEYWORD_MATCH_MODE)
     
     print("\n职位标题关键词统计:")
     for keyword, count in list(keyword_counts.items())[:20]:
         print(f"{keyword}: {count}")
     
-    # 绘制关键词词云图
-    try:
-        from wordcloud import WordCloud
-        
-        # 创建词云
-        wordcloud = WordCloud(width=800, height=400, background_color='white', font_path=r'C:\Windows\Fonts\msyh.ttc', max_words=100).generate_from_frequencies(keyword_counts)
-        
-        # 显示词云图
-        plt.figure(figsize=(16, 8))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title('职位标题关键词词云', fontproperties=font, fontsize=16)
-        plt.savefig(f"{results_dir}/职位标题关键词词云.png", dpi=300)
-        plt.close()
-    except ImportError:
+    # 关键词词云图，没有安装wordcloud时用条形图代替
+    if wordcloud_available():
+        charts = [Chart(render_wordcloud, "职位标题关键词词云.png",
+                        {'frequencies': keyword_counts, 'title': '职位标题关键词词云'})]
+    else:
         print("未安装wordcloud库，跳过词云图生成")
-        # 使用条形图替代
-        plt.figure(figsize=(14, 10))
-        top_keywords = dict(list(keyword_counts.items())[:20])
-        plt.barh(list(top_keywords.keys()), list(top_keywords.values()))
-        plt.title('职位标题热门关键词', fontproperties=font, fontsize=16)
-        plt.xlabel('出现次数', fontproperties=font, fontsize=14)
-        plt.ylabel('关键词', fontproperties=font, fontsize=14)
-        plt.tight_layout()
-        plt.savefig(f"{results_dir}/职位标题热门关键词.png", dpi=300)
-        plt.close()
+        charts = [Chart(render_keyword_bars, "职位标题热门关键词.png",
+                        {'frequencies': dict(list(keyword_counts.items())[:20]), 'title': '职位标题热门关键词'})]
     
     # 分析含有特定关键词的职位薪资情况
     top_keywords = list(keyword_counts.keys())[:10]
-    
-    plt.figure(figsize=(14, 10))
+    keyword_stats = []
     for i, keyword in enumerate(top_keywords):
-        keyword_data = df[df['职位标题'].str.contains(keyword, na=False)]
-        if len(keyword_data) > 5:  # 只分析有足够数据的关键词
-            plt.subplot(5, 2, i+1)
-            sns.boxplot(y=keyword_data['薪资'])
-            plt.title(f'{keyword}职位薪资分布', fontproperties=font)
-            plt.ylabel('薪资', fontproperties=font)
-    
-    plt.tight_layout()
-    plt.savefig(f"{results_dir}/关键词薪资分布.png", dpi=300)
-    plt.close()
-
-# 6. 综合分析报告
-def generate_report(df):
+        # 只分析有足够数据的关键词
+        if keyword in keyword_summary.index and keyword_summary.loc[keyword, 'count'] > 5:
+            stats = summary_box_stats(keyword_summary.loc[[keyword]])[0]
+            keyword_stats.append((i + 1, keyword, dict(stats, label='')))
+    charts.append(Chart(render_keyword_boxes, "关键词薪资分布.png", {'keywords': keyword_stats}))
+    return charts
+
+# 各分析计算汇总数据并返回要绘制的图表
+CHART_ANALYSES = {
+    'salary': salary_charts,
+    'payment': payment_type_charts,
+    'publish_time': publish_time_charts,
+    'company': company_charts,
+    'job_title': job_title_charts,
+}
+
+# 由预处理后的DataFrame或职位库建立汇总数据，只取出names中的分析用到的字段（默认全部）；已是汇总数据时直接返回
+def build_cube(data, names=None):
+    if isinstance(data, AnalysisCube):
+        return data
+    names = names or ANALYSIS_FIELDS
+    columns = [column for name in names for column in ANALYSIS_FIELDS[name]]
+    return StoreCube(data, columns) if isinstance(data, JobStore) else AnalysisCube(data, columns)
+
+# 运行一项分析并绘制图表（data可以是DataFrame、职位库或汇总数据；workers大于1时在进程池中并行绘制）
+def analyze_salary(data, results_dir=RESULTS_DIR, workers=1):
+    return render_charts(salary_charts(build_cube(data, ['salary'])), results_dir, workers)
+
+def analyze_payment_type(data, results_dir=RESULTS_DIR, workers=1):
+    return render_charts(payment_type_charts(build_cube(data, ['payment'])), results_dir, workers)
+
+def analyze_publish_time(data, results_dir=RESULTS_DIR, workers=1):
+    return render_charts(publish_time_charts(build_cube(data, ['publish_time'])), results_dir, workers)
+
+def analyze_company(data, results_dir=RESULTS_DIR, workers=1):
+    return render_charts(company_charts(build_cube(data, ['company'])), results_dir, workers)
+
+def analyze_job_title(data, results_dir=RESULTS_DIR, workers=1):
+    return render_charts(job_title_charts(build_cube(data, ['job_title'])), results_dir, workers)
+
+# 6. 综合分析报告，source为报告中显示的数据来源
+def generate_report(data, results_dir=RESULTS_DIR, source=None):
     print("\n===== 生成综合分析报告 =====")
+    os.makedirs(results_dir, exist_ok=True)
     
     # 创建一个HTML报告
     report_file = f"{results_dir}/1010兼职网职位分析报告.html"
     
-    # 基本统计信息
-    total_jobs = len(df)
-    avg_salary = df['薪资'].mean()
-    median_salary = df['薪资'].median()
-    most_common_payment = df['结算方式'].value_counts().index[0]
-    most_common_unit = df['薪资单位'].value_counts().index[0]
-    top_company = df['公司名称'].value_counts().index[0]
+    # 基本统计信息（与图表共用汇总数据）
+    cube = build_cube(data, ['report'])
+    total_jobs = cube.total
+    _, avg_salary, median_salary = describe(cube.summary('薪资'))
+    most_common_payment = cube.most_common('结算方式')
+    most_common_unit = cube.most_common('薪资单位')
+    top_company = cube.most_common('公司名称')
+    daily_count, _, daily_median = describe(cube.summary('日薪') if cube.has('日薪') else None)
+    # 只有绘制了折算日薪分布图时才引用，避免显示不存在的图或以前运行留下的旧图
+    daily_chart = """
+        <div class="chart">
+            <img src="折算日薪分布.png" alt="折算日薪分布">
+            <p>按职位详情中的时薪、班次时长折算的日薪分布</p>
+        </div>
+        """ if daily_count >= MIN_DAILY_CHART_COUNT else ""
     
     # 创建HTML内容
     html_content = f"""
@@ -376,10 +488,11 @@ def generate_report(df):
         
         <div class="summary">
             <h2>数据概览</h2>
-            <p>分析文件: {csv_file_path}</p>
+            <p>分析文件: {source}</p>
             <p>总职位数: {total_jobs}</p>
             <p>平均薪资: {avg_salary:.2f}</p>
             <p>薪资中位数: {median_salary:.2f}</p>
+            <p>折算日薪中位数: {daily_median:.2f}（{daily_count} 个职位可折算）</p>
             <p>最常见结算方式: {most_common_payment}</p>
             <p>最常见薪资单位: {most_common_unit}</p>
             <p>发布职位最多的公司: {top_company}</p>
@@ -400,7 +513,7 @@ def generate_report(df):
             <img src="薪资箱线图.png" alt="薪资箱线图">
             <p>不同薪资单位的薪资分布箱线图</p>
         </div>
-        
+        {daily_chart}
         <h2>结算方式分析</h2>
         <div class="chart">
             <img src="结算方式分布.png" alt="结算方式分布">
@@ -464,25 +577,90 @@ def generate_report(df):
     
     print(f"\n综合分析报告已生成: {report_file}")
 
+# 可以选择运行的分析，按运行顺序
+ANALYSES = list(CHART_ANALYSES) + ['report']
+
+
+# 对已读取的数据运行选择的分析（names为ANALYSES中的名称，默认全部），图表和报告保存到results_dir。
+# 先依次计算各分析的汇总数据，再把所有图表一起交给进程池绘制（workers为进程数）
+def run_analyses(data, names=None, results_dir=RESULTS_DIR, source=None, workers=CHART_WORKERS):
+    names = names or ANALYSES
+    # 所有分析和报告共用一份汇总数据
+    cube = build_cube(data, names)
+    charts = []
+    for name in names:
+        if name in CHART_ANALYSES:
+            charts.extend(CHART_ANALYSES[name](cube))
+    if charts:
+        print(f"\n正在绘制 {len(charts)} 张图表...")
+        render_charts(charts, results_dir, workers)
+    if 'report' in names:
+        generate_report(cube, results_dir, source)
+
+
 # 主函数
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='1010兼职网职位信息数据分析')
+    parser.add_argument('inputs', nargs='*',
+                        help='职位库（.sqlite3）或一个或多个Parquet/CSV快照文件，默认使用当前目录下的职位库或最新的快照文件')
+    parser.add_argument('-a', '--analyses', nargs='+', choices=ANALYSES, default=ANALYSES,
+                        help='要运行的分析，默认全部')
+    parser.add_argument('-o', '--output-dir', default=RESULTS_DIR, help='图表和报告的保存目录')
+    parser.add_argument('--dedupe', action='store_true', default=DEDUPE_REPOSTS, help='分析前合并近似重复的职位')
+    parser.add_argument('--workers', type=int, default=CHART_WORKERS,
+                        help='并行绘制图表（以及--sketch时统计各文件）的进程数，默认为CPU核数，1为不使用进程池')
+    parser.add_argument('--sketch', action='store_true',
+                        help='用可合并的分位数草图统计（分块读取，多个文件在进程池中分别统计后合并），内存与职位数无关，'
+                             '中位数和箱线图为近似值')
+    parser.add_argument('--state', nargs='?', const=DEFAULT_STATE_FILE, default=None,
+                        help=f'增量分析：只把输入中新的职位累加到状态文件（默认{DEFAULT_STATE_FILE}），再由状态生成图表和报告')
+    args = parser.parse_args(argv)
+    
+    inputs = args.inputs
+    if not inputs:
+        default_input = find_default_input()
+        if default_input is None:
+            print("错误：找不到1010兼职网职位库或职位信息的Parquet、CSV文件！")
+            sys.exit(1)
+        inputs = [default_input]
+    
     print("===== 1010兼职网职位信息数据分析 =====")
     print(f"分析开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    # 执行各项分析
-    analyze_salary(df_processed)
-    analyze_payment_type(df_processed)
-    analyze_publish_time(df_processed)
-    analyze_company(df_processed)
-    analyze_job_title(df_processed)
-    
-    # 生成综合报告
-    generate_report(df_processed)
+    # 读取数据文件（增量分析时只读取新的职位，累加到状态中）
+    try:
+        if args.state:
+            state = AnalysisState.load(args.state, TITLE_KEYWORDS, KEYWORD_MATCH_MODE)
+            try:
+                added = update_state(state, inputs, dedupe=args.dedupe)
+                state.save(args.state)
+            finally:
+                state.close()
+            print(f"增量分析：新计入 {added} 个职位，累计 {state.total} 个职位（状态文件: {args.state}）")
+            data = IncrementalCube(state)
+        elif args.sketch:
+            state = load_sketches(inputs, dedupe=args.dedupe, workers=args.workers)
+            print(f"用分位数草图统计了 {state.total} 条职位信息")
+            data = IncrementalCube(state)
+        else:
+            data = load_data(inputs, dedupe=args.dedupe)
+    except Exception as e:
+        print(f"读取数据文件时出错: {str(e)}")
+        sys.exit(1)
+    
+    # 执行选择的分析
+    try:
+        run_analyses(data, [name for name in ANALYSES if name in args.analyses], args.output_dir, ', '.join(inputs),
+                     args.workers)
+    finally:
+        if isinstance(data, JobStore):
+            data.close()
     
     print(f"\n分析结束时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"分析结果已保存到目录: {os.path.abspath(results_dir)}")
-    print("\n请打开生成的HTML报告查看完整分析结果")
+    print(f"分析结果已保存到目录: {os.path.abspath(args.output_dir)}")
+    if 'report' in args.analyses:
+        print("\n请打开生成的HTML报告查看完整分析结果")
 
 # 执行主函数
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()